@@ -1,46 +1,40 @@
-from src.google_stt.analyzer import GoogleVoiceSentimentAnalyzer
-from src.hume.client import HumeBatchAPI
-import time
+from src.stt.backends import create_backend
 from operator import itemgetter
+import threading
+import config
 
-def analyze_with_google(file_path: str) -> dict:
-    """Google STT와 감정 분석 실행"""
-    analyzer = GoogleVoiceSentimentAnalyzer()
-    return analyzer.analyze_audio(file_path)
+_stt_backends = {}
+# first requests arrive concurrently from worker threads, only one may build (and load) each backend
+_stt_backends_lock = threading.Lock()
 
-def print_google_results(results: dict):
-    """Google 분석 결과 출력"""
+def get_stt_backend(name: str = None):
+    """STT 백엔드 (기본 STT_BACKEND) 를 이름별로 한 번만 만들어 재사용 (로컬 모델을 요청마다 다시 읽지 않도록)"""
+    name = name or config.STT_BACKEND
+    with _stt_backends_lock:
+        if name not in _stt_backends:
+            options = {"model_dir": config.STT_LOCAL_MODEL_DIR} if name == "local" else {}
+            _stt_backends[name] = create_backend(name, **options)
+        return _stt_backends[name]
+
+def transcribe(audio, backend: str = None) -> dict:
+    """STT 백엔드로 음성을 텍스트로 변환 (audio: 파일 경로 또는 메모리의 wav bytes)"""
+    stt = get_stt_backend(backend)
+    result = stt.transcribe(audio)
+    if not result or not result[0]:
+        return {'error': '음성 변환 실패'}
+    text, confidence = result
+    return {'text': text, 'confidence': confidence, 'backend': stt.name}
+
+def print_stt_results(results: dict):
+    """STT 결과 출력"""
     if 'error' in results:
         print(f"Error: {results['error']}")
         return
 
-    print("\nRunning Google Analysis...")
-    print("\n=== Google STT & Sentiment Analysis ===")
+    print(f"\n=== Speech-to-Text ({results['backend']}, 신뢰도 {results['confidence']:.2%}) ===")
     print("-" * 40)
     print(f"{results['text']}\n")
 
-def analyze_with_hume(file_path: str) -> dict:
-    """Hume AI 분석 실행"""
-    client = HumeBatchAPI()
-    job_id = client.analyze_audio(file_path)
-    
-    if not job_id:
-        return {"error": "Failed to start Hume analysis"}
-    
-    print("Running Hume Analysis...")
-    print(f"Hume analysis started - Job ID: {job_id}")
-    
-    while True:
-        status = client.get_job_status(job_id)
-        print(f"Status: {status}")
-        
-        if status == "COMPLETED":
-            return client.get_predictions(job_id)
-        elif status == "FAILED":
-            return {"error": "Hume analysis failed"}
-            
-        time.sleep(5)
-
 def print_hume_results(predictions: dict):
     """Hume 분석 결과 출력"""
     try:
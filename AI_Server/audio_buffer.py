@@ -0,0 +1,91 @@
+import asyncio
+import os
+import tempfile
+
+import config
+
+
+class AudioTooLarge(Exception):
+    """업로드된 음성이 max_bytes 를 넘을 때 발생"""
+
+
+class AudioBuffer:
+    """업로드 음성을 한 번만 읽어 STT / Hume 단계가 같은 bytes 를 쓰게 하는 버퍼
+
+    - spill_bytes 까지는 메모리 (bytearray) 에 두고 source() 로 memoryview 를 넘김
+    - 그보다 크면 임시 파일로 옮겨 쓰고 source() 로 경로를 넘김 (close() 에서 삭제)
+      (파일 쓰기는 read() 에서 스레드로 넘겨 이벤트 루프를 막지 않음)
+    """
+
+    def __init__(self, max_bytes=config.AUDIO_MAX_BYTES, spill_bytes=config.AUDIO_SPILL_BYTES, suffix=".wav"):
+        self.max_bytes = max_bytes
+        self.spill_bytes = spill_bytes
+        self.suffix = suffix
+        self.size = 0
+        self.path = None
+        self._data = bytearray()
+        self._file = None
+
+    @classmethod
+    async def read(cls, upload, chunk_size=config.AUDIO_READ_CHUNK_BYTES, **kwargs):
+        """UploadFile 을 chunk_size 씩 읽어 버퍼로 (max_bytes 를 넘으면 AudioTooLarge)"""
+        buffer = cls(**kwargs)
+        try:
+            while chunk := await upload.read(chunk_size):
+                if buffer.spills(chunk):
+                    await asyncio.to_thread(buffer.write, chunk)
+                else:
+                    buffer.write(chunk)
+            if buffer.path is not None:
+                await asyncio.to_thread(buffer.finish)
+        except BaseException:
+            buffer.close()
+            raise
+        return buffer
+
+    def spills(self, chunk):
+        """chunk 를 쓰면 임시 파일에 쓰게 되는지 (이미 넘어갔거나 이번에 spill_bytes 를 넘음)"""
+        return self._file is not None or self.size + len(chunk) > self.spill_bytes
+
+    def write(self, chunk):
+        if self.size + len(chunk) > self.max_bytes:
+            raise AudioTooLarge(f"Audio exceeds {self.max_bytes} bytes")
+        if self._file is None and self.size + len(chunk) > self.spill_bytes:
+            self._file = tempfile.NamedTemporaryFile(delete=False, suffix=self.suffix)
+            self.path = self._file.name
+            self._file.write(self._data)
+            self._data = bytearray()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._data.extend(chunk)
+        self.size += len(chunk)
+
+    def finish(self):
+        if self._file is not None:
+            self._file.close()
+
+    def source(self):
+        """메모리에 있으면 memoryview, 임시 파일로 넘어갔으면 그 경로"""
+        return self.path if self.path is not None else memoryview(self._data)
+
+    def adopt(self, path):
+        """source() 를 path (전처리된 임시 파일) 로 바꾸고 원래 임시 파일은 삭제, path 도 close() 에서 삭제"""
+        if path == self.path:
+            return
+        self.close()
+        self._file = None
+        self._data = bytearray()
+        self.path = path
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
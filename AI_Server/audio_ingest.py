@@ -0,0 +1,61 @@
+import asyncio
+import os
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from src.google_stt.preprocess import decode_audio, preprocess_audio, preprocess_file
+
+# accepted upload content types -> container format ("wav" needs no decoding)
+AUDIO_FORMATS = {
+    "audio/wave": "wav",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/flac": "flac",
+    "audio/x-flac": "flac",
+    "audio/ogg": "ogg",
+    "audio/opus": "ogg",
+}
+
+# decoding / resampling is CPU work (ffmpeg subprocess + NumPy), kept off the event loop and bounded
+decode_pool = ThreadPoolExecutor(max_workers=config.AUDIO_DECODE_WORKERS, thread_name_prefix="audio-decode")
+
+
+async def prepare_audio(source, audio_format):
+    """업로드 음성 -> STT / Hume 에 넘길 16-bit wav (압축 포맷 디코딩 + 전처리), 전처리 리포트, 단계별 시간 (ms)
+
+    디코딩에 실패하면 ValueError, 전처리에 실패하면 디코딩된 음성을 그대로 넘김
+    임시 파일로 넘어간 wav (경로) 는 블록 단위로 새 임시 파일에 전처리해 그 경로를 넘김 (호출한 쪽이 삭제)
+    """
+    loop = asyncio.get_running_loop()
+    timings, report = {}, None
+
+    if audio_format != "wav":
+        start = time.perf_counter()
+        source = await loop.run_in_executor(decode_pool, decode_audio, source, audio_format)
+        timings["decode_ms"] = (time.perf_counter() - start) * 1000
+
+    # 16kHz mono, leading / trailing silence trimmed: fewer bytes uploaded and audio seconds billed by both services
+    if config.AUDIO_PREPROCESS:
+        start = time.perf_counter()
+        try:
+            if isinstance(source, str):
+                # spilled upload: never decoded into memory as a whole
+                fd, output_path = tempfile.mkstemp(suffix=".wav")
+                os.close(fd)
+                try:
+                    report = await loop.run_in_executor(decode_pool, preprocess_file, source, output_path)
+                except BaseException:
+                    os.remove(output_path)
+                    raise
+                source = output_path
+            else:
+                source, report = await loop.run_in_executor(decode_pool, preprocess_audio, source)
+            print(f"Audio preprocessing: {report}")
+        except (wave.Error, EOFError, ValueError) as e:
+            print(f"Audio preprocessing skipped: {str(e)}")
+        timings["preprocess_ms"] = (time.perf_counter() - start) * 1000
+
+    return source, report, timings
@@ -0,0 +1,354 @@
+import asyncio
+import queue
+import threading
+import time
+
+import torch
+import torch.nn.functional as F
+
+import config
+from inference_backend import Sampler
+
+
+def _pad(tensor, dim, before=0, after=0):
+    """tensor의 dim 축 앞/뒤를 0으로 채움"""
+    if before == 0 and after == 0:
+        return tensor
+    pad = [0, 0] * (tensor.dim() - dim - 1) + [before, after]
+    return F.pad(tensor, pad)
+
+
+def _resolve(future, result=None, error=None):
+    """이벤트 루프 쪽에서 future 완료 처리"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class _Sequence:
+    """배치 안에서 디코딩 중인 요청 하나"""
+
+    def __init__(self, input_ids, max_length, future, loop, tokens=None):
+        self.input_ids = input_ids
+        self.max_length = max_length
+        self.future = future
+        self.loop = loop
+        # asyncio.Queue for streaming callers: token ids, then None (done) or an exception
+        self.tokens = tokens
+        self.decoder_ids = []
+
+    def emit(self, token):
+        if self.tokens is not None:
+            self.loop.call_soon_threadsafe(self.tokens.put_nowait, token)
+
+    def finish(self):
+        # drop the decoder start token, keep eos so the caller sees the whole sequence
+        self.loop.call_soon_threadsafe(_resolve, self.future, self.decoder_ids[1:])
+        self.emit(None)
+
+    def fail(self, error):
+        self.loop.call_soon_threadsafe(_resolve, self.future, None, error)
+        self.emit(error)
+
+
+class ContinuousBatchingEngine:
+    """동시에 들어온 요청을 한 번의 인코더 패스로 묶고, 디코더 스텝마다 시퀀스가 배치에 합류/이탈하는 생성 엔진
+
+    - 배치가 비어 있으면 첫 요청 이후 최대 max_wait_ms 동안 요청을 더 모아 함께 인코딩
+    - 디코딩 중에는 스텝마다 대기 요청을 빈 자리만큼 받아 prefill 후 배치에 합류
+    - EOS, max_length 또는 stopper 조건(완결된 문장)에 도달한 시퀀스는 즉시 배치에서 빠지고 결과를 돌려줌
+    - generate_candidates 의 후보들은 함께 배치에 들어가고 인코더 출력을 공유함
+    """
+
+    def __init__(self, backend, device, max_batch_size=config.MAX_BATCH_SIZE, max_wait_ms=config.MAX_WAIT_MS,
+                 executor=None, max_length=1024, stopper=None, constraint=None, do_sample=True):
+        self.backend = backend
+        self.device = device
+        self.max_length = max_length
+        self.stopper = stopper
+        # share the inference executor's thread settings and model lock when given one
+        self.executor = executor
+        self.model_lock = executor.model_lock if executor is not None else threading.Lock()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self.pad_token_id = backend.config.pad_token_id
+        self.eos_token_id = backend.config.eos_token_id
+        self.decoder_start_token_id = backend.config.decoder_start_token_id
+        # same sampling pipeline as model.generate(temperature=..., no_repeat_ngram_size=..., do_sample=True)
+        self.sampler = Sampler(backend.generation_config, constraint=constraint)
+        self.do_sample = do_sample  # False: greedy, same tokens as backend.generate(do_sample=False)
+
+        self._pending = queue.Queue()  # lists of sequences admitted together, None = stop
+        self._held = None  # group that did not fit into the batch yet
+        self._running = False
+        self._thread = None
+
+        # batched decoding state, row i belongs to self._active[i]
+        self._active = []
+        self._encoder_hidden = None  # [B, S, d], right padded
+        self._encoder_mask = None    # [B, S]
+        self._decoder_mask = None    # [B, T], left padded
+        self._past = None            # per layer (self_k, self_v, cross_k, cross_v)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="batching-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._pending.put(None)
+        if self._thread is not None:
+            self._thread.join()
+
+    async def generate(self, input_ids, max_length=None):
+        """입력 토큰 ID 리스트로 루틴을 생성하여 출력 토큰 ID 리스트 반환"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.put([_Sequence(list(input_ids), max_length or self.max_length, future, loop)])
+        return await future
+
+    async def generate_candidates(self, input_ids, num_candidates, max_length=None):
+        """같은 입력으로 num_candidates 개 루틴을 생성 (인코더는 한 번만 실행), 후보마다 출력 토큰 ID 리스트 반환"""
+        loop = asyncio.get_running_loop()
+        # the shared input_ids list tells _prefill to encode the group once
+        input_ids = list(input_ids)
+        group = [
+            _Sequence(input_ids, max_length or self.max_length, loop.create_future(), loop)
+            for _ in range(num_candidates)
+        ]
+        self._pending.put(group)
+        return list(await asyncio.gather(*(seq.future for seq in group)))
+
+    async def stream(self, input_ids, max_length=None):
+        """생성되는 토큰 ID 를 디코더 스텝마다 하나씩 yield"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        tokens = asyncio.Queue()
+        self._pending.put([_Sequence(list(input_ids), max_length or self.max_length, future, loop, tokens)])
+        try:
+            while True:
+                token = await tokens.get()
+                if token is None:
+                    break
+                if isinstance(token, Exception):
+                    raise token
+                yield token
+        finally:
+            # client went away: the engine drops the row at its next step
+            if not future.done():
+                future.cancel()
+            elif not future.cancelled():
+                future.exception()  # errors were already raised through the token queue
+
+    def _run(self):
+        # torch intra-op threads are process-wide, already set by InferenceExecutor
+        with torch.inference_mode():
+            while self._running:
+                joining = self._admit()
+                try:
+                    with self.model_lock:
+                        if joining:
+                            self._prefill(joining)
+                        if self._active:
+                            self._decode_step()
+                except Exception as e:
+                    print(f"Error in batching engine: {str(e)}")
+                    for seq in self._active + [seq for seq in joining if seq not in self._active]:
+                        seq.fail(e)
+                    self._reset()
+
+        for seq in self._active + (self._held or []):
+            seq.fail(RuntimeError("batching engine stopped"))
+
+    def _admit(self):
+        """배치의 빈 자리만큼 대기 중인 요청을 가져옴 (후보 묶음은 나누지 않음)"""
+        joining = []
+        capacity = self.max_batch_size - len(self._active)
+        if capacity <= 0:
+            return joining
+
+        def take(group):
+            if group is None:
+                return True
+            group = [seq for seq in group if not seq.future.done()]
+            # an oversized group still runs alone once the batch is empty
+            if joining or self._active:
+                if len(joining) + len(group) > capacity:
+                    self._held = group
+                    return False
+            joining.extend(group)
+            return True
+
+        if not self._active:
+            # idle: block for the first request, then gather more for up to max_wait
+            take(self._next())
+            deadline = time.perf_counter() + self.max_wait
+            while self._running and len(joining) < capacity:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    group = self._next(timeout=timeout)
+                except queue.Empty:
+                    break
+                if not take(group):
+                    break
+        else:
+            # decoding: never wait, just fill free slots
+            while len(joining) < capacity:
+                try:
+                    group = self._next(block=False)
+                except queue.Empty:
+                    break
+                if not take(group):
+                    break
+
+        return joining
+
+    def _next(self, block=True, timeout=None):
+        if self._held is not None:
+            group, self._held = self._held, None
+            return group
+        return self._pending.get(block, timeout)
+
+    def _prefill(self, joining):
+        """새 요청들을 한 번에 인코딩하고 첫 디코더 스텝을 실행한 뒤 배치에 합류"""
+        # candidates of one request share their input_ids list and are encoded once
+        sources, rows = {}, []
+        for seq in joining:
+            rows.append(sources.setdefault(id(seq.input_ids), (len(sources), seq.input_ids))[0])
+        sources = [ids for _, ids in sources.values()]
+
+        src_len = max(len(ids) for ids in sources)
+        input_ids = torch.full((len(sources), src_len), self.pad_token_id, dtype=torch.long)
+        encoder_mask = torch.zeros((len(sources), src_len), dtype=torch.long)
+        for row, ids in enumerate(sources):
+            input_ids[row, :len(ids)] = torch.tensor(ids)
+            encoder_mask[row, :len(ids)] = 1
+        input_ids = input_ids.to(self.device)
+        encoder_mask = encoder_mask.to(self.device)
+
+        encoder_hidden = self.backend.encode(input_ids, encoder_mask)
+        if len(sources) < len(joining):
+            index = torch.tensor(rows, device=self.device)
+            encoder_hidden = encoder_hidden.index_select(0, index)
+            encoder_mask = encoder_mask.index_select(0, index)
+
+        for seq in joining:
+            seq.decoder_ids = [self.decoder_start_token_id]
+        decoder_input_ids = torch.full((len(joining), 1), self.decoder_start_token_id, dtype=torch.long, device=self.device)
+        decoder_mask = torch.ones((len(joining), 1), dtype=torch.long, device=self.device)
+
+        logits, past = self.backend.decode_step(decoder_input_ids, encoder_hidden, encoder_mask, decoder_mask)
+
+        self._merge(joining, encoder_hidden, encoder_mask, decoder_mask, past)
+        self._advance(logits, first_row=len(self._active) - len(joining))
+
+    def _decode_step(self):
+        """배치 전체에 대해 디코더 한 스텝 실행"""
+        decoder_input_ids = torch.tensor(
+            [[seq.decoder_ids[-1]] for seq in self._active], dtype=torch.long, device=self.device
+        )
+        decoder_mask = torch.cat(
+            [self._decoder_mask, torch.ones((len(self._active), 1), dtype=torch.long, device=self.device)], dim=1
+        )
+
+        logits, self._past = self.backend.decode_step(
+            decoder_input_ids, self._encoder_hidden, self._encoder_mask, decoder_mask, self._past
+        )
+        self._decoder_mask = decoder_mask
+        self._advance(logits, first_row=0)
+
+    def _advance(self, logits, first_row):
+        """logits 에서 다음 토큰을 샘플링하고, 끝난 시퀀스를 배치에서 제거"""
+        rows = self._active[first_row:]
+        next_tokens = self.sampler([seq.decoder_ids for seq in rows], logits, do_sample=self.do_sample)
+
+        finished = []
+        for offset, (seq, token) in enumerate(zip(rows, next_tokens)):
+            seq.decoder_ids.append(token)
+            seq.emit(token)
+            if (token == self.eos_token_id or len(seq.decoder_ids) >= seq.max_length or seq.future.cancelled()
+                    or (self.stopper is not None and self.stopper(seq.decoder_ids))):
+                finished.append(first_row + offset)
+
+        if finished:
+            for row in finished:
+                self._active[row].finish()
+            self._evict(finished)
+
+    def _merge(self, joining, encoder_hidden, encoder_mask, decoder_mask, past):
+        """prefill 결과를 기존 배치 상태에 이어 붙임 (디코더는 왼쪽, 인코더는 오른쪽 패딩)"""
+        if not self._active:
+            self._active = list(joining)
+            self._encoder_hidden = encoder_hidden
+            self._encoder_mask = encoder_mask
+            self._decoder_mask = decoder_mask
+            self._past = past
+            return
+
+        old_t, new_t = self._decoder_mask.shape[1], decoder_mask.shape[1]
+        old_s, new_s = self._encoder_mask.shape[1], encoder_mask.shape[1]
+        t, s = max(old_t, new_t), max(old_s, new_s)
+
+        self._active.extend(joining)
+        self._encoder_hidden = torch.cat(
+            [_pad(self._encoder_hidden, 1, after=s - old_s), _pad(encoder_hidden, 1, after=s - new_s)]
+        )
+        self._encoder_mask = torch.cat(
+            [_pad(self._encoder_mask, 1, after=s - old_s), _pad(encoder_mask, 1, after=s - new_s)]
+        )
+        self._decoder_mask = torch.cat(
+            [_pad(self._decoder_mask, 1, before=t - old_t), _pad(decoder_mask, 1, before=t - new_t)]
+        )
+        self._past = tuple(
+            (
+                torch.cat([_pad(old[0], 2, before=t - old_t), _pad(new[0], 2, before=t - new_t)]),
+                torch.cat([_pad(old[1], 2, before=t - old_t), _pad(new[1], 2, before=t - new_t)]),
+                torch.cat([_pad(old[2], 2, after=s - old_s), _pad(new[2], 2, after=s - new_s)]),
+                torch.cat([_pad(old[3], 2, after=s - old_s), _pad(new[3], 2, after=s - new_s)]),
+            )
+            for old, new in zip(self._past, past)
+        )
+
+    def _evict(self, finished):
+        """끝난 행을 제거하고 남은 배치에서 불필요한 패딩을 잘라냄"""
+        done = set(finished)
+        keep = [row for row in range(len(self._active)) if row not in done]
+        if not keep:
+            self._reset()
+            return
+
+        index = torch.tensor(keep, device=self.device)
+        self._active = [self._active[row] for row in keep]
+        decoder_mask = self._decoder_mask.index_select(0, index)
+        encoder_mask = self._encoder_mask.index_select(0, index)
+
+        # the longest remaining sequences decide how much padding is still needed
+        t_start = int((decoder_mask.sum(dim=0) > 0).nonzero()[0])
+        s_end = int(encoder_mask.sum(dim=1).max())
+
+        self._decoder_mask = decoder_mask[:, t_start:]
+        self._encoder_mask = encoder_mask[:, :s_end]
+        self._encoder_hidden = self._encoder_hidden.index_select(0, index)[:, :s_end]
+        self._past = tuple(
+            (
+                layer[0].index_select(0, index)[:, :, t_start:],
+                layer[1].index_select(0, index)[:, :, t_start:],
+                layer[2].index_select(0, index)[:, :, :s_end],
+                layer[3].index_select(0, index)[:, :, :s_end],
+            )
+            for layer in self._past
+        )
+
+    def _reset(self):
+        self._active = []
+        self._encoder_hidden = None
+        self._encoder_mask = None
+        self._decoder_mask = None
+        self._past = None
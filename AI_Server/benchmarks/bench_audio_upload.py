@@ -0,0 +1,137 @@
+"""
+음성 업로드 포맷 벤치마크: wav vs flac vs ogg/opus 를 느린 업링크로 올렸을 때 업로드 크기와 전체 지연
+
+AI_Server 디렉토리에서 실행 (ffmpeg 필요, /voice_analysis/ 와 같은 버퍼링 + 디코딩 + 전처리 단계만 띄운 로컬 서버 사용):
+    python -m benchmarks.bench_audio_upload --uplink-kbps 1000 --runs 5
+    python -m benchmarks.bench_audio_upload --input 녹음.wav
+
+multipart 본문을 uplink-kbps 속도로 나눠 보내 느린 가정용 업링크를 흉내 내고,
+업로드 시작부터 (디코딩 + 전처리까지 끝난) 응답까지의 시간을 보고함. --input 이 없으면 음성 비슷한 신호를 합성함
+"""
+import argparse
+import asyncio
+import io
+import threading
+import time
+import wave
+
+import ffmpeg
+import httpx
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, File, HTTPException, UploadFile
+
+import audio_ingest
+from audio_buffer import AudioBuffer
+from benchmarks.common import percentile
+
+FORMATS = [
+    ("wav", "audio/wave", {}),
+    ("flac", "audio/flac", {"format": "flac"}),
+    ("ogg", "audio/ogg", {"format": "ogg", "acodec": "libopus", "audio_bitrate": "32k"}),
+]
+
+
+def synthesize(seconds=6.0, sample_rate=48000, seed=0):
+    """0.5초 무음 + 성대 진동 같은 배음 (음높이 / 세기가 천천히 변함) + 1초 무음, 스테레오 16-bit wav"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 1.5 * t), 0, None) ** 0.5
+    signal = 0.2 * voice * envelope + 0.002 * rng.standard_normal(len(t))
+    signal = np.concatenate([np.zeros(sample_rate // 2), signal, np.zeros(sample_rate)])
+    pcm = (np.clip(np.stack([signal, signal], axis=1), -1, 1) * 32767).astype("<i2")
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def encode(wav, options):
+    if not options:
+        return wav
+    out, _ = (
+        ffmpeg.input("pipe:", format="wav")
+        .output("pipe:", **options)
+        .run(input=wav, capture_stdout=True, capture_stderr=True)
+    )
+    return out
+
+
+def create_app():
+    app = FastAPI()
+
+    @app.post("/voice_upload/")
+    async def voice_upload(audio: UploadFile = File(...)):
+        audio_format = audio_ingest.AUDIO_FORMATS.get(audio.content_type)
+        if audio_format is None:
+            raise HTTPException(status_code=400, detail="Unsupported format")
+        with await AudioBuffer.read(audio) as buffer:
+            _, report, timings = await audio_ingest.prepare_audio(buffer.source(), audio_format)
+        return {"received_bytes": buffer.size, "audio": report, "timings": timings}
+
+    return app
+
+
+def start_in_thread(port):
+    server = uvicorn.Server(uvicorn.Config(create_app(), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}/voice_upload/"
+
+
+async def throttled(body, kbps, chunk=4096):
+    """body 를 kbps 속도로 나눠 보냄"""
+    delay = chunk * 8 / (kbps * 1000)
+    for i in range(0, len(body), chunk):
+        await asyncio.sleep(delay)
+        yield body[i:i + chunk]
+
+
+async def upload(client, url, data, content_type, kbps):
+    # build the multipart body once, then stream it at the throttled rate
+    request = client.build_request("POST", url, files={"audio": ("audio", data, content_type)})
+    body = request.read()
+    start = time.perf_counter()
+    response = await client.post(
+        url, content=throttled(body, kbps), headers={"content-type": request.headers["content-type"]}
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start, len(body), response.json()
+
+
+async def bench(args):
+    wav = open(args.input, "rb").read() if args.input else synthesize()
+    server, url = start_in_thread(args.port)
+    try:
+        async with httpx.AsyncClient(timeout=None) as client:
+            print(f"uplink {args.uplink_kbps:.0f} kbps")
+            for name, content_type, options in FORMATS:
+                data = encode(wav, options)
+                latencies = []
+                for _ in range(args.runs):
+                    latency, size, result = await upload(client, url, data, content_type, args.uplink_kbps)
+                    latencies.append(latency)
+                stages = " ".join(f"{stage} {ms:.0f}ms" for stage, ms in result["timings"].items())
+                sent = (result["audio"] or {}).get("output_bytes", 0)
+                print(f"{name:5} upload {size / 1024:8.1f} KiB  end-to-end p50 {percentile(latencies, 50):6.2f}s  "
+                      f"p99 {percentile(latencies, 99):6.2f}s  ({stages}, "
+                      f"sent to STT/Hume {sent / 1024:.1f} KiB)")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compressed audio upload benchmark")
+    parser.add_argument("--input", type=str, default=None, help="wav recording to upload (default: synthesized)")
+    parser.add_argument("--uplink-kbps", type=float, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8300)
+    asyncio.run(bench(parser.parse_args()))
@@ -0,0 +1,102 @@
+"""
+동시 요청 벤치마크: 기존 one-by-one model.generate 경로 vs ContinuousBatchingEngine
+
+AI_Server 디렉토리에서 실행:
+    python -m benchmarks.bench_batching --concurrency 8 --requests 32
+
+측정 결과 (CPU 1코어, fp32, MAX_LENGTH=32, MAX_BATCH_SIZE=8, MAX_WAIT_MS=10)
+VOICE_model 가중치가 없는 환경이라 t5-small 크기 (d_model 512, 6+6 층, vocab 50358) 의 무작위 T5 로 측정,
+무작위 가중치는 EOS 를 거의 내지 않아 모든 요청이 MAX_LENGTH 까지 생성함 (모델 크기에 따라 절대값은 달라짐)
+
+    --concurrency 8 --requests 32   one-by-one  p50 10.33s  p99 11.52s  0.74 req/s  23.1 tok/s
+                                    batched     p50  4.50s  p99  4.85s  1.73 req/s  53.6 tok/s  (x2.32)
+    --concurrency 1 --requests 8    one-by-one  p50  1.18s  p99  2.40s  0.74 req/s  22.9 tok/s
+                                    batched     p50  1.27s  p99  1.37s  0.77 req/s  24.0 tok/s  (x1.05)
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+import torch
+
+import config
+import main
+from batching import ContinuousBatchingEngine
+from benchmarks.common import percentile
+
+SITUATIONS = [
+    "퇴근하고 집에 왔는데 너무 더워.",
+    "주말인데 빨래가 너무 밀렸어.",
+    "새벽에 갑자기 영화 보고 싶네.",
+    "오늘 밤하늘이 맑아서 별을 보고 싶어.",
+    "감기 기운이 있어서 일찍 자고 싶어.",
+    "친구들이 곧 집에 놀러 온대.",
+    "아침에 일어났는데 집이 너무 건조해.",
+    "저녁 먹고 설거지가 잔뜩 쌓였어.",
+]
+
+
+def report(name, latencies, token_counts, elapsed):
+    print(f"{name:12} "
+          f"p50 {percentile(latencies, 50):7.2f}s  "
+          f"p99 {percentile(latencies, 99):7.2f}s  "
+          f"{len(latencies) / elapsed:6.2f} req/s  "
+          f"{sum(token_counts) / elapsed:8.1f} tok/s")
+
+
+async def run_load(generate, num_requests, concurrency):
+    """concurrency 개의 클라이언트가 num_requests 개 요청을 나눠 보냄"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, token_counts = [], []
+
+    async def one(index):
+        async with semaphore:
+            input_ids = main.compiler.encode(SITUATIONS[index % len(SITUATIONS)])
+            start = time.perf_counter()
+            output_ids = await generate(input_ids)
+            latencies.append(time.perf_counter() - start)
+            token_counts.append(len(output_ids))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(num_requests)))
+    return latencies, token_counts, time.perf_counter() - start
+
+
+def make_sequential_generate():
+    """기존 경로: 요청마다 generate 한 번, 한 번에 하나씩"""
+    lock = threading.Lock()
+
+    def blocking_generate(input_ids):
+        with lock, torch.inference_mode():
+            return main.backend.generate(input_ids, max_length=main.max_length, stopper=main.stopper)
+
+    async def generate(input_ids):
+        return await asyncio.to_thread(blocking_generate, input_ids)
+
+    return generate
+
+
+async def bench(args):
+    latencies, token_counts, elapsed = await run_load(make_sequential_generate(), args.requests, args.concurrency)
+    report("one-by-one", latencies, token_counts, elapsed)
+    baseline = len(latencies) / elapsed
+
+    engine = ContinuousBatchingEngine(main.backend, main.device, args.max_batch_size, args.max_wait_ms,
+                                      max_length=main.max_length, stopper=main.stopper)
+    engine.start()
+    try:
+        latencies, token_counts, elapsed = await run_load(engine.generate, args.requests, args.concurrency)
+    finally:
+        engine.stop()
+    report("batched", latencies, token_counts, elapsed)
+    print(f"throughput gain: x{len(latencies) / elapsed / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Continuous batching benchmark")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-batch-size", type=int, default=config.MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=config.MAX_WAIT_MS)
+    asyncio.run(bench(parser.parse_args()))
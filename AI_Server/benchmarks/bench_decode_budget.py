@@ -0,0 +1,67 @@
+"""
+디코딩 예산 벤치마크: 고정 max_length=1024 vs 학습 데이터 기반 max_length + 문장 종료 조건
+
+AI_Server 디렉토리에서 실행:
+    python -m benchmarks.bench_decode_budget --num-situations 50
+
+같은 상황을 같은 seed 로 두 설정에서 한 번씩 생성해, 줄어든 디코더 스텝 수와 지연시간을 비교함
+"""
+import argparse
+import time
+
+import torch
+
+import main
+from benchmarks.common import load_heldout, percentile
+from decode_budget import load_routine_length_stats
+
+
+def run(situations, max_length, stopper, seed):
+    """상황마다 (디코더 스텝 수, 지연시간, 루틴 문장) 측정"""
+    results = []
+    for index, situation in enumerate(situations):
+        input_ids = main.compiler.encode(situation)
+        torch.manual_seed(seed + index)
+        start = time.perf_counter()
+        with torch.inference_mode():
+            output_ids = main.backend.generate(input_ids, max_length=max_length, stopper=stopper)
+        elapsed = time.perf_counter() - start
+        results.append((len(output_ids), elapsed, main.tokenizer.decode(output_ids, skip_special_tokens=True)))
+    return results
+
+
+def report(name, results):
+    steps = [r[0] for r in results]
+    latencies = [r[1] for r in results]
+    print(f"{name:10} "
+          f"steps mean {sum(steps) / len(steps):6.1f}  max {max(steps):5d}  "
+          f"p50 {percentile(latencies, 50):6.3f}s  p99 {percentile(latencies, 99):6.3f}s")
+
+
+def bench():
+    parser = argparse.ArgumentParser(description="Decode budget benchmark")
+    parser.add_argument("--num-situations", type=int, default=50)
+    parser.add_argument("--baseline-max-length", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"routine length stats: {load_routine_length_stats(main.tokenizer)}")
+    situations = [situation for situation, _ in load_heldout(main.tokenizer, args.num_situations)]
+
+    baseline = run(situations, args.baseline_max_length, None, args.seed)
+    adaptive = run(situations, main.max_length, main.stopper, args.seed)
+    report("fixed", baseline)
+    report("adaptive", adaptive)
+
+    saved = [b[0] - a[0] for b, a in zip(baseline, adaptive)]
+    same = sum(b[2] == a[2] for b, a in zip(baseline, adaptive))
+    baseline_time = sum(r[1] for r in baseline)
+    adaptive_time = sum(r[1] for r in adaptive)
+    print(f"max_length {args.baseline_max_length} -> {main.max_length}, "
+          f"saved steps mean {sum(saved) / len(saved):.1f}  max {max(saved)}")
+    print(f"total latency {baseline_time:.2f}s -> {adaptive_time:.2f}s "
+          f"(x{baseline_time / adaptive_time:.2f}), identical routines {same}/{len(situations)}")
+
+
+if __name__ == "__main__":
+    bench()
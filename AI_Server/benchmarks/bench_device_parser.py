@@ -0,0 +1,96 @@
+"""
+로컬 기기 제어 파서 vs LLM 파서 일치율 벤치마크
+
+AI_Server 디렉토리에서 실행:
+    # held-out 루틴을 LLM 파서로 한 번 파싱해 기록 (API 키 필요)
+    python -m benchmarks.bench_device_parser --record llm_parses.jsonl --num-routines 200
+    # 기록된 LLM 결과와 로컬 파서 결과 비교 (네트워크 없음)
+    python -m benchmarks.bench_device_parser --recorded llm_parses.jsonl
+
+일치율은 기기 집합, (기기, on/off), (기기, on/off, 상태) 단위로 보고하고,
+LOCAL_PARSER_MIN_CONFIDENCE 이상이라 LLM 을 건너뛰는 비율(coverage)과 그때의 일치율도 함께 보고함
+"""
+import argparse
+import json
+import time
+
+from transformers import T5TokenizerFast
+
+import config
+import device_parser
+import parsing_routine
+from benchmarks.common import load_heldout, percentile
+
+
+def record(path, num_routines):
+    tokenizer = T5TokenizerFast.from_pretrained(config.TOKENIZER_PATH)
+    with open(path, "w", encoding="utf-8") as f:
+        for index, (_, routine) in enumerate(load_heldout(tokenizer, num_routines)):
+            result = parsing_routine.parse_device_control_llm(routine)
+            f.write(json.dumps({"routine": routine, "llm": result}, ensure_ascii=False) + "\n")
+            print(f"[{index + 1}/{num_routines}] {routine}")
+
+
+def views(result):
+    """비교 단위별 집합: 기기, (기기, on/off), (기기, on/off, 상태)"""
+    updates = result["updates"] if result else []
+    return (
+        {u["appliance_id"] for u in updates},
+        {(u["appliance_id"], u["onoff"]) for u in updates},
+        {(u["appliance_id"], u["onoff"], u["state"]) for u in updates},
+    )
+
+
+def compare(path, min_confidence):
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records = [r for r in records if r["llm"] is not None]
+
+    matches = [[0, 0, 0], [0, 0, 0]]  # all, covered
+    covered = 0
+    latencies = []
+    mismatches = []
+    for r in records:
+        start = time.perf_counter()
+        local, confidence = device_parser.parse_locally(r["routine"])
+        latencies.append(time.perf_counter() - start)
+        if local is not None:
+            local = parsing_routine.DeviceControl.model_validate(local).model_dump()
+
+        is_covered = local is not None and confidence >= min_confidence
+        covered += is_covered
+        for level, (a, b) in enumerate(zip(views(local), views(r["llm"]))):
+            matches[0][level] += a == b
+            matches[1][level] += is_covered and a == b
+        if is_covered and views(local)[2] != views(r["llm"])[2]:
+            mismatches.append((r["routine"], local, r["llm"]))
+
+    total = len(records)
+    print(f"{total} recorded routines, local parse p50 {percentile(latencies, 50) * 1e3:.3f} ms  "
+          f"p99 {percentile(latencies, 99) * 1e3:.3f} ms")
+    print(f"coverage (confidence >= {min_confidence}): {covered / total:.1%}")
+    print(f"{'':10} {'devices':>8} {'on/off':>8} {'state':>8}")
+    print(f"{'all':10} " + " ".join(f"{m / total:8.1%}" for m in matches[0]))
+    if covered:
+        print(f"{'covered':10} " + " ".join(f"{m / covered:8.1%}" for m in matches[1]))
+
+    for routine, local, llm in mismatches[:10]:
+        print(f"\n{routine}\n  local: {json.dumps(local, ensure_ascii=False)}\n  llm  : {json.dumps(llm, ensure_ascii=False)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local device parser agreement benchmark")
+    parser.add_argument("--record", type=str, default=None, help="write LLM parses of held-out routines to this file")
+    parser.add_argument("--recorded", type=str, default="llm_parses.jsonl")
+    parser.add_argument("--num-routines", type=int, default=200)
+    parser.add_argument("--min-confidence", type=float, default=config.LOCAL_PARSER_MIN_CONFIDENCE)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.num_routines)
+    else:
+        compare(args.recorded, args.min_confidence)
+
+
+if __name__ == "__main__":
+    main()
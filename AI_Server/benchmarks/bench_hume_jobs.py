@@ -0,0 +1,132 @@
+"""
+Hume 작업 대기 방식 벤치마크: 요청마다 time.sleep(5) 폴링 (기존) vs 공유 poller (list-jobs) vs webhook
+vs webhook + 여러 파일 작업 묶기
+
+AI_Server 디렉토리에서 실행 (로컬 fake Hume 서버와 callback 수신 서버를 같은 프로세스에서 띄움, API 키 불필요):
+    python -m benchmarks.bench_hume_jobs --requests 4 16 64 --processing-ms 1500
+
+요청마다 (완료까지 걸린 시간 - 작업 처리 시간) 을 대기 오버헤드로 보고, 모드별 상태 조회 요청 수 (개별 + list-jobs) 도
+함께 보고함 (공유 poller 는 동시 요청 수가 늘어도 거의 일정해야 함). 제출된 Hume 작업 수도 함께 보고함.
+각 모드는 예측 결과에서 감정을 뽑을 수 있는지도 확인함
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import wave
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+import audio_analysis
+from benchmarks import fake_hume_server
+from benchmarks.common import percentile
+from hume_jobs import HumeJobWaiter
+from src.hume.client import AsyncHumeBatchAPI, HumeBatchAPI
+
+
+def write_silence(path, seconds=1.0, sample_rate=16000):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(b"\0\0" * int(seconds * sample_rate))
+
+
+def sleep_poll(client, file_path, interval):
+    """기존 analyze_with_hume 방식: 상태를 interval 마다 동기 조회"""
+    job_id = client.analyze_audio(file_path)
+    while True:
+        status = client.get_job_status(job_id)
+        if status == "COMPLETED":
+            return client.get_predictions(job_id)
+        if status == "FAILED":
+            return {"error": "Hume analysis failed"}
+        time.sleep(interval)
+
+
+async def start_callback_receiver(port, waiter_ref):
+    app = FastAPI()
+
+    @app.post("/hume_callback/")
+    async def hume_callback(request: Request):
+        payload = await request.json()
+        waiter_ref[0].notify(payload["job_id"], payload["status"], payload.get("predictions"))
+        return {"status": "ok"}
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    asyncio.ensure_future(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}/hume_callback/"
+
+
+def poll_requests(stats):
+    return stats["status_requests"] + stats["list_requests"]
+
+
+async def run_mode(name, analyze, requests, args, file_path, hume_app):
+    before = poll_requests(hume_app.state.stats)
+    jobs_before = hume_app.state.stats["submitted"]
+    overheads, emotions = [], 0
+
+    async def one():
+        nonlocal emotions
+        start = time.perf_counter()
+        predictions = await analyze(file_path)
+        overheads.append(time.perf_counter() - start - args.processing_ms / 1000)
+        emotions += audio_analysis.get_top_emotion(predictions) is not None
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    print(f"{name:12} x{requests:<4d} overhead p50 {percentile(overheads, 50):6.2f}s  "
+          f"p99 {percentile(overheads, 99):6.2f}s  "
+          f"status requests {poll_requests(hume_app.state.stats) - before:5d}  "
+          f"jobs {hume_app.state.stats['submitted'] - jobs_before:4d}  emotions {emotions}/{requests}")
+
+
+async def bench(args):
+    hume_server, hume_app, base_url = fake_hume_server.start_in_thread(args.port, args.processing_ms / 1000)
+    waiter_ref = [None]
+    receiver, callback_url = await start_callback_receiver(args.callback_port, waiter_ref)
+
+    fd, file_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    write_silence(file_path)
+    client = HumeBatchAPI(base_url)
+    async_client = AsyncHumeBatchAPI(base_url)
+    try:
+        for requests in args.requests:
+            await run_mode(
+                "sleep-poll", lambda path: asyncio.to_thread(sleep_poll, client, path, args.sleep_interval),
+                requests, args, file_path, hume_app,
+            )
+
+            waiter_ref[0] = HumeJobWaiter(async_client, callback_url="", max_files=1)
+            await run_mode("shared-poll", waiter_ref[0].analyze, requests, args, file_path, hume_app)
+
+            waiter_ref[0] = HumeJobWaiter(async_client, callback_url=callback_url, max_files=1)
+            await run_mode("webhook", waiter_ref[0].analyze, requests, args, file_path, hume_app)
+
+            waiter_ref[0] = HumeJobWaiter(
+                async_client, callback_url=callback_url, batch_window_ms=args.batch_window_ms, max_files=args.max_files
+            )
+            await run_mode("batched", waiter_ref[0].analyze, requests, args, file_path, hume_app)
+    finally:
+        os.remove(file_path)
+        client.close()
+        await async_client.aclose()
+        receiver.should_exit = True
+        hume_server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hume job completion benchmark")
+    parser.add_argument("--requests", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--processing-ms", type=float, default=1500)
+    parser.add_argument("--sleep-interval", type=float, default=5.0)
+    parser.add_argument("--batch-window-ms", type=float, default=50)
+    parser.add_argument("--max-files", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--callback-port", type=int, default=8201)
+    asyncio.run(bench(parser.parse_args()))
@@ -0,0 +1,62 @@
+"""
+긴 음성 변환 벤치마크: 한 번에 recognize (기존, 60초 초과 시 실패) vs 무음 구간 분할 후 순차 / 병렬 변환
+
+AI_Server 디렉토리에서 실행 (로컬 fake SpeechClient 사용, Google 자격 증명 불필요):
+    python -m benchmarks.bench_long_audio --minutes 3 --workers 1 4
+
+말소리 (잡음) 와 무음이 번갈아 나오는 음성을 만들어, 분할된 조각 수와 조각 길이, 걸린 시간을 보고함
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.fake_speech_client import FakeSpeechClient
+from src.google_stt.analyzer import GoogleVoiceSentimentAnalyzer
+from src.google_stt.config import SAMPLE_RATE, MAX_SYNC_SECONDS, MIN_SILENCE_MS
+from src.google_stt.segmenter import split_at_silence
+
+
+def synthesize(minutes, seed=0):
+    """2~8초 말소리와 0.3~1.2초 무음이 번갈아 나오는 16-bit PCM"""
+    rng = random.Random(seed)
+    parts, total = [], 0
+    while total < minutes * 60 * SAMPLE_RATE:
+        speech = int(rng.uniform(2, 8) * SAMPLE_RATE)
+        silence = int(rng.uniform(0.3, 1.2) * SAMPLE_RATE)
+        parts.append(np.random.default_rng(rng.randrange(1 << 30)).integers(-8000, 8000, speech, dtype=np.int16))
+        parts.append(np.zeros(silence, dtype=np.int16))
+        total += speech + silence
+    return np.concatenate(parts).tobytes()
+
+
+def bench(args):
+    pcm = synthesize(args.minutes)
+    client = FakeSpeechClient("말소리 조각", latency=args.latency_ms / 1000, batch_rtf=args.batch_rtf)
+    analyzer = GoogleVoiceSentimentAnalyzer(speech_client=client, language_client=object())
+
+    start = time.perf_counter()
+    try:
+        analyzer._recognize(pcm, SAMPLE_RATE)
+        print(f"single     {time.perf_counter() - start:6.2f}s")
+    except ValueError as e:
+        print(f"single     failed: {str(e)}")
+
+    chunks = split_at_silence(pcm, SAMPLE_RATE, MAX_SYNC_SECONDS, MIN_SILENCE_MS)
+    seconds = [len(chunk) / 2 / SAMPLE_RATE for chunk in chunks]
+    print(f"{len(pcm) / 2 / SAMPLE_RATE:.0f}s audio -> {len(chunks)} chunks "
+          f"({min(seconds):.1f}s ~ {max(seconds):.1f}s)")
+    for workers in args.workers:
+        start = time.perf_counter()
+        analyzer.transcribe_long_audio(pcm, SAMPLE_RATE, max_workers=workers)
+        print(f"chunked x{workers:<2d} {time.perf_counter() - start:6.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Long audio transcription benchmark")
+    parser.add_argument("--minutes", type=float, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--batch-rtf", type=float, default=0.05)
+    bench(parser.parse_args())
@@ -0,0 +1,104 @@
+"""
+기기 제어 LLM 파서 벤치마크: 요청마다 ChatAnthropic + chain 생성 (기존) vs RoutineParserService (abatch, 공유 클라이언트)
+
+AI_Server 디렉토리에서 실행 (로컬 stand-in LLM 서버를 같은 프로세스에서 띄움, API 키 불필요):
+    python -m benchmarks.bench_parser_service --routines 64 --concurrency 16 --latency-ms 800
+
+로컬 파서는 끄고 모든 루틴을 LLM 경로로 보냄
+"""
+import argparse
+import asyncio
+import time
+
+from langchain_anthropic import ChatAnthropic
+
+import config
+import parsing_routine
+from benchmarks import fake_llm_server
+from benchmarks.common import percentile
+
+ROUTINES = [
+    "시원해지시게끔 에어컨을 24도로 설정하고, 정수기에서 냉수 준비해드릴게요.",
+    "편안한 취침을 위해 에어컨을 26도로 설정하고 월패드로 조명을 어둡게 하고 TV를 끌게요.",
+    "상쾌한 아침을 위해 로봇청소기 청소를 시작하고 공기청정기를 강하게 켤게요.",
+    "영화 감상을 위해 에어컨을 24도로 맞추고 TV를 켜고 월패드로 조명을 어둡게 설정할게요.",
+]
+
+
+def report(name, latencies, elapsed, failures):
+    print(f"{name:10} "
+          f"p50 {percentile(latencies, 50):6.2f}s  p99 {percentile(latencies, 99):6.2f}s  "
+          f"{len(latencies) / elapsed:6.2f} routines/s  failures {failures}")
+
+
+async def per_call(base_url, routines, concurrency):
+    """기존 방식: 호출마다 새 ChatAnthropic 과 chain, 동기 invoke 를 스레드에서 실행"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    def parse(text):
+        llm = ChatAnthropic(model=config.PARSER_MODEL, temperature=0.3, base_url=base_url, api_key="fake")
+        return parsing_routine.create_parser_chain(llm).invoke({"text": text})
+
+    async def one(text):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(parse, text)
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(text) for text in routines))
+    return latencies, failures
+
+
+async def batched(service, routines, batch_size):
+    """RoutineParserService.aparse_many 로 batch_size 개씩 동시에"""
+    latencies, failures = [], 0
+
+    async def one(batch):
+        nonlocal failures
+        start = time.perf_counter()
+        results = await service.aparse_many(batch)
+        elapsed = time.perf_counter() - start
+        failures += sum(result is None for result in results)
+        latencies.extend([elapsed] * len(batch))
+
+    await asyncio.gather(*(one(routines[i:i + batch_size]) for i in range(0, len(routines), batch_size)))
+    return latencies, failures
+
+
+async def bench(args):
+    server, base_url = fake_llm_server.start_in_thread(args.port, args.latency_ms / 1000)
+    routines = [ROUTINES[i % len(ROUTINES)] for i in range(args.routines)]
+    try:
+        start = time.perf_counter()
+        latencies, failures = await per_call(base_url, routines, args.concurrency)
+        report("per-call", latencies, time.perf_counter() - start, failures)
+
+        service = parsing_routine.RoutineParserService(
+            base_url=base_url,
+            api_key="fake",
+            requests_per_second=args.requests_per_second,
+            max_burst=args.concurrency,
+            max_concurrency=args.concurrency,
+            use_local=False,
+        )
+        start = time.perf_counter()
+        latencies, failures = await batched(service, routines, args.batch_size)
+        report("service", latencies, time.perf_counter() - start, failures)
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM parser service benchmark")
+    parser.add_argument("--routines", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--requests-per-second", type=float, default=100)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--port", type=int, default=8100)
+    asyncio.run(bench(parser.parse_args()))
@@ -0,0 +1,110 @@
+"""
+서빙 정밀도(fp32 / bf16 / int8) 비교 벤치마크: tokens/sec, RSS, fp32 대비 루틴 일치율
+
+AI_Server 디렉토리에서 실행:
+    python -m benchmarks.bench_precision --modes fp32 bf16 int8 --num-situations 50
+
+RSS 를 모드별로 따로 재기 위해 각 모드는 별도 프로세스에서 실행됨.
+일치율은 greedy decoding 결과를 parse_device_control 로 파싱한 (기기, on/off, 상태) 집합을 fp32 결과와 비교함
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import psutil
+import torch
+from transformers import T5TokenizerFast
+
+import config
+import model_loader
+from benchmarks.common import load_heldout
+from decode_budget import resolve_max_length
+from prompt_compiler import PromptCompiler
+
+
+def run_mode(precision, num_situations, max_length):
+    """한 정밀도로 held-out 상황들의 루틴을 생성하고 속도/메모리 측정"""
+    device = torch.device("cpu")
+    tokenizer = T5TokenizerFast.from_pretrained(config.TOKENIZER_PATH)
+    model = model_loader.load_model(device, precision)
+    rss = psutil.Process().memory_info().rss
+    compiler = PromptCompiler(tokenizer)
+    max_length = max_length or resolve_max_length(tokenizer)
+
+    routines = []
+    generated_tokens = 0
+    elapsed = 0.0
+    with torch.inference_mode():
+        for situation, _ in load_heldout(tokenizer, num_situations):
+            input_ids = torch.tensor([compiler.encode(situation)], device=device)
+            start = time.perf_counter()
+            # greedy so differences come from precision, not sampling
+            outputs = model.generate(
+                input_ids,
+                max_length=max_length,
+                no_repeat_ngram_size=config.NO_REPEAT_NGRAM_SIZE,
+                do_sample=False,
+            )
+            elapsed += time.perf_counter() - start
+            generated_tokens += outputs.shape[1] - 1
+            routines.append(tokenizer.decode(outputs[0], skip_special_tokens=True))
+
+    return {
+        "precision": precision,
+        "rss_mb": rss / 2**20,
+        "tokens_per_sec": generated_tokens / elapsed,
+        "routines": routines,
+    }
+
+
+def device_states(routine):
+    """루틴 문장을 (기기 ID, on/off, 상태) 집합으로 변환"""
+    import parsing_routine
+
+    result = parsing_routine.parse_device_control(routine)
+    if not result:
+        return None
+    return {(u["appliance_id"], u["onoff"], u["state"]) for u in result["updates"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serving precision benchmark")
+    parser.add_argument("--modes", nargs="+", default=list(model_loader.PRECISIONS), choices=model_loader.PRECISIONS)
+    parser.add_argument("--num-situations", type=int, default=50)
+    parser.add_argument("--max-length", type=int, default=config.MAX_LENGTH, help="0 = derive from the training CSV")
+    parser.add_argument("--no-parse", action="store_true", help="only compare routine text, skip the parser")
+    parser.add_argument("--worker", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_mode(args.worker, args.num_situations, args.max_length), ensure_ascii=False))
+        return
+
+    results = {}
+    for mode in dict.fromkeys(["fp32"] + args.modes):
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_precision", "--worker", mode,
+             "--num-situations", str(args.num_situations), "--max-length", str(args.max_length)],
+            capture_output=True, text=True, check=True,
+        )
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    reference = results["fp32"]["routines"]
+    reference_states = None if args.no_parse else [device_states(r) for r in reference]
+
+    print(f"{'mode':6} {'tok/s':>8} {'RSS MB':>8} {'text match':>11} {'device/state match':>19}")
+    for mode in args.modes:
+        result = results[mode]
+        routines = result["routines"]
+        text_match = sum(a == b for a, b in zip(routines, reference)) / len(reference)
+        state_match = ""
+        if reference_states is not None:
+            states = reference_states if mode == "fp32" else [device_states(r) for r in routines]
+            state_match = f"{sum(a == b for a, b in zip(states, reference_states)) / len(reference):.1%}"
+        print(f"{mode:6} {result['tokens_per_sec']:8.1f} {result['rss_mb']:8.0f} {text_match:11.1%} {state_match:>19}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+요청당 토크나이즈 시간 마이크로벤치마크: 전체 프롬프트 토크나이즈 vs PromptCompiler
+
+AI_Server 디렉토리에서 실행:
+    python -m benchmarks.bench_prompt_compiler --iterations 2000
+"""
+import argparse
+import time
+
+from transformers import T5TokenizerFast
+
+import config
+from prompt_compiler import PromptCompiler
+
+SITUATIONS = [
+    "퇴근하고 집에 왔는데 너무 더워.",
+    "주말인데 빨래가 너무 밀렸어. (짜증)",
+    "새벽에 갑자기 영화 보고 싶네.",
+    "오늘 밤하늘이 맑아서 별을 보고 싶어. (평온)",
+]
+
+
+def time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(SITUATIONS[i % len(SITUATIONS)])
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt tokenization benchmark")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--max-length", type=int, default=512)
+    args = parser.parse_args()
+
+    tokenizer = T5TokenizerFast.from_pretrained(config.TOKENIZER_PATH)
+    compiler = PromptCompiler(tokenizer)
+    print(f"prefix tokens: {len(compiler.prefix_ids)}, exact splicing: {compiler.exact}")
+
+    for situation in SITUATIONS:
+        assert compiler.encode(situation) == tokenizer(compiler.render(situation)).input_ids
+
+    full = time_per_call(lambda s: tokenizer(compiler.render(s)).input_ids, args.iterations)
+    spliced = time_per_call(compiler.encode, args.iterations)
+    print(f"full prompt      {full * 1e6:8.1f} us/request")
+    print(f"compiled prompt  {spliced * 1e6:8.1f} us/request  (x{full / spliced:.1f})")
+
+    # training path: truncation + padding to max_length
+    full = time_per_call(
+        lambda s: tokenizer(compiler.render(s), max_length=args.max_length, truncation=True, padding='max_length').input_ids,
+        args.iterations,
+    )
+    spliced = time_per_call(lambda s: compiler.encode(s, max_length=args.max_length, padding=True), args.iterations)
+    print(f"full prompt (padded)      {full * 1e6:8.1f} us/request")
+    print(f"compiled prompt (padded)  {spliced * 1e6:8.1f} us/request  (x{full / spliced:.1f})")
+
+
+if __name__ == "__main__":
+    main()
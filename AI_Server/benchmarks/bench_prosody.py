@@ -0,0 +1,125 @@
+"""
+로컬 운율 감정 추정기 vs Hume 일치율 / 지연 벤치마크
+
+AI_Server 디렉토리에서 실행:
+    # 디렉토리의 wav 들을 Hume 으로 한 번 분석해 옆에 <이름>.hume.json 으로 기록 (API 키 필요)
+    python -m benchmarks.bench_prosody --record recordings/
+    # 기록된 Hume 결과와 로컬 추정기 비교 (네트워크 없음)
+    python -m benchmarks.bench_prosody --recorded recordings/
+    # 기록의 80% 로 분류기를 학습해 PROSODY_MODEL_PATH 에 저장하고, 나머지 20% 로 기본 / 학습 분류기 비교
+    python -m benchmarks.bench_prosody --recorded recordings/ --fit
+
+일치율은 최고 감정이 같은 비율 (top-1), Hume 최고 감정이 로컬 상위 5 개 안에 드는 비율 (top-5),
+53 개 감정 점수 순위의 Spearman 상관 평균으로 보고함
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+import numpy as np
+
+import audio_analysis
+import config
+import prosody
+from benchmarks.common import percentile
+from hume_jobs import HumeJobWaiter
+from src.google_stt.preprocess import decode_wav, resample
+from src.google_stt.config import SAMPLE_RATE
+
+
+def hume_path(wav_path):
+    return os.path.splitext(wav_path)[0] + ".hume.json"
+
+
+async def record(directory):
+    waiter = HumeJobWaiter(callback_url="")
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".wav"))
+    paths = [path for path in paths if not os.path.exists(hume_path(path))]
+    results = await asyncio.gather(*(waiter.analyze(path) for path in paths))
+    for path, predictions in zip(paths, results):
+        if isinstance(predictions, dict) and "error" in predictions:
+            print(f"{path}: {predictions['error']}")
+            continue
+        with open(hume_path(path), "w", encoding="utf-8") as f:
+            json.dump(predictions, f)
+        print(f"{path}: {audio_analysis.get_top_emotion(predictions)}")
+    await waiter.client.aclose()
+
+
+def scores(predictions):
+    """(첫 발화의) 감정 점수를 prosody.LABELS 순서의 벡터로 (get_top_emotion 과 같은 위치를 읽음)"""
+    prediction = predictions[0]["results"]["predictions"][0]
+    emotions = prediction["models"]["prosody"]["grouped_predictions"][0]["predictions"][0]["emotions"]
+    by_name = {emotion["name"]: emotion["score"] for emotion in emotions}
+    return np.array([by_name.get(label, 0.0) for label in prosody.LABELS], dtype=np.float32)
+
+
+def load_recorded(directory):
+    records = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith(".wav") and os.path.exists(hume_path(path)):
+            with open(hume_path(path), encoding="utf-8") as f:
+                records.append((path, scores(json.load(f))))
+    return records
+
+
+def features(path):
+    samples, sample_rate = decode_wav(path)
+    return prosody.extract_features(resample(samples.mean(axis=1), sample_rate, SAMPLE_RATE), SAMPLE_RATE)
+
+
+def ranks(values):
+    return np.argsort(np.argsort(values))
+
+
+def evaluate(name, classifier, records):
+    latencies, top1, top5, spearman = [], 0, 0, []
+    for path, hume in records:
+        start = time.perf_counter()
+        predictions = prosody.analyze(path, classifier)
+        latencies.append(time.perf_counter() - start)
+        local = scores(predictions)
+        top1 += local.argmax() == hume.argmax()
+        top5 += hume.argmax() in np.argsort(local)[-5:]
+        spearman.append(np.corrcoef(ranks(local), ranks(hume))[0, 1])
+    total = len(records)
+    print(f"{name:10} {total:4d} clips  latency p50 {percentile(latencies, 50) * 1e3:6.1f} ms  "
+          f"p99 {percentile(latencies, 99) * 1e3:6.1f} ms  top-1 {top1 / total:6.1%}  top-5 {top5 / total:6.1%}  "
+          f"spearman {np.mean(spearman):+.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local prosody estimator agreement benchmark")
+    parser.add_argument("--record", type=str, default=None, help="analyze the wavs in this directory with Hume")
+    parser.add_argument("--recorded", type=str, default="recordings")
+    parser.add_argument("--fit", action="store_true", help="train on 80%% of the recordings, evaluate on the rest")
+    parser.add_argument("--model-out", type=str, default=config.PROSODY_MODEL_PATH)
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.record))
+        return
+
+    records = load_recorded(args.recorded)
+    if not args.fit:
+        evaluate("current", prosody.get_classifier(), records)
+        return
+
+    random.Random(0).shuffle(records)
+    split = int(len(records) * 0.8)
+    train, test = records[:split], records[split:]
+    classifier = prosody.ProsodyClassifier.fit(
+        [features(path) for path, _ in train], [hume for _, hume in train]
+    )
+    classifier.save(args.model_out)
+    print(f"trained on {len(train)} clips -> {args.model_out}")
+    evaluate("default", prosody.ProsodyClassifier.default(), test)
+    evaluate("trained", classifier, test)
+
+
+if __name__ == "__main__":
+    main()
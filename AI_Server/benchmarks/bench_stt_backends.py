@@ -0,0 +1,118 @@
+"""
+STT 백엔드 벤치마크: google (Speech-to-Text API) vs local (CPU Whisper) vs fake 의 지연 / 신뢰도 / 글자 오류율
+
+AI_Server 디렉토리에서 실행:
+    # 디렉토리의 wav 들로 비교 (옆에 <이름>.txt 정답 문장이 있으면 CER 도 보고함)
+    python -m benchmarks.bench_stt_backends --input recordings/ --backends google local
+    # Google 대신 로컬 fake SpeechClient (왕복 지연 --google-latency-ms) 로, 자격 증명 없이 local 모델과 비교
+    python -m benchmarks.bench_stt_backends --input recordings/ --backends google local --fake-google
+
+--input 이 없으면 합성한 음성 하나를 씀 (지연만 의미 있음). 각 백엔드는 첫 호출 전에 load() 로 미리 준비함
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+import config
+from benchmarks.common import percentile
+from benchmarks.fake_speech_client import FakeSpeechClient
+from src.google_stt.analyzer import GoogleVoiceSentimentAnalyzer
+from src.google_stt.preprocess import encode_wav
+from src.stt.backends import REGISTRY, GoogleSTTBackend, create_backend
+
+
+def synthesize(seconds=4.0, seed=0):
+    """0.5초 무음 + 배음 (음높이가 천천히 변함) + 0.5초 무음, 16kHz 16-bit wav"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * 16000)) / 16000
+    phase = 2 * np.pi * np.cumsum(140 + 30 * np.sin(2 * np.pi * 0.7 * t)) / 16000
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8)) * np.clip(np.sin(2 * np.pi * 1.5 * t), 0, None)
+    signal = np.concatenate([np.zeros(8000), 0.2 * voice + 0.002 * rng.standard_normal(len(t)), np.zeros(8000)])
+    return encode_wav(signal.astype(np.float32), 16000)
+
+
+def load_inputs(path):
+    """(이름, wav bytes, 정답 문장 또는 None) 리스트"""
+    if path is None:
+        return [("synthesized", synthesize(), None)]
+    paths = [path] if os.path.isfile(path) else sorted(
+        os.path.join(path, name) for name in os.listdir(path) if name.endswith(".wav")
+    )
+    inputs = []
+    for wav_path in paths:
+        reference_path = os.path.splitext(wav_path)[0] + ".txt"
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, encoding="utf-8") as f:
+                reference = f.read().strip()
+        with open(wav_path, "rb") as f:
+            inputs.append((os.path.basename(wav_path), f.read(), reference))
+    return inputs
+
+
+def edit_distance(a, b):
+    row = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        previous, row[0] = row[0], i
+        for j, y in enumerate(b, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (x != y))
+    return row[-1]
+
+
+def cer(text, reference):
+    """공백을 뺀 글자 단위 오류율 (한국어는 띄어쓰기가 흔들려 단어보다 글자로 비교)"""
+    text, reference = text.replace(" ", ""), reference.replace(" ", "")
+    return edit_distance(text, reference) / max(len(reference), 1)
+
+
+def make_backend(name, args):
+    if name == "google" and args.fake_google:
+        client = FakeSpeechClient("오늘 하루 너무 피곤했어", latency=args.google_latency_ms / 1000)
+        return GoogleSTTBackend(GoogleVoiceSentimentAnalyzer(speech_client=client, language_client=object()))
+    if name == "local":
+        return create_backend(name, model_dir=args.model_dir)
+    return create_backend(name)
+
+
+def bench(args):
+    inputs = load_inputs(args.input)
+    for name in args.backends:
+        backend = make_backend(name, args)
+        start = time.perf_counter()
+        backend.load()
+        load_seconds = time.perf_counter() - start
+
+        latencies, confidences, errors, failed = [], [], [], 0
+        for clip, wav, reference in inputs:
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                result = backend.transcribe(wav)
+                latencies.append(time.perf_counter() - start)
+            if result is None:
+                failed += 1
+                continue
+            text, confidence = result
+            confidences.append(confidence)
+            if reference is not None:
+                errors.append(cer(text, reference))
+            if args.verbose:
+                print(f"  {name:6} {clip}: {text} ({confidence:.2f})")
+
+        summary = f"CER {np.mean(errors):6.1%}" if errors else "CER    n/a"
+        print(f"{name:6} load {load_seconds:6.2f}s  {len(inputs):3d} clips  "
+              f"latency p50 {percentile(latencies, 50) * 1e3:7.1f} ms  p99 {percentile(latencies, 99) * 1e3:7.1f} ms  "
+              f"confidence {np.mean(confidences) if confidences else 0:.2f}  {summary}  failed {failed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="STT backend latency / accuracy benchmark")
+    parser.add_argument("--input", type=str, default=None, help="wav file or directory of wavs (+ <name>.txt)")
+    parser.add_argument("--backends", type=str, nargs="+", choices=list(REGISTRY), default=["google", "local"])
+    parser.add_argument("--runs", type=int, default=3, help="transcriptions per clip")
+    parser.add_argument("--model-dir", type=str, default=config.STT_LOCAL_MODEL_DIR)
+    parser.add_argument("--fake-google", action="store_true", help="use the local fake SpeechClient for google")
+    parser.add_argument("--google-latency-ms", type=float, default=300)
+    parser.add_argument("--verbose", action="store_true")
+    bench(parser.parse_args())
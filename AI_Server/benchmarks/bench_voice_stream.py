@@ -0,0 +1,83 @@
+"""
+음성 인식 대기 시간 벤치마크: 업로드가 끝난 뒤 recognize (기존) vs 업로드 중 streaming_recognize (StreamingTranscriber)
+
+AI_Server 디렉토리에서 실행 (로컬 fake SpeechClient 사용, Google 자격 증명 불필요):
+    python -m benchmarks.bench_voice_stream --speech-seconds 3 --silence-seconds 1.5 --runs 5
+
+녹음하면서 실시간으로 청크를 올리는 상황을 흉내 내고, 업로드 시작부터 첫 중간 결과 / 최종 결과까지의 시간을 보고함
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from google.cloud import speech
+
+from benchmarks.common import percentile
+from benchmarks.fake_speech_client import FakeSpeechClient
+from speech_stream import StreamingTranscriber
+from src.google_stt.config import SAMPLE_RATE
+
+TRANSCRIPT = "오늘 너무 더워서 집에 오자마자 씻고 쉬고 싶어"
+
+
+def synthesize(speech_seconds, silence_seconds):
+    """말소리 (0 이 아닌 잡음) 뒤에 무음이 이어지는 16-bit PCM"""
+    speech_bytes = bytes(random.randint(1, 255) for _ in range(int(SAMPLE_RATE * speech_seconds) * 2))
+    return speech_bytes + bytes(int(SAMPLE_RATE * silence_seconds) * 2)
+
+
+async def upload(pcm, chunk_ms):
+    """녹음 속도 그대로 chunk_ms 씩 올라오는 청크"""
+    size = int(SAMPLE_RATE * chunk_ms / 1000) * 2
+    for i in range(0, len(pcm), size):
+        await asyncio.sleep(chunk_ms / 1000)
+        yield pcm[i:i + size]
+
+
+async def batch(client, pcm, chunk_ms):
+    start = time.perf_counter()
+    content = b"".join([chunk async for chunk in upload(pcm, chunk_ms)])
+    config = speech.RecognitionConfig(
+        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16, sample_rate_hertz=SAMPLE_RATE, language_code="ko-KR"
+    )
+    await asyncio.to_thread(client.recognize, config, speech.RecognitionAudio(content=content))
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def streaming(transcriber, pcm, chunk_ms):
+    start = time.perf_counter()
+    first = None
+    async for kind, _ in transcriber.transcribe(upload(pcm, chunk_ms)):
+        if first is None:
+            first = time.perf_counter() - start
+        if kind == "final":
+            break
+    return first, time.perf_counter() - start
+
+
+async def bench(args):
+    client = FakeSpeechClient(TRANSCRIPT, latency=args.latency_ms / 1000)
+    transcriber = StreamingTranscriber(speech_client=client)
+    pcm = synthesize(args.speech_seconds, args.silence_seconds)
+    print(f"audio {args.speech_seconds + args.silence_seconds:.1f}s ({args.speech_seconds:.1f}s speech)")
+    for name, run in [("recognize", lambda: batch(client, pcm, args.chunk_ms)),
+                      ("streaming", lambda: streaming(transcriber, pcm, args.chunk_ms))]:
+        firsts, finals = [], []
+        for _ in range(args.runs):
+            first, final = await run()
+            firsts.append(first)
+            finals.append(final)
+        print(f"{name:10} first transcript p50 {percentile(firsts, 50):5.2f}s  "
+              f"final transcript p50 {percentile(finals, 50):5.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming speech recognition benchmark")
+    parser.add_argument("--speech-seconds", type=float, default=3.0)
+    parser.add_argument("--silence-seconds", type=float, default=1.5)
+    parser.add_argument("--chunk-ms", type=float, default=100)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(bench(parser.parse_args()))
@@ -0,0 +1,25 @@
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from prompt_compiler import PromptCompiler
+
+DATASET_PATH = "../preprocessed_dataset.csv"
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def load_heldout(tokenizer, limit=None, dataset_path=DATASET_PATH):
+    """학습 스크립트와 같은 분할(test_size=0.05, random_state=42)의 validation 셋을 (상황, 루틴) 리스트로 반환"""
+    df = pd.read_csv(dataset_path)
+    _, val_data = train_test_split(df, test_size=0.05, random_state=42)
+    compiler = PromptCompiler(tokenizer)
+
+    pairs = []
+    for prompt, routine in zip(val_data['situation'], val_data['routine']):
+        situation = compiler.split(prompt)
+        pairs.append((situation if situation is not None else prompt, routine))
+    return pairs[:limit] if limit else pairs
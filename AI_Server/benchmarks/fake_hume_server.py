@@ -0,0 +1,121 @@
+"""
+Hume batch API(/v0/batch/jobs) 를 흉내 내는 로컬 서버 (Hume 작업 대기 벤치마크용)
+
+AI_Server 디렉토리에서 단독 실행:
+    python -m benchmarks.fake_hume_server --port 8200 --processing-ms 1500
+    HUME_BASE_URL=http://127.0.0.1:8200/v0/batch/jobs 로 서버를 띄우면 실제 Hume 대신 사용
+
+작업은 processing 만큼 뒤에 COMPLETED 가 되고, 요청에 callback_url 이 있으면 그 주소로 완료를 POST 함.
+상태 조회 (개별 / list-jobs) 요청 수는 /stats 에서 확인
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+
+EMOTIONS = ["Calmness", "Joy", "Tiredness", "Anger", "Sadness", "Excitement", "Boredom", "Anxiety"]
+
+
+def fake_predictions(filenames):
+    """audio_analysis.get_top_emotion 이 읽는 모양의 prosody 결과 (파일마다 하나)"""
+    predictions = []
+    for filename in filenames:
+        scores = sorted((random.random() for _ in EMOTIONS), reverse=True)
+        emotions = [{"name": name, "score": score} for name, score in zip(random.sample(EMOTIONS, len(EMOTIONS)), scores)]
+        predictions.append({
+            "file": filename,
+            "models": {"prosody": {"grouped_predictions": [{"id": "unknown", "predictions": [
+                {"text": "", "confidence": 0.9, "emotions": emotions}
+            ]}]}},
+        })
+    return [{"source": {"type": "file"}, "results": {"predictions": predictions, "errors": []}}]
+
+
+def create_app(processing):
+    app = FastAPI()
+    app.state.jobs = {}
+    app.state.stats = {"submitted": 0, "files": 0, "status_requests": 0, "list_requests": 0, "callbacks": 0}
+
+    async def complete(job_id, callback_url):
+        await asyncio.sleep(processing)
+        job = app.state.jobs[job_id]
+        job["status"] = "COMPLETED"
+        if callback_url:
+            async with httpx.AsyncClient() as client:
+                try:
+                    await client.post(callback_url, json={"job_id": job_id, "status": "COMPLETED"}, timeout=5)
+                    app.state.stats["callbacks"] += 1
+                except httpx.HTTPError as e:
+                    print(f"Callback to {callback_url} failed: {str(e)}")
+
+    @app.post("/v0/batch/jobs")
+    async def start_job(request: Request):
+        form = await request.form()
+        # the client sends the job options as a file part named "json"
+        options = form.get("json")
+        options = json.loads(await options.read() if hasattr(options, "read") else options) if options else {}
+        filenames = [value.filename for key, value in form.multi_items() if key == "file"]
+        job_id = str(uuid.uuid4())
+        app.state.jobs[job_id] = {"status": "IN_PROGRESS", "files": filenames, "created": int(time.time() * 1000)}
+        app.state.stats["submitted"] += 1
+        app.state.stats["files"] += len(filenames)
+        asyncio.ensure_future(complete(job_id, options.get("callback_url")))
+        return {"job_id": job_id}
+
+    @app.get("/v0/batch/jobs")
+    async def list_jobs(limit: int = 100, when: str = "", timestamp_ms: int = 0, direction: str = "asc"):
+        app.state.stats["list_requests"] += 1
+        jobs = sorted(app.state.jobs.items(), key=lambda item: item[1]["created"], reverse=direction == "desc")
+        if when == "after":
+            jobs = [(job_id, job) for job_id, job in jobs if job["created"] > timestamp_ms]
+        elif when == "before":
+            jobs = [(job_id, job) for job_id, job in jobs if job["created"] < timestamp_ms]
+        return [
+            {"job_id": job_id, "state": {"status": job["status"], "created_timestamp_ms": job["created"]}}
+            for job_id, job in jobs[:limit]
+        ]
+
+    @app.get("/v0/batch/jobs/{job_id}")
+    async def job_status(job_id: str):
+        app.state.stats["status_requests"] += 1
+        if job_id not in app.state.jobs:
+            raise HTTPException(status_code=404, detail="Unknown job")
+        return {"job_id": job_id, "state": {"status": app.state.jobs[job_id]["status"]}}
+
+    @app.get("/v0/batch/jobs/{job_id}/predictions")
+    async def job_predictions(job_id: str):
+        job = app.state.jobs.get(job_id)
+        if job is None or job["status"] != "COMPLETED":
+            raise HTTPException(status_code=400, detail="Job not completed")
+        return fake_predictions(job["files"])
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.stats
+
+    return app
+
+
+def start_in_thread(port, processing):
+    """백그라운드 스레드에서 서버를 띄우고 (server, app, jobs base_url) 반환"""
+    app = create_app(processing)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, app, f"http://127.0.0.1:{port}/v0/batch/jobs"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Hume batch API")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--processing-ms", type=float, default=1500)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.processing_ms / 1000), host="127.0.0.1", port=args.port)
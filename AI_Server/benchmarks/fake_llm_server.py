@@ -0,0 +1,69 @@
+"""
+Anthropic Messages API 를 흉내 내는 로컬 LLM 서버 (파서 서비스 벤치마크용)
+
+AI_Server 디렉토리에서 단독 실행:
+    python -m benchmarks.fake_llm_server --port 8100 --latency-ms 800
+
+/v1/messages 요청의 프롬프트에서 "다음 문장을 파싱해주세요: ..." 부분을 꺼내 로컬 파서로 JSON 응답을 만들고,
+latency 만큼 (비동기로) 기다렸다가 응답함
+"""
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+import device_parser
+
+_TEXT = re.compile(r"다음 문장을 파싱해주세요: (.*?)\n")
+
+
+def create_app(latency):
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        prompt = "".join(
+            block["text"] if isinstance(block, dict) else block
+            for message in body["messages"]
+            for block in (message["content"] if isinstance(message["content"], list) else [message["content"]])
+        )
+        match = _TEXT.search(prompt)
+        result, _ = device_parser.parse_locally(match.group(1) if match else "")
+        await asyncio.sleep(latency)
+        return {
+            "id": f"msg_fake_{app.state.requests}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "fake"),
+            "content": [{"type": "text", "text": json.dumps(result or {"updates": []}, ensure_ascii=False)}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(prompt), "output_tokens": 64},
+        }
+
+    return app
+
+
+def start_in_thread(port, latency):
+    """백그라운드 스레드에서 서버를 띄우고 (server, base_url) 반환"""
+    server = uvicorn.Server(uvicorn.Config(create_app(latency), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Anthropic Messages API")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms / 1000), host="127.0.0.1", port=args.port)
@@ -0,0 +1,66 @@
+"""
+Google Speech-to-Text SpeechClient 를 흉내 내는 로컬 fake (스트리밍 인식 벤치마크 / 테스트용, 자격 증명 불필요)
+
+StreamingTranscriber(speech_client=FakeSpeechClient(...)) 처럼 실제 gRPC 클라이언트 대신 넣어 사용.
+0 이 아닌 샘플을 말소리로 보고, 말소리가 쌓일수록 transcript 의 단어를 하나씩 중간 결과로 내보내며,
+말소리 뒤에 silence_ms 만큼 무음이 이어지면 (또는 오디오가 끝나면) 발화 종료 이벤트와 최종 결과를 냄.
+recognize 는 실제 API 처럼 max_sync_seconds 보다 긴 음성을, streaming_recognize 는 max_request_bytes 보다 큰 요청을 거부함
+"""
+import time
+from types import SimpleNamespace
+
+SPEECH_EVENT_UNSPECIFIED = 0
+END_OF_SINGLE_UTTERANCE = 1
+
+
+def response(transcript=None, is_final=False, speech_event_type=SPEECH_EVENT_UNSPECIFIED):
+    results = []
+    if transcript is not None:
+        alternative = SimpleNamespace(transcript=transcript, confidence=0.9)
+        results.append(SimpleNamespace(alternatives=[alternative], is_final=is_final))
+    return SimpleNamespace(results=results, speech_event_type=speech_event_type)
+
+
+class FakeSpeechClient:
+    def __init__(self, transcript, latency=0.15, sample_rate=16000, silence_ms=300, seconds_per_word=0.3,
+                 batch_rtf=0.1, max_sync_seconds=60, max_request_bytes=25_600):
+        self.words = transcript.split()
+        self.latency = latency
+        self.bytes_per_second = sample_rate * 2
+        self.silence_bytes = int(self.bytes_per_second * silence_ms / 1000)
+        self.seconds_per_word = seconds_per_word
+        # non-streaming recognize takes latency + batch_rtf x audio duration
+        self.batch_rtf = batch_rtf
+        self.max_sync_seconds = max_sync_seconds
+        # like the real API, a streaming request with more audio than this is rejected
+        self.max_request_bytes = max_request_bytes
+        self.recognize_calls = 0
+
+    def streaming_recognize(self, config, requests):
+        speech, silence, shown = 0, 0, 0
+        for request in requests:
+            chunk = request.audio_content
+            if len(chunk) > self.max_request_bytes:
+                raise ValueError(f"Request audio can be a maximum of {self.max_request_bytes} bytes")
+            if any(chunk):
+                speech += len(chunk)
+                silence = 0
+                words = min(len(self.words), 1 + int(speech / self.bytes_per_second / self.seconds_per_word))
+                if words > shown:
+                    shown = words
+                    yield response(" ".join(self.words[:shown]))
+            else:
+                silence += len(chunk)
+                if speech and silence >= self.silence_bytes:
+                    break
+        time.sleep(self.latency)
+        yield response(speech_event_type=END_OF_SINGLE_UTTERANCE)
+        yield response(" ".join(self.words), is_final=True)
+
+    def recognize(self, config, audio):
+        self.recognize_calls += 1
+        seconds = len(audio.content) / self.bytes_per_second
+        if seconds > self.max_sync_seconds:
+            raise ValueError(f"Sync input too long ({seconds:.0f}s), use LongRunningRecognize")
+        time.sleep(self.latency + self.batch_rtf * seconds)
+        return response(" ".join(self.words), is_final=True)
@@ -0,0 +1,108 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# relative data paths below are resolved against this directory, so scripts run from elsewhere (VOICE_model) share them
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Model
+MODEL_PATH = os.getenv("MODEL_PATH", "VOICE_model")
+TOKENIZER_PATH = os.getenv("TOKENIZER_PATH", "paust/pko-chat-t5-large")
+# single state_dict file attached read-only via mmap by every worker (see serve.py)
+SHARED_WEIGHTS_PATH = os.getenv("SHARED_WEIGHTS_PATH", "")
+# serving precision: fp32 | bf16 | int8 (dynamic quantization of Linear layers, CPU only)
+PRECISION = os.getenv("PRECISION", "fp32")
+# inference backend: torch | onnx (graphs exported with export_onnx.py into ONNX_PATH)
+BACKEND = os.getenv("BACKEND", "torch")
+ONNX_PATH = os.getenv("ONNX_PATH", "onnx")
+
+# Generation
+# 0 = derive the decode budget from the routine lengths in the training CSV (see decode_budget.py)
+MAX_LENGTH = int(os.getenv("MAX_LENGTH", "0"))
+MAX_LENGTH_MARGIN = float(os.getenv("MAX_LENGTH_MARGIN", "1.25"))
+ROUTINE_DATASET_PATH = os.path.join(BASE_DIR, os.getenv("ROUTINE_DATASET_PATH", "../preprocessed_dataset.csv"))
+ROUTINE_STATS_PATH = os.path.join(BASE_DIR, os.getenv("ROUTINE_STATS_PATH", "routine_length_stats.json"))
+# stop as soon as a complete "~할게요." sentence has been generated
+STOP_AT_SENTENCE_END = os.getenv("STOP_AT_SENTENCE_END", "true").lower() == "true"
+TEMPERATURE = float(os.getenv("TEMPERATURE", "0.5"))
+NO_REPEAT_NGRAM_SIZE = int(os.getenv("NO_REPEAT_NGRAM_SIZE", "6"))
+
+# Continuous batching
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "8"))
+MAX_WAIT_MS = float(os.getenv("MAX_WAIT_MS", "10"))
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "true").lower() == "true"
+
+# Inference executor
+# model calls share one model behind a lock, so more workers do not run generate in parallel
+# (scale out with serve.py worker processes instead)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "64"))
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", "0"))  # process-wide intra-op threads, 0 = all usable cores
+
+# Routine response cache
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "3600"))
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")  # sqlite file for the on-disk tier, empty = memory only
+CACHE_VARIANTS = int(os.getenv("CACHE_VARIANTS", "1"))  # >1: return one of K cached variants per key
+
+# Duplicate avoidance
+# candidates sampled per request in one batched pass; the first one not in the user's recent history wins
+NUM_CANDIDATES = int(os.getenv("NUM_CANDIDATES", "3"))
+HISTORY_MAX_USERS = int(os.getenv("HISTORY_MAX_USERS", "10000"))
+HISTORY_PER_USER = int(os.getenv("HISTORY_PER_USER", "5"))
+
+# Device control parser
+# rule-based parser first, the LLM only when its confidence is below LOCAL_PARSER_MIN_CONFIDENCE
+LOCAL_PARSER_ENABLED = os.getenv("LOCAL_PARSER_ENABLED", "true").lower() == "true"
+LOCAL_PARSER_MIN_CONFIDENCE = float(os.getenv("LOCAL_PARSER_MIN_CONFIDENCE", "0.8"))
+
+# Structured output
+# the model (trained with VOICE_model STRUCTURED = True) writes "routine ### 1:on:24°C / ..." and the
+# suffix is trie-constrained to known devices/states, so no parser call is needed
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "false").lower() == "true"
+
+# LLM parser service (parsing_routine.RoutineParserService)
+PARSER_MODEL = os.getenv("PARSER_MODEL", "claude-3-opus-20240229")
+PARSER_BASE_URL = os.getenv("PARSER_BASE_URL", "")  # e.g. a local stand-in server for benchmarks
+PARSER_REQUESTS_PER_SECOND = float(os.getenv("PARSER_REQUESTS_PER_SECOND", "4"))
+PARSER_MAX_BURST = int(os.getenv("PARSER_MAX_BURST", "8"))
+PARSER_MAX_CONCURRENCY = int(os.getenv("PARSER_MAX_CONCURRENCY", "8"))
+PARSER_TIMEOUT_SECONDS = float(os.getenv("PARSER_TIMEOUT_SECONDS", "30"))
+PARSER_BATCH_TIMEOUT_SECONDS = float(os.getenv("PARSER_BATCH_TIMEOUT_SECONDS", "60"))
+
+# Hume batch jobs
+# public URL of this server's /hume_callback/ endpoint, empty = async polling only
+HUME_CALLBACK_URL = os.getenv("HUME_CALLBACK_URL", "")
+HUME_CALLBACK_TOKEN = os.getenv("HUME_CALLBACK_TOKEN", "")  # if set, callbacks must carry ?token=<value>
+# one shared list-jobs query per interval covers every in-flight job
+HUME_POLL_INTERVAL_SECONDS = float(os.getenv("HUME_POLL_INTERVAL_SECONDS", "0.5"))
+HUME_LIST_LIMIT = int(os.getenv("HUME_LIST_LIMIT", "100"))
+HUME_JOB_TIMEOUT_SECONDS = float(os.getenv("HUME_JOB_TIMEOUT_SECONDS", "120"))
+# uploads arriving within the window are submitted together as one multi-file job
+HUME_BATCH_WINDOW_MS = float(os.getenv("HUME_BATCH_WINDOW_MS", "50"))
+HUME_BATCH_MAX_FILES = int(os.getenv("HUME_BATCH_MAX_FILES", "16"))
+
+# Audio ingestion
+# uploads are read once into memory and shared by the STT and Hume stages, spilled to a temp file past AUDIO_SPILL_BYTES
+AUDIO_MAX_BYTES = int(os.getenv("AUDIO_MAX_BYTES", str(50 * 1024 * 1024)))
+AUDIO_SPILL_BYTES = int(os.getenv("AUDIO_SPILL_BYTES", str(8 * 1024 * 1024)))
+AUDIO_READ_CHUNK_BYTES = int(os.getenv("AUDIO_READ_CHUNK_BYTES", str(64 * 1024)))
+# downmix, resample to 16kHz mono and trim leading / trailing silence before STT and Hume
+# (spilled uploads are preprocessed block by block from file to file, so they are never decoded into memory whole)
+AUDIO_PREPROCESS = os.getenv("AUDIO_PREPROCESS", "true").lower() == "true"
+# worker threads decoding compressed uploads (flac, ogg/opus) and running the preprocessing stage
+AUDIO_DECODE_WORKERS = int(os.getenv("AUDIO_DECODE_WORKERS", "2"))
+
+# Prosody / emotion
+# "hume" (remote batch job) or "local" (NumPy features + small classifier), overridable per request
+PROSODY_BACKEND = os.getenv("PROSODY_BACKEND", "hume")
+PROSODY_MODEL_PATH = os.getenv("PROSODY_MODEL_PATH", "prosody_model.json")
+
+# Speech-to-text
+# "google" (Speech-to-Text API), "local" (Whisper on CPU from STT_LOCAL_MODEL_DIR, no network) or "fake" (tests)
+STT_BACKEND = os.getenv("STT_BACKEND", "google")
+# backends a request may pick with ?stt_backend= (never "fake", which ignores the audio)
+STT_REQUEST_BACKENDS = [name for name in os.getenv("STT_REQUEST_BACKENDS", "google,local").split(",") if name]
+STT_LOCAL_MODEL_DIR = os.getenv("STT_LOCAL_MODEL_DIR", "models/whisper-small-ko")
@@ -0,0 +1,97 @@
+import json
+import math
+import os
+import re
+
+import torch
+from transformers import StoppingCriteria
+
+import config
+from structured_output import format_target
+
+# a finished routine sentence: "...에어컨을 24도로 설정할게요."
+SENTENCE_END = re.compile(r"게요\s*[.!]\s*$")
+
+
+def compute_routine_length_stats(tokenizer, dataset_path=config.ROUTINE_DATASET_PATH, structured=False):
+    """학습 CSV 의 routine 컬럼 토큰 길이 통계 (EOS 포함, structured 면 updates suffix 까지 포함한 target)"""
+    import pandas as pd
+
+    df = pd.read_csv(dataset_path).dropna(subset=['routine'])
+    routines = df['routine'].astype(str).tolist()
+    if structured:
+        routines = [format_target(r, u) for r, u in zip(routines, df['updates'].fillna("").astype(str))]
+    lengths = sorted(len(ids) for ids in tokenizer(routines).input_ids)
+
+    def percentile(q):
+        return lengths[min(len(lengths) - 1, math.ceil(q / 100 * len(lengths)) - 1)]
+
+    return {
+        "count": len(lengths),
+        "mean": sum(lengths) / len(lengths),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": lengths[-1],
+    }
+
+
+def load_routine_length_stats(tokenizer, stats_path=config.ROUTINE_STATS_PATH,
+                              dataset_path=config.ROUTINE_DATASET_PATH, structured=False):
+    """캐시된 길이 통계를 읽고, 없으면 학습 CSV 에서 계산해 저장 (CSV 도 없으면 None)"""
+    if structured:
+        stats_path = os.path.splitext(stats_path)[0] + ".structured.json"
+    if os.path.exists(stats_path):
+        with open(stats_path, encoding="utf-8") as f:
+            return json.load(f)
+    if not os.path.exists(dataset_path):
+        return None
+
+    stats = compute_routine_length_stats(tokenizer, dataset_path, structured)
+    with open(stats_path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    return stats
+
+
+def resolve_max_length(tokenizer, structured=False):
+    """디코딩 예산(max_length) 결정
+
+    MAX_LENGTH 가 설정돼 있으면 그대로 쓰고, 아니면 학습 데이터에서 가장 긴 루틴 * MAX_LENGTH_MARGIN
+    (+1 은 decoder start 토큰). 통계를 구할 수 없으면 기존 값 1024
+    """
+    if config.MAX_LENGTH:
+        return config.MAX_LENGTH
+    stats = load_routine_length_stats(tokenizer, structured=structured)
+    if stats is None:
+        print("Routine length stats unavailable, using max_length=1024")
+        return 1024
+    max_length = math.ceil(stats["max"] * config.MAX_LENGTH_MARGIN) + 1
+    print(f"Routine length stats: {stats} -> max_length={max_length}")
+    return max_length
+
+
+class SentenceEndStopper:
+    """"~할게요." 처럼 완결된 루틴 문장이 나오면 디코딩을 끝내는 조건
+
+    매 스텝 마지막 window 개 토큰만 디코딩해서 확인함
+    """
+
+    def __init__(self, tokenizer, window=8):
+        self.tokenizer = tokenizer
+        self.window = window
+
+    def __call__(self, decoder_ids):
+        tail = self.tokenizer.decode(decoder_ids[-self.window:], skip_special_tokens=True)
+        return SENTENCE_END.search(tail) is not None
+
+
+class SentenceEndCriteria(StoppingCriteria):
+    """SentenceEndStopper 를 transformers generate(stopping_criteria=...) 에서 쓰기 위한 래퍼"""
+
+    def __init__(self, stopper):
+        self.stopper = stopper
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.tensor(
+            [self.stopper(row.tolist()) for row in input_ids], dtype=torch.bool, device=input_ids.device
+        )
@@ -0,0 +1,175 @@
+import re
+
+# appliance id, name, aliases (longest alias wins when they overlap: 로봇청소기 vs 청소기)
+APPLIANCES = [
+    (1, "에어컨", ["에어컨", "냉방기"]),
+    (2, "공기청정기", ["공기청정기", "공기 청정기", "공청기"]),
+    (3, "로봇청소기", ["로봇청소기", "로봇 청소기", "청소기"]),
+    (4, "TV", ["TV", "tv", "티비", "텔레비전"]),
+    (5, "조명", ["조명", "전등", "무드등", "불(?=을|\\s|도|은)"]),
+    (6, "정수기", ["정수기"]),
+    (7, "세탁기", ["세탁기"]),
+    (8, "건조기", ["의류건조기", "건조기"]),
+    (9, "식기세척기", ["식기세척기", "식기 세척기", "식세기"]),
+    (10, "스타일러", ["스타일러"]),
+]
+
+# recommended state values from the parser prompt (에어컨 also takes "{temperature}°C" alone or before a mode)
+STATE_VALUES = {
+    1: ["냉방 모드", "제습 모드", "송풍 모드", "자동 모드", "파워 바람", "취침 모드"],
+    2: ["무풍", "약풍", "중풍", "강풍"],
+    3: ["청소 모드", "충전 모드", "청소 완료", "빠른 청소"],
+    4: ["음악 재생", "영화 모드"],
+    5: ["밝게", "어둡게"],
+    6: ["냉수 준비", "온수 준비"],
+    7: ["표준 세탁", "급속 세탁", "섬세 세탁", "세탁 완료", "탈수 중", "헹굼 중"],
+    8: ["표준 건조", "강력 건조", "섬세 건조", "건조 완료"],
+    9: ["살균 건조", "강력", "일반", "세척 완료"],
+    10: ["표준 스타일링", "급속 스타일링", "강력 스타일링", "위생살균 모드", "관리 완료"],
+}
+AIRCON_TEMPERATURES = range(16, 31)
+
+# patterns for the recommended states, most specific pattern first
+STATES = {
+    2: [(r"무풍", "무풍"), (r"약풍|약하게|조용", "약풍"), (r"중풍|중간|적당", "중풍"),
+        (r"강풍|강하게|세게|최대|강력", "강풍")],
+    3: [(r"청소\s*(?:가\s*)?(?:완료|끝)", "청소 완료"), (r"충전", "충전 모드"), (r"빠른|빠르게|간단", "빠른 청소"),
+        (r"청소|돌리|돌려|작동|시작", "청소 모드")],
+    4: [(r"음악|노래|플레이리스트", "음악 재생"), (r"영화", "영화 모드")],
+    5: [(r"어둡|은은|어두운|약하게|낮춰|낮게|무드", "어둡게"), (r"밝|환하", "밝게")],
+    6: [(r"냉수|찬\s*물|시원한\s*물|차가운\s*물", "냉수 준비"), (r"온수|따뜻한\s*물|뜨거운\s*물|따뜻한\s*차", "온수 준비")],
+    7: [(r"세탁\s*(?:이\s*)?(?:완료|끝)", "세탁 완료"), (r"탈수", "탈수 중"), (r"헹굼|헹구", "헹굼 중"),
+        (r"급속|빠르게|빨리", "급속 세탁"), (r"섬세|울\s|니트|이불", "섬세 세탁"), (r"표준|세탁|빨래|돌리|돌려", "표준 세탁")],
+    8: [(r"건조\s*(?:가\s*)?(?:완료|끝)", "건조 완료"), (r"강력|강하게", "강력 건조"), (r"섬세", "섬세 건조"),
+        (r"표준|건조|돌리|돌려", "표준 건조")],
+    9: [(r"세척\s*(?:이\s*)?(?:완료|끝)", "세척 완료"), (r"살균|소독", "살균 건조"), (r"강력|강하게", "강력"),
+        (r"일반|표준|세척|설거지|돌리|돌려", "일반")],
+    10: [(r"관리\s*(?:가\s*)?(?:완료|끝)", "관리 완료"), (r"살균|위생|소독", "위생살균 모드"), (r"급속|빠르게|빨리", "급속 스타일링"),
+         (r"강력|강하게", "강력 스타일링"), (r"표준|스타일링|돌리|돌려|관리", "표준 스타일링")],
+}
+AIRCON_MODES = [(r"제습|습기|눅눅", "제습 모드"), (r"송풍", "송풍 모드"), (r"자동", "자동 모드"),
+                (r"파워|강하게|세게|강풍", "파워 바람"), (r"취침|수면|잠", "취침 모드"), (r"냉방", "냉방 모드")]
+TEMPERATURE = re.compile(r"(\d{1,2}(?:\.\d)?)\s*(?:도|℃|°C|°)")
+
+# state to use when the device is only switched on, with how sure we are that the LLM would pick it too
+DEFAULT_STATES = {
+    1: ("냉방 모드", 0.6), 2: ("중풍", 0.85), 3: ("청소 모드", 0.9), 4: ("영화 모드", 0.5), 5: ("밝게", 0.85),
+    6: ("냉수 준비", 0.5), 7: ("표준 세탁", 0.9), 8: ("표준 건조", 0.9), 9: ("일반", 0.85), 10: ("표준 스타일링", 0.9),
+}
+
+_ALIAS = re.compile("|".join(
+    f"(?P<a{appliance_id}_{i}>{alias})"
+    for appliance_id, _, aliases in APPLIANCES
+    for i, alias in sorted(enumerate(aliases), key=lambda item: -len(item[1]))
+))
+_NAMES = {appliance_id: name for appliance_id, name, _ in APPLIANCES}
+
+# "...하고 ", "...며 ", "...면서 ", ", " separate the per-device clauses of a routine sentence
+_CLAUSE_SPLIT = re.compile(r"(?<=[가-힣])(?:고|며|면서)\s*,?\s+|[,，]\s*|\s+(?:그리고|및)\s+")
+_OFF = re.compile(r"끄|끌|꺼(?!내)|끈(?!적)|정지|중지|멈추|멈출|멈춰|종료")
+_NEGATED_OFF = re.compile(r"(?:끄|꺼)지\s*(?:않|말)|안\s*(?:끄|끌|꺼)")
+_NEGATED_ON = re.compile(r"(?:켜|틀|돌리)지\s*(?:않|말)|안\s*(?:켜|켤|틀|돌리)")
+
+
+def _mentions(clause):
+    """절에 나온 기기 ID 목록 (등장 순서, 중복 제거)"""
+    found = []
+    for match in _ALIAS.finditer(clause):
+        appliance_id = int(match.lastgroup[1:].split("_")[0])
+        if appliance_id not in found:
+            found.append(appliance_id)
+    return found
+
+
+def _match_state(patterns, text):
+    """첫 번째로 맞는 상태와, 서로 다른 상태가 여러 개 맞았는지 여부"""
+    states = [state for pattern, state in patterns if re.search(pattern, text)]
+    if not states:
+        return None, False
+    return states[0], len(set(states)) > 1
+
+
+def _state(appliance_id, text, context):
+    """기기 하나의 상태와 신뢰도 (text: 기기가 나온 절, context: 문장 앞의 목적구)"""
+    if appliance_id == 1:
+        temperature = TEMPERATURE.search(text)
+        mode, ambiguous = _match_state(AIRCON_MODES, text)
+        if mode is None:
+            mode, ambiguous = _match_state(AIRCON_MODES, context)
+        parts = [f"{temperature.group(1)}°C"] if temperature else []
+        if mode is not None:
+            parts.append(mode)
+        if not parts:
+            return DEFAULT_STATES[1]
+        return " ".join(parts), 0.7 if ambiguous else 1.0
+
+    state, ambiguous = _match_state(STATES[appliance_id], text)
+    if state is not None:
+        return state, 0.7 if ambiguous else 1.0
+    state, ambiguous = _match_state(STATES[appliance_id], context)
+    if state is not None:
+        return state, 0.8
+    return DEFAULT_STATES[appliance_id]
+
+
+def _onoff(text):
+    """절의 켜기/끄기 판단과 신뢰도"""
+    if _NEGATED_OFF.search(text):
+        return "ON", 0.6
+    if _NEGATED_ON.search(text):
+        return "OFF", 0.6
+    if _OFF.search(text):
+        return "OFF", 1.0
+    return "ON", 1.0
+
+
+def parse_locally(control_text):
+    """LLM 없이 루틴 문장을 {"updates": [...]} 로 파싱하여 (결과, 신뢰도 0~1) 반환
+
+    신뢰도는 기기별 신뢰도의 최솟값이고, 기기를 하나도 찾지 못하면 (None, 0.0)
+    반환되는 onoff 는 "ON"/"OFF" 이며 parsing_routine.DeviceControl 로 검증하면 LLM 결과와 같은 형태가 됨
+    """
+    clauses = [clause.strip() for clause in _CLAUSE_SPLIT.split(control_text) if clause.strip()]
+    first = _ALIAS.search(control_text)
+    if first is None:
+        return None, 0.0
+    # purpose phrase before the first device ("영화 감상을 위해 ...") hints at states of every device
+    context = control_text[:first.start()]
+
+    # clauses without a device ("...켜고 24도로 맞출게요") belong to the previous device clause
+    groups = []
+    for clause in clauses:
+        devices = _mentions(clause)
+        if devices or not groups:
+            groups.append((devices, clause))
+        else:
+            groups[-1] = (groups[-1][0], groups[-1][1] + " " + clause)
+
+    updates = {}
+    confidence = 1.0
+    for devices, clause in groups:
+        if not devices:
+            continue
+        onoff, onoff_confidence = _onoff(clause)
+        text = _ALIAS.sub(" ", clause)
+        for appliance_id in devices:
+            state, state_confidence = _state(appliance_id, text, context)
+            if onoff == "OFF":
+                state_confidence = 1.0
+            previous = updates.get(appliance_id)
+            # a device mentioned twice keeps the more explicit reading
+            if previous is not None and previous[1] >= min(onoff_confidence, state_confidence):
+                continue
+            update = {
+                "appliance_id": appliance_id,
+                "user_id": 6,
+                "name": _NAMES[appliance_id],
+                "onoff": onoff,
+                "state": state,
+                "is_active": onoff == "ON",
+            }
+            updates[appliance_id] = (update, min(onoff_confidence, state_confidence))
+
+    for _, update_confidence in updates.values():
+        confidence = min(confidence, update_confidence)
+    return {"updates": [update for update, _ in updates.values()]}, confidence
@@ -0,0 +1,218 @@
+"""
+VOICE_model 을 ONNX Runtime 백엔드용 encoder / decoder / decoder_with_past 그래프로 내보내기
+
+AI_Server 디렉토리에서 실행:
+    python export_onnx.py --output onnx --verify
+--verify 는 내보낸 그래프와 PyTorch 모델의 인코더 출력, 첫 스텝 logits, greedy 생성 결과가 같은지 확인함
+"""
+import argparse
+import os
+import sys
+
+import torch
+from transformers import T5TokenizerFast
+
+import config
+import model_loader
+from inference_backend import OnnxBackend, TorchBackend
+from prompt_compiler import PROBE_SITUATIONS, PromptCompiler
+
+OPSET = 17
+# every export uses the TorchScript exporter (dynamic_axes), newer torch defaults to the dynamo one
+
+
+def _legacy(past):
+    return past.to_legacy_cache() if hasattr(past, "to_legacy_cache") else past
+
+
+class EncoderGraph(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.encoder = model.get_encoder()
+
+    def forward(self, input_ids, attention_mask):
+        return self.encoder(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+
+class DecoderGraph(torch.nn.Module):
+    """첫 디코더 스텝: logits + self/cross attention key/value 전부 반환"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, decoder_input_ids, decoder_attention_mask, encoder_hidden_states, encoder_attention_mask):
+        outputs = self.model(
+            encoder_outputs=(encoder_hidden_states,),
+            attention_mask=encoder_attention_mask,
+            decoder_input_ids=decoder_input_ids,
+            decoder_attention_mask=decoder_attention_mask,
+            use_cache=True,
+        )
+        present = _legacy(outputs.past_key_values)
+        return (outputs.logits[:, -1, :], *[tensor for layer in present for tensor in layer])
+
+
+class DecoderWithPastGraph(torch.nn.Module):
+    """이후 디코더 스텝: past 를 받아 logits + 갱신된 self attention key/value 반환"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+        self.num_layers = model.config.num_decoder_layers
+
+    def forward(self, decoder_input_ids, decoder_attention_mask, encoder_hidden_states, encoder_attention_mask, *past):
+        past = tuple(tuple(past[4 * i:4 * i + 4]) for i in range(self.num_layers))
+        outputs = self.model(
+            encoder_outputs=(encoder_hidden_states,),
+            attention_mask=encoder_attention_mask,
+            decoder_input_ids=decoder_input_ids,
+            decoder_attention_mask=decoder_attention_mask,
+            past_key_values=past,
+            use_cache=True,
+        )
+        present = _legacy(outputs.past_key_values)
+        return (outputs.logits[:, -1, :], *[tensor for layer in present for tensor in layer[:2]])
+
+
+def export(model, output_dir):
+    num_layers = model.config.num_decoder_layers
+    batch, src_len, past_len = 2, 16, 3
+    # eval wrappers: the exporter restores the wrapper's mode recursively, a training wrapper would leave dropout on
+    encoder_graph, decoder_graph = EncoderGraph(model).eval(), DecoderGraph(model).eval()
+    decoder_with_past_graph = DecoderWithPastGraph(model).eval()
+    input_ids = torch.randint(min(5, model.config.vocab_size - 1), min(100, model.config.vocab_size), (batch, src_len))
+    attention_mask = torch.ones_like(input_ids)
+
+    with torch.no_grad():  # inference tensors cannot be traced by the exporter
+        encoder_hidden = encoder_graph(input_ids, attention_mask)
+
+    torch.onnx.export(
+        encoder_graph,
+        (input_ids, attention_mask),
+        os.path.join(output_dir, "encoder.onnx"),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "encoder_sequence"},
+            "attention_mask": {0: "batch", 1: "encoder_sequence"},
+            "last_hidden_state": {0: "batch", 1: "encoder_sequence"},
+        },
+        opset_version=OPSET,
+        dynamo=False,
+    )
+
+    decoder_inputs = ["decoder_input_ids", "decoder_attention_mask", "encoder_hidden_states", "encoder_attention_mask"]
+    decoder_axes = {
+        "decoder_input_ids": {0: "batch"},
+        "encoder_hidden_states": {0: "batch", 1: "encoder_sequence"},
+        "encoder_attention_mask": {0: "batch", 1: "encoder_sequence"},
+        "logits": {0: "batch"},
+    }
+    present_names = [
+        f"present_{i}_{kind}" for i in range(num_layers)
+        for kind in ("self_key", "self_value", "cross_key", "cross_value")
+    ]
+
+    decoder_input_ids = torch.zeros((batch, 1), dtype=torch.long)
+    torch.onnx.export(
+        decoder_graph,
+        (decoder_input_ids, torch.ones((batch, 1), dtype=torch.long), encoder_hidden, attention_mask),
+        os.path.join(output_dir, "decoder.onnx"),
+        input_names=decoder_inputs,
+        output_names=["logits"] + present_names,
+        dynamic_axes={
+            **decoder_axes,
+            "decoder_attention_mask": {0: "batch"},
+            **{name: {0: "batch", 2: "encoder_sequence" if "cross" in name else "past_sequence"}
+               for name in present_names},
+        },
+        opset_version=OPSET,
+        dynamo=False,
+    )
+
+    with torch.no_grad():  # inference tensors cannot be traced by the exporter
+        past = decoder_graph(
+            decoder_input_ids, torch.ones((batch, 1), dtype=torch.long), encoder_hidden, attention_mask
+        )[1:]
+    # grow the self-attention cache so the past length is not specialized to 1
+    past = [
+        torch.cat([tensor] * past_len, dim=2) if i % 4 < 2 else tensor
+        for i, tensor in enumerate(past)
+    ]
+    past_names = [name.replace("present_", "past_") for name in present_names]
+    self_present_names = [name for name in present_names if "_self_" in name]
+
+    torch.onnx.export(
+        decoder_with_past_graph,
+        (decoder_input_ids, torch.ones((batch, past_len + 1), dtype=torch.long), encoder_hidden, attention_mask, *past),
+        os.path.join(output_dir, "decoder_with_past.onnx"),
+        input_names=decoder_inputs + past_names,
+        output_names=["logits"] + self_present_names,
+        dynamic_axes={
+            **decoder_axes,
+            "decoder_attention_mask": {0: "batch", 1: "past_sequence_plus_one"},
+            **{name: {0: "batch", 2: "encoder_sequence" if "cross" in name else "past_sequence"}
+               for name in past_names},
+            **{name: {0: "batch", 2: "past_sequence_plus_one"} for name in self_present_names},
+        },
+        opset_version=OPSET,
+        dynamo=False,
+    )
+
+    model.config.save_pretrained(output_dir)
+    model.generation_config.save_pretrained(output_dir)
+    print(f"Exported ONNX graphs to {output_dir}")
+
+
+def verify(torch_backend, onnx_backend, tokenizer, atol):
+    """두 백엔드의 인코더 출력, 첫 스텝 logits, greedy 생성 결과 비교"""
+    compiler = PromptCompiler(tokenizer)
+    ok = True
+    for situation in PROBE_SITUATIONS:
+        input_ids = torch.tensor([compiler.encode(situation)])
+        mask = torch.ones_like(input_ids)
+        decoder_input_ids = torch.tensor([[torch_backend.config.decoder_start_token_id]])
+        decoder_mask = torch.ones((1, 1), dtype=torch.long)
+
+        with torch.inference_mode():
+            torch_hidden = torch_backend.encode(input_ids, mask)
+            onnx_hidden = onnx_backend.encode(input_ids, mask)
+            torch_logits, _ = torch_backend.decode_step(decoder_input_ids, torch_hidden, mask, decoder_mask)
+            onnx_logits, _ = onnx_backend.decode_step(decoder_input_ids, onnx_hidden, mask, decoder_mask)
+            torch_ids = torch_backend.generate(input_ids[0].tolist(), max_length=64, do_sample=False)
+            onnx_ids = onnx_backend.generate(input_ids[0].tolist(), max_length=64, do_sample=False)
+
+        hidden_diff = (torch_hidden - onnx_hidden).abs().max().item()
+        logits_diff = (torch_logits - onnx_logits).abs().max().item()
+        same = torch_ids == onnx_ids
+        ok = ok and hidden_diff <= atol and logits_diff <= atol and same
+        print(f"{situation}\n  encoder diff {hidden_diff:.2e}  logits diff {logits_diff:.2e}  greedy match {same}")
+        if not same:
+            print(f"  torch: {tokenizer.decode(torch_ids, skip_special_tokens=True)}")
+            print(f"  onnx : {tokenizer.decode(onnx_ids, skip_special_tokens=True)}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export VOICE_model to ONNX")
+    parser.add_argument("--output", type=str, default=config.ONNX_PATH)
+    parser.add_argument("--verify", action="store_true")
+    parser.add_argument("--atol", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    device = torch.device("cpu")
+    model = model_loader.load_model(device, "fp32")
+    export(model, args.output)
+
+    if args.verify:
+        tokenizer = T5TokenizerFast.from_pretrained(config.TOKENIZER_PATH)
+        if not verify(TorchBackend(model, device), OnnxBackend(args.output), tokenizer, args.atol):
+            print("ONNX export does not match the PyTorch model")
+            sys.exit(1)
+        print("ONNX export matches the PyTorch model")
+
+
+if __name__ == "__main__":
+    main()
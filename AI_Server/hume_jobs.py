@@ -0,0 +1,169 @@
+import asyncio
+import time
+
+import config
+from src.hume.client import AsyncHumeBatchAPI, UPLOAD_NAME
+
+DONE = ("COMPLETED", "FAILED")
+# list-jobs looks back this far before the oldest submission, so clock skew with Hume does not hide jobs
+CLOCK_SKEW_MS = 60_000
+
+
+def split_predictions(predictions):
+    """여러 파일 작업의 predictions 를 업로드 이름별로 나눔 (각각 단일 파일 작업과 같은 모양)"""
+    by_file = {}
+    for source in predictions:
+        results = source.get("results", {})
+        for prediction in results.get("predictions", []):
+            by_file[prediction.get("file")] = [{
+                "source": source.get("source"),
+                "results": {"predictions": [prediction], "errors": results.get("errors", [])},
+            }]
+    return by_file
+
+
+def check_source(source):
+    """업로드할 음성을 읽을 수 있는지 확인 (해제된 memoryview, 지워진 임시 파일 등은 ValueError / TypeError / OSError)"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        if memoryview(source).nbytes == 0:
+            raise ValueError("empty audio")
+    else:
+        with open(source, 'rb'):
+            pass
+
+
+class HumeJobWaiter:
+    """Hume batch 작업 완료를 이벤트 루프를 막지 않고 기다림
+
+    - callback_url 이 있으면 Hume 이 작업 완료 시 /hume_callback/ 으로 알려주고, notify() 가 기다리는 future 를 완료
+    - 진행 중인 작업은 하나의 백그라운드 poller 가 poll_interval 마다 list-jobs 조회 한 번으로 함께 확인
+      (동시에 기다리는 요청 수와 관계없이 상태 조회 요청 수가 일정함, webhook 이 없거나 늦을 때의 대비)
+    - batch_window_ms 안에 들어온 업로드는 (최대 max_files 개) 하나의 여러 파일 작업으로 제출하고 결과를 파일별로 나눠 돌려줌
+    """
+
+    def __init__(self, client=None, callback_url=config.HUME_CALLBACK_URL,
+                 poll_interval=config.HUME_POLL_INTERVAL_SECONDS, list_limit=config.HUME_LIST_LIMIT,
+                 timeout=config.HUME_JOB_TIMEOUT_SECONDS, batch_window_ms=config.HUME_BATCH_WINDOW_MS,
+                 max_files=config.HUME_BATCH_MAX_FILES):
+        self.client = client or AsyncHumeBatchAPI()
+        self.callback_url = callback_url
+        self.poll_interval = poll_interval
+        self.list_limit = list_limit
+        self.timeout = timeout
+        self.batch_window = batch_window_ms / 1000
+        self.max_files = max(1, max_files)
+        self._pending = []  # (file_path, future) uploads waiting for the current window to close
+        self._flush_timer = None
+        self._waiting = {}  # job_id -> (future resolved with (status, predictions or None), submitted_ms)
+        self._poller = None
+
+    def notify(self, job_id, status, predictions=None):
+        """webhook 이나 poller 가 받은 작업 상태 반영 (기다리는 요청이 없으면 무시)"""
+        future, _ = self._waiting.get(job_id, (None, None))
+        if future is not None and not future.done() and status in DONE:
+            future.set_result((status, predictions))
+
+    async def _poll(self):
+        """기다리는 작업이 남아 있는 동안 poll_interval 마다 한 번씩 list-jobs 로 상태를 모아서 반영
+
+        - 같은 API 키로 다른 작업이 많이 만들어져도 기다리는 작업이 모두 보일 때까지 페이지를 넘겨 조회
+        - 그래도 목록에 없는 작업만 개별 상태 조회
+        - 한 번의 조회가 실패해도 (잘못된 응답 포함) 로그만 남기고 다음 주기에 다시 조회
+        """
+        while self._waiting:
+            await asyncio.sleep(self.poll_interval)
+            if not self._waiting:
+                break
+            try:
+                waiting = set(self._waiting)
+                since = min(submitted for _, submitted in self._waiting.values()) - CLOCK_SKEW_MS
+                statuses = await self.client.list_jobs(since, self.list_limit, job_ids=waiting)
+                if statuses is None:
+                    continue
+                missing = [job_id for job_id in waiting if job_id not in statuses]
+                if missing:
+                    found = await asyncio.gather(*(self.client.get_job_status(job_id) for job_id in missing))
+                    statuses.update(zip(missing, found))
+                for job_id, status in statuses.items():
+                    self.notify(job_id, status)
+            except Exception as e:
+                print(f"Error polling Hume jobs: {str(e)}")
+
+    async def wait(self, job_id, submitted_ms):
+        """작업이 끝날 때까지 기다려 (상태, webhook 으로 받은 predictions 또는 None) 반환"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[job_id] = (future, submitted_ms)
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return "TIMEOUT", None
+        finally:
+            self._waiting.pop(job_id, None)
+
+    def _flush(self):
+        """모아 둔 업로드를 하나의 작업으로 제출"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        # a source that cannot be read fails only its own request, not the whole multi-file job
+        valid = []
+        for file_path, future in batch:
+            try:
+                check_source(file_path)
+            except (OSError, ValueError, TypeError) as e:
+                if not future.done():
+                    future.set_result({"error": f"Hume analysis failed: {str(e)}"})
+            else:
+                valid.append((file_path, future))
+        batch = valid
+        if not batch:
+            return
+        file_paths = [file_path for file_path, _ in batch]
+        try:
+            results = await self._analyze_files(file_paths)
+        except Exception as e:
+            results = [{"error": f"Hume analysis failed: {str(e)}"}] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _analyze_files(self, file_paths):
+        """파일들을 한 작업으로 분석해 파일 순서대로 predictions (또는 {"error": ...}) 리스트 반환"""
+        submitted_ms = int(time.time() * 1000)
+        job_id = await self.client.analyze_audio_files(file_paths, "utterance", self.callback_url)
+        if not job_id:
+            return [{"error": "Failed to start Hume analysis"}] * len(file_paths)
+        print(f"Hume analysis started - Job ID: {job_id} ({len(file_paths)} files)")
+
+        status, predictions = await self.wait(job_id, submitted_ms)
+        print(f"Hume job {job_id}: {status}")
+        if status != "COMPLETED":
+            return [{"error": f"Hume analysis {status.lower()}"}] * len(file_paths)
+        if predictions is None:
+            predictions = await self.client.get_predictions(job_id)
+        if predictions is None:
+            return [{"error": "Failed to get Hume predictions"}] * len(file_paths)
+
+        by_file = split_predictions(predictions)
+        return [
+            by_file.get(UPLOAD_NAME.format(i), {"error": "No Hume prediction for file"})
+            for i in range(len(file_paths))
+        ]
+
+    async def analyze(self, file_path):
+        """음성 파일 (경로 또는 메모리의 wav bytes / memoryview) 의 Hume prosody 분석 (audio_analysis.get_top_emotion 이 읽는 predictions, 실패 시 {"error": ...})"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((file_path, future))
+        if len(self._pending) >= self.max_files:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self.batch_window, self._flush)
+        return await future
@@ -0,0 +1,270 @@
+import os
+
+import numpy as np
+import torch
+from transformers import (
+    GenerationConfig,
+    LogitsProcessorList,
+    NoRepeatNGramLogitsProcessor,
+    StoppingCriteriaList,
+    T5Config,
+    TemperatureLogitsWarper,
+    TopKLogitsWarper,
+    TopPLogitsWarper,
+)
+
+import config
+import model_loader
+from decode_budget import SentenceEndCriteria
+from structured_output import StructuredLogitsProcessor, mask_logits
+
+
+class Sampler:
+    """model.generate(temperature=..., no_repeat_ngram_size=..., do_sample=...) 와 같은 방식으로 다음 토큰 선택"""
+
+    def __init__(self, generation_config, temperature=config.TEMPERATURE,
+                 no_repeat_ngram_size=config.NO_REPEAT_NGRAM_SIZE, constraint=None):
+        self.no_repeat_ngram = NoRepeatNGramLogitsProcessor(no_repeat_ngram_size)
+        # structured output mode: limits the tokens after the update separator (see structured_output.py)
+        self.constraint = constraint
+        self.warpers = LogitsProcessorList([TemperatureLogitsWarper(temperature)])
+        if generation_config.top_k:
+            self.warpers.append(TopKLogitsWarper(generation_config.top_k))
+        if generation_config.top_p is not None and generation_config.top_p < 1.0:
+            self.warpers.append(TopPLogitsWarper(generation_config.top_p))
+
+    def __call__(self, decoder_ids, logits, do_sample=True):
+        """decoder_ids: 행마다 지금까지의 디코더 토큰 리스트, logits: [B, vocab] -> 행마다 다음 토큰"""
+        logits = logits.float()
+        for row, ids in enumerate(decoder_ids):
+            ids = torch.tensor([ids], device=logits.device)
+            logits[row:row + 1] = self.no_repeat_ngram(ids, logits[row:row + 1])
+        if self.constraint is not None:
+            for row, ids in enumerate(decoder_ids):
+                allowed = self.constraint(ids)
+                if allowed is not None:
+                    logits[row] = mask_logits(logits[row], allowed)
+        if not do_sample:
+            return logits.argmax(dim=-1).tolist()
+        logits = self.warpers(None, logits)
+        probs = torch.softmax(logits, dim=-1)
+        return torch.multinomial(probs, num_samples=1).squeeze(1).tolist()
+
+
+class InferenceBackend:
+    """VOICE_model 추론 백엔드 인터페이스
+
+    past 는 레이어마다 (self_key, self_value, cross_key, cross_value) torch 텐서 튜플로 주고받음
+    (배칭 엔진이 백엔드와 상관없이 패딩/합치기/행 제거를 할 수 있도록)
+    """
+
+    config = None
+    generation_config = None
+    device = torch.device("cpu")
+
+    def encode(self, input_ids, attention_mask):
+        """[B, S] 입력 -> [B, S, d] 인코더 출력"""
+        raise NotImplementedError
+
+    def decode_step(self, decoder_input_ids, encoder_hidden, encoder_mask, decoder_mask, past=None):
+        """디코더 한 스텝: ([B, vocab] 마지막 위치 logits, 갱신된 past) 반환"""
+        raise NotImplementedError
+
+    def generate(self, input_ids, max_length, do_sample=True, streamer=None, stopper=None, constraint=None):
+        """encode + decode_step 으로 한 요청의 루틴 토큰 ID 리스트 생성 (decoder start 토큰 제외)"""
+        sampler = Sampler(self.generation_config, constraint=constraint)
+        input_ids = torch.tensor([input_ids], device=self.device)
+        encoder_mask = torch.ones_like(input_ids)
+        encoder_hidden = self.encode(input_ids, encoder_mask)
+
+        decoder_ids = [self.config.decoder_start_token_id]
+        decoder_mask = torch.ones((1, 0), dtype=torch.long, device=self.device)
+        past = None
+        if streamer is not None:
+            streamer.put(torch.tensor(decoder_ids))
+
+        while len(decoder_ids) < max_length:
+            decoder_mask = torch.cat([decoder_mask, torch.ones((1, 1), dtype=torch.long, device=self.device)], dim=1)
+            logits, past = self.decode_step(
+                torch.tensor([[decoder_ids[-1]]], device=self.device), encoder_hidden, encoder_mask, decoder_mask, past
+            )
+            token = sampler([decoder_ids], logits, do_sample)[0]
+            decoder_ids.append(token)
+            if streamer is not None:
+                streamer.put(torch.tensor([token]))
+            if token == self.config.eos_token_id or (stopper is not None and stopper(decoder_ids)):
+                break
+
+        if streamer is not None:
+            streamer.end()
+        return decoder_ids[1:]
+
+    def generate_candidates(self, input_ids, num_candidates, max_length, do_sample=True, stopper=None,
+                            constraint=None):
+        """인코더를 한 번만 돌리고 num_candidates 개 루틴을 한 배치로 생성 (후보마다 토큰 ID 리스트)"""
+        sampler = Sampler(self.generation_config, constraint=constraint)
+        input_ids = torch.tensor([input_ids], device=self.device)
+        encoder_mask = torch.ones_like(input_ids)
+        encoder_hidden = self.encode(input_ids, encoder_mask)
+        # every candidate attends to the same encoder output
+        encoder_hidden = encoder_hidden.expand(num_candidates, -1, -1).contiguous()
+        encoder_mask = encoder_mask.expand(num_candidates, -1).contiguous()
+
+        decoder_ids = [[self.config.decoder_start_token_id] for _ in range(num_candidates)]
+        decoder_mask = torch.ones((num_candidates, 0), dtype=torch.long, device=self.device)
+        done = [False] * num_candidates
+        past = None
+
+        while not all(done) and len(decoder_ids[0]) < max_length:
+            decoder_mask = torch.cat(
+                [decoder_mask, torch.ones((num_candidates, 1), dtype=torch.long, device=self.device)], dim=1
+            )
+            logits, past = self.decode_step(
+                torch.tensor([[ids[-1]] for ids in decoder_ids], device=self.device),
+                encoder_hidden, encoder_mask, decoder_mask, past,
+            )
+            tokens = sampler(decoder_ids, logits, do_sample)
+            for row, token in enumerate(tokens):
+                # finished rows keep stepping with pad so the batch stays rectangular
+                decoder_ids[row].append(self.config.pad_token_id if done[row] else token)
+                if not done[row] and (token == self.config.eos_token_id
+                                      or (stopper is not None and stopper(decoder_ids[row]))):
+                    done[row] = True
+
+        return [self._trim(ids[1:]) for ids in decoder_ids]
+
+    def _trim(self, ids):
+        """eos 이후(패딩) 토큰 제거"""
+        if self.config.eos_token_id in ids:
+            return ids[:ids.index(self.config.eos_token_id) + 1]
+        while ids and ids[-1] == self.config.pad_token_id:
+            ids = ids[:-1]
+        return ids
+
+
+class TorchBackend(InferenceBackend):
+    """PyTorch T5ForConditionalGeneration 백엔드"""
+
+    def __init__(self, model, device):
+        self.model = model
+        self.device = device
+        self.config = model.config
+        self.generation_config = model.generation_config
+
+    def encode(self, input_ids, attention_mask):
+        return self.model.get_encoder()(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+    def decode_step(self, decoder_input_ids, encoder_hidden, encoder_mask, decoder_mask, past=None):
+        outputs = self.model(
+            encoder_outputs=(encoder_hidden,),
+            attention_mask=encoder_mask,
+            decoder_input_ids=decoder_input_ids,
+            decoder_attention_mask=decoder_mask,
+            past_key_values=past,
+            use_cache=True,
+        )
+        past = outputs.past_key_values
+        if hasattr(past, "to_legacy_cache"):
+            past = past.to_legacy_cache()
+        return outputs.logits[:, -1, :], past
+
+    def generate(self, input_ids, max_length, do_sample=True, streamer=None, stopper=None, constraint=None):
+        # HF generate is the reference implementation for the torch backend
+        sampling = {"temperature": config.TEMPERATURE} if do_sample else {}
+        stopping_criteria = StoppingCriteriaList([SentenceEndCriteria(stopper)] if stopper is not None else [])
+        logits_processor = LogitsProcessorList([StructuredLogitsProcessor(constraint)] if constraint is not None else [])
+        outputs = self.model.generate(
+            torch.tensor([input_ids], device=self.device),
+            max_length=max_length,
+            no_repeat_ngram_size=config.NO_REPEAT_NGRAM_SIZE,
+            do_sample=do_sample,
+            num_return_sequences=1,
+            streamer=streamer,
+            stopping_criteria=stopping_criteria,
+            logits_processor=logits_processor,
+            **sampling,
+        )
+        return outputs[0, 1:].tolist()
+
+    def generate_candidates(self, input_ids, num_candidates, max_length, do_sample=True, stopper=None,
+                            constraint=None):
+        # num_return_sequences encodes once and expands the encoder output to every candidate
+        sampling = {"temperature": config.TEMPERATURE} if do_sample else {}
+        stopping_criteria = StoppingCriteriaList([SentenceEndCriteria(stopper)] if stopper is not None else [])
+        logits_processor = LogitsProcessorList([StructuredLogitsProcessor(constraint)] if constraint is not None else [])
+        outputs = self.model.generate(
+            torch.tensor([input_ids], device=self.device),
+            max_length=max_length,
+            no_repeat_ngram_size=config.NO_REPEAT_NGRAM_SIZE,
+            do_sample=do_sample,
+            num_return_sequences=num_candidates,
+            stopping_criteria=stopping_criteria,
+            logits_processor=logits_processor,
+            **sampling,
+        )
+        return [self._trim(row[1:]) for row in outputs.tolist()]
+
+
+class OnnxBackend(InferenceBackend):
+    """export_onnx.py 로 내보낸 encoder / decoder / decoder_with_past 그래프를 쓰는 ONNX Runtime 백엔드 (CPU)"""
+
+    def __init__(self, onnx_path=config.ONNX_PATH, threads=config.TORCH_THREADS):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+
+        def session(name):
+            return ort.InferenceSession(os.path.join(onnx_path, name), options, providers=["CPUExecutionProvider"])
+
+        self.encoder = session("encoder.onnx")
+        self.decoder = session("decoder.onnx")
+        self.decoder_with_past = session("decoder_with_past.onnx")
+        self.config = T5Config.from_pretrained(onnx_path)
+        self.generation_config = GenerationConfig.from_pretrained(onnx_path)
+        self.num_layers = self.config.num_decoder_layers
+
+    @staticmethod
+    def _run(session, feeds):
+        # the exporter drops graph inputs that do not affect the outputs
+        names = {graph_input.name for graph_input in session.get_inputs()}
+        feeds = {name: np.ascontiguousarray(value.cpu().numpy()) for name, value in feeds.items() if name in names}
+        return [torch.from_numpy(output) for output in session.run(None, feeds)]
+
+    def encode(self, input_ids, attention_mask):
+        return self._run(self.encoder, {"input_ids": input_ids, "attention_mask": attention_mask})[0]
+
+    def decode_step(self, decoder_input_ids, encoder_hidden, encoder_mask, decoder_mask, past=None):
+        feeds = {
+            "decoder_input_ids": decoder_input_ids,
+            "decoder_attention_mask": decoder_mask,
+            "encoder_hidden_states": encoder_hidden,
+            "encoder_attention_mask": encoder_mask,
+        }
+        if past is None:
+            outputs = self._run(self.decoder, feeds)
+            present = outputs[1:]
+            past = tuple(tuple(present[4 * i:4 * i + 4]) for i in range(self.num_layers))
+            return outputs[0], past
+
+        for i, layer in enumerate(past):
+            feeds[f"past_{i}_self_key"], feeds[f"past_{i}_self_value"] = layer[0], layer[1]
+            feeds[f"past_{i}_cross_key"], feeds[f"past_{i}_cross_value"] = layer[2], layer[3]
+        outputs = self._run(self.decoder_with_past, feeds)
+        # cross-attention keys/values never change after the first step
+        past = tuple(
+            (outputs[1 + 2 * i], outputs[2 + 2 * i], layer[2], layer[3]) for i, layer in enumerate(past)
+        )
+        return outputs[0], past
+
+
+def load_backend(device, backend=None):
+    """설정(BACKEND)에 따라 추론 백엔드 생성"""
+    backend = backend or config.BACKEND
+    if backend == "onnx":
+        return OnnxBackend(config.ONNX_PATH)
+    if backend == "torch":
+        return TorchBackend(model_loader.load_model(device), device)
+    raise ValueError(f"Unknown backend: {backend} (expected torch or onnx)")
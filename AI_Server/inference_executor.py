@@ -0,0 +1,62 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import torch
+
+import config
+
+
+class InferenceQueueFull(Exception):
+    """추론 대기열이 가득 찼을 때 발생"""
+
+
+class InferenceExecutor:
+    """블로킹 모델 호출을 이벤트 루프 밖의 전용 워커 스레드에서 실행하는 executor
+
+    - 실행 중 + 대기 중인 작업이 max_queue 를 넘으면 InferenceQueueFull 로 즉시 거절
+    - model_lock 으로 모델 호출을 직렬화해 워커와 배칭 엔진이 하나의 모델을 안전하게 공유
+      (모델 복제본이 하나라 워커를 늘려도 generate 가 병렬로 돌지는 않음, 여러 워커는 토큰화 등 모델 밖 작업만 겹침)
+    - torch.set_num_threads 는 프로세스 전체의 intra-op 스레드 풀 크기이므로, 락을 잡은 한 호출이 torch_threads 개 코어를 모두 씀
+    """
+
+    def __init__(self, num_workers=config.INFERENCE_WORKERS, max_queue=config.INFERENCE_QUEUE_SIZE,
+                 torch_threads=config.TORCH_THREADS):
+        self.num_workers = num_workers
+        self.max_queue = max_queue
+        # 0 means: every core this process may run on (one model call at a time holds them all)
+        self.torch_threads = torch_threads or max(1, len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity")
+                                                  else (os.cpu_count() or 1))
+        self.model_lock = threading.Lock()
+        self.pending = 0
+
+        # process-wide intra-op pool, shared by the workers and the batching engine
+        torch.set_num_threads(self.torch_threads)
+        self._executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="inference")
+
+    @asynccontextmanager
+    async def slot(self):
+        """대기열 자리 하나를 예약 (가득 차면 InferenceQueueFull)"""
+        if self.pending >= self.max_queue:
+            raise InferenceQueueFull(f"inference queue is full ({self.max_queue})")
+        self.pending += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        """fn 을 추론 워커에서 실행하고 결과를 기다림"""
+        async with self.slot():
+            return await self.run_in_worker(fn, *args, **kwargs)
+
+    async def run_in_worker(self, fn, *args, **kwargs):
+        """slot() 을 이미 잡고 있는 호출자용: 자리 예약 없이 fn 을 추론 워커에서 실행"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
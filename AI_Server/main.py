@@ -1,13 +1,33 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from transformers import T5TokenizerFast, T5ForConditionalGeneration
+from transformers import T5TokenizerFast
+from transformers.generation.streamers import BaseStreamer
 import torch
 import parsing_routine
 import audio_analysis
-import tempfile
 import os
-import httpx
+import time
+import wave
 import emotion_mapping
+import asyncio
+import json
+import config
+from inference_backend import load_backend
+import psutil
+from prompt_compiler import PromptCompiler
+from decode_budget import SentenceEndStopper, resolve_max_length
+import structured_output
+from routine_cache import RoutineCache, make_key
+from routine_history import RoutineHistory
+from batching import ContinuousBatchingEngine
+from inference_executor import InferenceExecutor, InferenceQueueFull
+from hume_jobs import HumeJobWaiter
+from audio_buffer import AudioBuffer, AudioTooLarge
+import audio_ingest
+import prosody
+from speech_stream import StreamingTranscriber, strip_wav_header, to_wav
+from contextlib import asynccontextmanager, aclosing
 
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 # # Load model 
@@ -15,142 +35,424 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
 # # Apple Silicon GPU
 # device = torch.device("mps" if torch.backends.mps.is_available() else "cpu")
-tokenizer = T5TokenizerFast.from_pretrained("paust/pko-chat-t5-large")
-model = T5ForConditionalGeneration.from_pretrained("VOICE_model")
-model.to(device)
+tokenizer = T5TokenizerFast.from_pretrained(config.TOKENIZER_PATH)
+# torch or onnx runtime, selected by BACKEND
+backend = load_backend(device)
+# instruction prefix is tokenized once, only the situation is tokenized per request
+compiler = PromptCompiler(tokenizer)
+# structured output: the model writes the device updates itself (trie-constrained), no parser call needed
+constraint = structured_output.StructuredConstraint(tokenizer) if config.STRUCTURED_OUTPUT else None
+# decode budget from the training routine lengths, and stop once "~할게요." is complete
+# (not in structured mode, the updates follow the sentence)
+max_length = resolve_max_length(tokenizer, structured=config.STRUCTURED_OUTPUT)
+stopper = SentenceEndStopper(tokenizer) if config.STOP_AT_SENTENCE_END and not config.STRUCTURED_OUTPUT else None
+
+# dedicated worker threads for blocking model calls (keeps the event loop free)
+executor = InferenceExecutor()
+# normalized situation + emotion -> recent routine responses
+cache = RoutineCache()
+# per-user recently recommended routines, so the same user is not offered the same routine twice in a row
+history = RoutineHistory()
+# Hume job completion via /hume_callback/ webhook, with async polling as fallback
+hume_jobs = HumeJobWaiter()
+# Google streaming recognition for /voice_stream/ (speech client created on first use)
+transcriber = StreamingTranscriber()
+# batches concurrent /recommend_routine/ requests into shared encoder/decoder passes
+engine = ContinuousBatchingEngine(
+    backend, device, executor=executor, max_length=max_length, stopper=stopper, constraint=constraint
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config.BATCHING_ENABLED:
+        engine.start()
+    if config.STT_BACKEND == "local":
+        # loading the local ASR model takes seconds, do it before the first voice request
+        await asyncio.to_thread(audio_analysis.get_stt_backend().load)
+    yield
+    if config.BATCHING_ENABLED:
+        engine.stop()
+    executor.shutdown()
+    audio_ingest.decode_pool.shutdown()
+    cache.close()
+    await hume_jobs.client.aclose()
 
 # Create FastAPI app
-app = FastAPI()
-
-input_template = '''
-당신은 모든 종류의 상황에서 적절한 가전기기 제어 루틴을 추천하는 AI입니다.
-일상적인 상황부터 매우 독특하고 예상치 못한 상황까지, 모든 순간에 맞는 스마트홈 루틴을 제안해주세요.
-사용자는 자신의 상황을 반말로 표현하며, 당신은 공감하며 친절하게 "~할게요" 형식으로 루틴을 제안합니다.
-
-사용 가능한 가전기기 목록 (이 기기들만 사용할 수 있음):
-- 에어컨: 온도, 세기, 모드 설정값 명시
-- 공기청정기
-- 로봇청소기: 모드(청소 시작/청소 중지 중 선택)만 명시
-- 세탁기
-- 건조기
-- 스타일러
-- TV
-- 정수기: 온수/냉수/정수 중 선택
-- 식기세척기
-- 월패드: 조명 조절(밝게/어둡게)만 가능
-
-응답 시 지켜야 할 사항:
-1. 가전기기가 직접 실행할 수 있는 동작만 포함할 것
-2. 사람이 직접 해야 하는 행동은 제외할 것 (예: 빨래 널기, 식기 정리하기 등)
-3. 각 기기의 설정값을 구체적으로 명시할 것
-4. 목적이나 의도는 자유롭게 포함 가능
-5. 위에 명시된 가전기기만 사용할 것 (창문, 커튼 등 다른 요소 언급 금지)
-
-좋은 예시:
-- "편안한 취침을 위해 에어컨을 26도로 설정하고 월패드로 조명을 어둡게 하고 TV를 끌게요."
-- "상쾌한 아침을 위해 로봇청소기 청소를 시작하고 공기청정기를 강하게 켤게요."
-- "영화 감상을 위해 에어컨을 24도로 맞추고 TV를 켜고 월패드로 조명을 어둡게 설정할게요."
-
-나쁜 예시:
-- "정수기에서 온수를 받아서 라면을 끓일게요." (사람이 직접 하는 행동 포함)
-- "세탁기를 돌리고 빨래를 널어둘게요." (빨래 널기는 기기가 할 수 없는 동작)
-- "식기세척기를 비우고 설거지를 시작할게요." (식기 정리는 사람의 행동)
-
-현재 상황 정보 : {}
-'''
-
-input_template = input_template.replace("\n", " ").strip()
+app = FastAPI(lifespan=lifespan)
+
 
 class InputData(BaseModel):
     situation: str
+    user_id: str = ""  # empty = anonymous: no per-user history, a single candidate
 
-# handling text based routine recommendation
-@app.post('/recommend_routine/')
-async def recommend_routine(data: InputData):
-    prev_response = dict()
-    input_text = data.situation
-    print(input_text)
-    situation = input_template.format(input_text)
-    # situation = input_text
-    # convert to token & load to device
-    input_ids = tokenizer(situation, return_tensors="pt").input_ids.to(device)
-
-    while True:
-        # model prediction
-        outputs = model.generate(
-            input_ids,
-            max_length=1024,
-            temperature=0.5,
-            no_repeat_ngram_size=6,
-            do_sample=True,
-            num_return_sequences=1,
+class AsyncTokenStreamer(BaseStreamer):
+    """backend.generate 가 만든 토큰을 이벤트 루프의 asyncio.Queue 로 넘기는 streamer"""
+
+    def __init__(self, loop, tokens):
+        self.loop = loop
+        self.tokens = tokens
+        self.started = False
+
+    def put(self, value):
+        # the first call carries the decoder start token
+        if not self.started:
+            self.started = True
+            return
+        for token in value.flatten().tolist():
+            self.loop.call_soon_threadsafe(self.tokens.put_nowait, token)
+
+    def end(self):
+        self.loop.call_soon_threadsafe(self.tokens.put_nowait, None)
+
+def generate_blocking(input_ids, streamer=None):
+    """inference 워커 스레드에서 실행되는 단일 요청 생성"""
+    with executor.model_lock, torch.inference_mode():
+        return backend.generate(
+            input_ids, max_length=max_length, streamer=streamer, stopper=stopper, constraint=constraint
         )
 
-        routine = tokenizer.batch_decode(outputs, skip_special_tokens=True)[0]
+def generate_candidates_blocking(input_ids, num_candidates):
+    """inference 워커 스레드에서 실행되는 후보 생성 (인코더 1회 + 후보 배치 디코딩)"""
+    with executor.model_lock, torch.inference_mode():
+        return backend.generate_candidates(
+            input_ids, num_candidates, max_length=max_length, stopper=stopper, constraint=constraint
+        )
+
+async def generate_candidates(input_ids, num_candidates):
+    """이벤트 루프를 막지 않고 루틴 후보 num_candidates 개 생성"""
+    if config.BATCHING_ENABLED:
+        async with executor.slot():
+            return await engine.generate_candidates(input_ids, num_candidates)
+    return await executor.run(generate_candidates_blocking, input_ids, num_candidates)
+
+async def stream_tokens(input_ids):
+    """생성되는 루틴 토큰 ID 를 하나씩 yield"""
+    if config.BATCHING_ENABLED:
+        async with executor.slot():
+            async for token in engine.stream(input_ids):
+                yield token
+        return
+
+    # reserve the slot before starting, so a full queue raises InferenceQueueFull here
+    async with executor.slot():
+        tokens = asyncio.Queue()
+        streamer = AsyncTokenStreamer(asyncio.get_running_loop(), tokens)
+        task = asyncio.ensure_future(executor.run_in_worker(generate_blocking, input_ids, streamer))
+        # a failed generate never calls streamer.end(), so the task's completion also ends the stream
+        task.add_done_callback(lambda _: tokens.put_nowait(None))
+        while True:
+            token = await tokens.get()
+            if token is None:
+                break
+            yield token
+        # re-raises the generate error, if any
+        await task
 
-        # remove duplicated routine recommendation
-        if prev_response.get(input_text) == None or prev_response[input_text] != routine :
-            prev_response[input_text] = routine
-            break
+async def parse_routine(text):
+    """생성 결과를 (루틴 문장, 기기 제어 결과) 로 변환 (structured 모드에서 suffix 가 있으면 파서 호출 없음)"""
+    routine, routine_output = structured_output.split_output(text) if config.STRUCTURED_OUTPUT else (text, None)
+    if routine_output is None:
+        # local parser first, low-confidence routines go to the shared async LLM client
+        parsed = await parsing_routine.get_parser_service().aparse(routine)
+        routine_output = parsed.model_dump() if parsed is not None else None
+    return routine, routine_output
+
+def sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@app.get('/health/')
+async def health():
+    return {"status": "ok", "inference_pending": executor.pending}
+
+@app.get('/worker_stats/')
+async def worker_stats():
+    # uss = memory private to this worker, pss = rss with shared (mmap'd weight) pages split between workers
+    process = psutil.Process()
+    memory = process.memory_full_info()
+    return {
+        "pid": process.pid,
+        "cpu_affinity": process.cpu_affinity(),
+        "rss_mb": memory.rss / 2**20,
+        "uss_mb": memory.uss / 2**20,
+        "pss_mb": getattr(memory, "pss", 0) / 2**20,
+    }
+
+@app.get('/cache_stats/')
+async def cache_stats():
+    return {**cache.snapshot(), "history": history.snapshot()}
+
+async def recommend(input_text, user_id=""):
+    """상황 문장 -> 루틴 + 기기 제어 결과 (/recommend_routine/ 와 /voice_analysis/ 가 함께 쓰는 서비스 함수)"""
+    cache_key = make_key(input_text)
+    if config.CACHE_ENABLED:
+        cached = cache.get(cache_key)
+        # a cached routine this user just got counts as a miss
+        if cached is not None and not (user_id and history.seen(user_id, cached["routine"])):
+            if user_id:
+                history.add(user_id, cached["routine"])
+            return cached
+
+    # convert to token (cached template prefix + situation)
+    input_ids = compiler.encode(input_text)
+
+    # model prediction (off the event loop): N candidates in one pass instead of regenerating on a duplicate
+    # (anonymous requests share no history, so there is nothing to pick between)
+    try:
+        candidates = await generate_candidates(input_ids, config.NUM_CANDIDATES if user_id else 1)
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    texts = [tokenizer.decode(output_ids, skip_special_tokens=True) for output_ids in candidates]
+    if config.STRUCTURED_OUTPUT:
+        routines = [structured_output.split_output(text)[0] for text in texts]
+    else:
+        routines = texts
+
+    # remove duplicated routine recommendation
+    routine = history.pick(user_id, routines) if user_id else routines[0]
 
     # routine = "시원해지시게끔 에어컨을 24도로 설정하고, 정수기에서 냉수 준비해드릴게요."
 
-    routine_output = parsing_routine.parse_device_control(routine)
+    routine, routine_output = await parse_routine(texts[routines.index(routine)])
+    if routine_output is None:
+        raise HTTPException(status_code=502, detail="Failed to parse routine")
 
     routine_output["routine"] = routine
+
+    if config.CACHE_ENABLED:
+        cache.put(cache_key, routine_output)
     
     return routine_output
 
+# handling text based routine recommendation
+@app.post('/recommend_routine/')
+async def recommend_routine(data: InputData):
+    print(data.situation)
+    return await recommend(data.situation, data.user_id)
+
+async def routine_events(input_text, user_id=""):
+    """루틴 텍스트 조각(token 이벤트)을 생성되는 대로 보내고, 파싱된 기기 제어 결과를 마지막(result 이벤트)에 보냄"""
+    cache_key = make_key(input_text)
+    if config.CACHE_ENABLED:
+        cached = cache.get(cache_key)
+        if cached is not None and not (user_id and history.seen(user_id, cached["routine"])):
+            if user_id:
+                history.add(user_id, cached["routine"])
+            yield sse("token", {"text": cached["routine"]})
+            yield sse("result", cached)
+            return
+
+    input_ids = compiler.encode(input_text)
+    output_ids = []
+    sent = ""
+    try:
+        async for token in stream_tokens(input_ids):
+            output_ids.append(token)
+            text = tokenizer.decode(output_ids, skip_special_tokens=True)
+            if config.STRUCTURED_OUTPUT:
+                # the "### updates" suffix is for the result event, not for TTS
+                text = structured_output.visible_text(text)
+            # wait for the rest of a multi-byte character
+            if text.endswith("\ufffd") or len(text) <= len(sent):
+                continue
+            yield sse("token", {"text": text[len(sent):]})
+            sent = text
+    except InferenceQueueFull as e:
+        yield sse("error", {"detail": str(e)})
+        return
+    except Exception as e:
+        # the response has already started: end it with an error event rather than a dropped stream
+        print(f"Error generating routine: {str(e)}")
+        yield sse("error", {"detail": "Routine generation failed"})
+        return
+
+    try:
+        routine, routine_output = await parse_routine(tokenizer.decode(output_ids, skip_special_tokens=True))
+    except Exception as e:
+        print(f"Error parsing routine: {str(e)}")
+        yield sse("error", {"detail": "Failed to parse routine"})
+        return
+    # a single streamed sequence cannot be swapped for another candidate, only recorded
+    if user_id:
+        history.add(user_id, routine)
+    if len(routine) > len(sent):
+        yield sse("token", {"text": routine[len(sent):]})
+
+    if routine_output is None:
+        yield sse("error", {"detail": "Failed to parse routine", "routine": routine})
+        return
+
+    routine_output["routine"] = routine
+    if config.CACHE_ENABLED:
+        cache.put(cache_key, routine_output)
+    yield sse("result", routine_output)
+
+# streaming variant: Server-Sent Events so the speaker can start TTS on the first clause
+@app.post('/recommend_routine/stream')
+async def recommend_routine_stream(data: InputData):
+    print(data.situation)
+    return StreamingResponse(routine_events(data.situation, data.user_id), media_type="text/event-stream")
+
+# Hume batch job completion notifications (callback_url of the job)
+@app.post('/hume_callback/')
+async def hume_callback(request: Request, token: str = ""):
+    if config.HUME_CALLBACK_TOKEN and token != config.HUME_CALLBACK_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid callback token")
+    payload = await request.json()
+    status = payload.get("status") or payload.get("state", {}).get("status")
+    hume_jobs.notify(payload.get("job_id"), status, payload.get("predictions"))
+    return {"status": "ok"}
+
+async def analyze_prosody(source, backend):
+    """음성의 운율 감정 분석 (Hume batch 작업 또는 로컬 추정기, 둘 다 Hume predictions 모양)"""
+    if backend == "local":
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(audio_ingest.decode_pool, prosody.analyze, source)
+        except (wave.Error, EOFError, ValueError) as e:
+            # same shape as a failed Hume job, the routine is still recommended without an emotion
+            return {"error": f"Local prosody analysis failed: {str(e)}"}
+    return await hume_jobs.analyze(source)
+
+def voice_input(text, hume_results):
+    """인식된 문장 + Hume 최고 감정 -> 루틴 추천 입력 문장"""
+    print("\n=== 최종 분석 결과 ===")
+    print("-" * 40)
+    top_emotion = audio_analysis.get_top_emotion(hume_results)
+    print(f"{text} ({top_emotion})")
+    top_emotion = emotion_mapping.map_emotion(top_emotion)
+    return f"{text} ({top_emotion})"
+
 # handling voice audio file analysis & convert it into input text
 @app.post('/voice_analysis/')
-async def voice_analysis(audio: UploadFile = File(...)):
-    if audio.content_type != "audio/wave":
-        raise HTTPException(status_code=400, detail="Only .wav file format is supported!");
+async def voice_analysis(audio: UploadFile = File(...), prosody_backend: str = config.PROSODY_BACKEND,
+                         stt_backend: str = None, user_id: str = ""):
+    if prosody_backend not in prosody.BACKENDS:
+        raise HTTPException(status_code=400, detail=f"prosody_backend must be one of {prosody.BACKENDS}")
+    # without an override the configured STT_BACKEND is used
+    if stt_backend is not None and stt_backend not in config.STT_REQUEST_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"stt_backend must be one of {config.STT_REQUEST_BACKENDS}")
+    audio_format = audio_ingest.AUDIO_FORMATS.get(audio.content_type)
+    if audio_format is None:
+        raise HTTPException(status_code=400, detail="Only .wav, .flac and .ogg (opus) file formats are supported!");
 
-    # save file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        file_path = tmp.name
-        tmp.write(await audio.read())
+    received = time.perf_counter()
 
+    # read the upload once; both stages get the same bytes (a temp file only past AUDIO_SPILL_BYTES)
     try:
-        # Google STT analysis
-        google_results = audio_analysis.analyze_with_google(file_path)
-        audio_analysis.print_google_results(google_results)
+        buffer = await AudioBuffer.read(audio)
+    except AudioTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    source = buffer.source()
+
+    timings = {}
 
-        # Hume AI audio file analysis (extract extra verbal details)
-        hume_results = audio_analysis.analyze_with_hume(file_path)
+    async def timed(stage, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[f"{stage}_ms"] = (time.perf_counter() - start) * 1000
+
+    try:
+        # compressed uploads decoded to the canonical 16kHz mono wav, then normalized / trimmed
+        try:
+            source, audio_report, stage_timings = await audio_ingest.prepare_audio(source, audio_format)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if isinstance(source, str):
+            # preprocessed spill file, removed with the buffer
+            buffer.adopt(source)
+        timings.update(stage_timings)
+
+        # STT and Hume AI audio file analysis (extract extra verbal details) run concurrently,
+        # so the voice latency is max(STT, Hume) + routine generation
+        # (prosody_backend=local swaps Hume for the in-process estimator, same label set;
+        # stt_backend=local transcribes on this machine instead of calling Google)
+        stt_results, hume_results = await asyncio.gather(
+            timed("stt", asyncio.to_thread(audio_analysis.transcribe, source, stt_backend)),
+            timed("hume" if prosody_backend == "hume" else "prosody", analyze_prosody(source, prosody_backend)),
+        )
+        audio_analysis.print_stt_results(stt_results)
         audio_analysis.print_hume_results(hume_results)
 
-        if google_results and hume_results and 'error' not in google_results: 
-            print("\n=== 최종 분석 결과 ===")
-            print("-" * 40)
-            text = google_results['text']
-            top_emotion = audio_analysis.get_top_emotion(hume_results)
-            print(f"{text} ({top_emotion})")
-            top_emotion = emotion_mapping.map_emotion(top_emotion)
-            final_input = f"{text} ({top_emotion})"
-
-        # Send POST request to `/recommend_routine/`
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    # "http://3.133.23.226:8000/recommend_routine/",
-                    "http://127.0.0.1:8000/recommend_routine/",
-                    json={"situation": final_input},
-                    timeout=60.0
-                )
-
-            # Check if the request was successful
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Failed to get routine: {response.text}"
-                )
+        if stt_results and hume_results and 'error' not in stt_results: 
+            final_input = voice_input(stt_results['text'], hume_results)
+
+            # routine recommendation in-process (no loopback HTTP request)
+            start = time.perf_counter()
+            routine_output = await recommend(final_input, user_id)
+            timings["recommend_ms"] = (time.perf_counter() - start) * 1000
+            timings["total_ms"] = (time.perf_counter() - received) * 1000
+            print(f"Voice analysis timings: {timings}")
+
+            return {**routine_output, "timings": timings, "audio": audio_report}
     finally:
-        # delete temporarily save file
-        if os.path.exists(file_path):
-                    os.remove(file_path)
+        # release the audio (and the spill file, if any)
+        buffer.close()
+
+# streaming voice analysis: 16kHz mono LINEAR16 audio (raw PCM or a wav stream) as binary frames while recording,
+# then a text frame (e.g. "end") once the upload is done. ?prosody_backend=hume|local picks the emotion backend.
+# sends {"type": "interim" | "final", "text"} transcripts as they arrive, then the routine ({"type": "result", ...})
+@app.websocket('/voice_stream/')
+async def voice_stream(websocket: WebSocket, prosody_backend: str = config.PROSODY_BACKEND, user_id: str = ""):
+    await websocket.accept()
+    if prosody_backend not in prosody.BACKENDS:
+        await websocket.close(code=1008, reason=f"prosody_backend must be one of {prosody.BACKENDS}")
+        return
+    received = time.perf_counter()
+    pcm = bytearray()
+    timings = {}
+    too_large = False
+
+    async def chunks():
+        nonlocal too_large
+        while True:
+            message = await websocket.receive()
+            if message.get("bytes") is None:
+                return
+            chunk = strip_wav_header(message["bytes"]) if not pcm else message["bytes"]
+            # same limit as /voice_analysis/ uploads: stop reading, the connection is closed below
+            if len(pcm) + len(chunk) > config.AUDIO_MAX_BYTES:
+                too_large = True
+                return
+            pcm.extend(chunk)
+            yield chunk
 
+    try:
+        text = None
+        async with aclosing(transcriber.transcribe(chunks())) as events:
+            async for kind, transcript in events:
+                if too_large:
+                    break
+                await websocket.send_json({"type": kind, "text": transcript})
+                if kind == "error":
+                    return
+                if kind == "final":
+                    text = transcript
+                    break
+        if too_large:
+            await websocket.close(code=1009, reason=f"Audio is larger than {config.AUDIO_MAX_BYTES} bytes")
+            return
+        timings["final_transcript_ms"] = (time.perf_counter() - received) * 1000
+        if not text:
+            await websocket.send_json({"type": "error", "text": "음성 변환 실패"})
+            return
+
+        # speech has ended, so the audio so far holds the whole utterance
+        start = time.perf_counter()
+        hume_results = await analyze_prosody(to_wav(pcm), prosody_backend)
+        timings["hume_ms" if prosody_backend == "hume" else "prosody_ms"] = (time.perf_counter() - start) * 1000
+        audio_analysis.print_hume_results(hume_results)
 
-    
\ No newline at end of file
+        start = time.perf_counter()
+        routine_output = await recommend(voice_input(text, hume_results), user_id)
+        timings["recommend_ms"] = (time.perf_counter() - start) * 1000
+        timings["total_ms"] = (time.perf_counter() - received) * 1000
+        print(f"Voice stream timings: {timings}")
+        await websocket.send_json({"type": "result", **routine_output, "timings": timings})
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "text": e.detail})
+    except WebSocketDisconnect:
+        return
+    await websocket.close()
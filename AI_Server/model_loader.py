@@ -0,0 +1,62 @@
+import os
+
+import torch
+from transformers import T5Config, T5ForConditionalGeneration
+
+import config
+
+PRECISIONS = ("fp32", "bf16", "int8")
+
+
+def export_shared_weights(model_path=config.MODEL_PATH, weights_path=config.SHARED_WEIGHTS_PATH, dtype=torch.float32):
+    """VOICE_model 가중치를 mmap 으로 열 수 있는 단일 state_dict 파일로 저장"""
+    model = T5ForConditionalGeneration.from_pretrained(model_path, torch_dtype=dtype)
+    state_dict = {name: tensor.contiguous() for name, tensor in model.state_dict().items()}
+    tmp_path = f"{weights_path}.tmp"
+    torch.save(state_dict, tmp_path)
+    os.replace(tmp_path, weights_path)
+    print(f"Exported shared weights: {weights_path} ({dtype})")
+
+
+def load_shared_model(model_path=config.MODEL_PATH, weights_path=config.SHARED_WEIGHTS_PATH):
+    """가중치를 복사하지 않고 read-only mmap 으로 붙여 모델 생성
+
+    같은 파일을 여는 모든 워커 프로세스가 OS page cache 의 한 사본을 공유함
+    """
+    with torch.device("meta"):
+        model = T5ForConditionalGeneration(T5Config.from_pretrained(model_path))
+
+    state_dict = torch.load(weights_path, map_location="cpu", mmap=True, weights_only=True)
+    model.load_state_dict(state_dict, assign=True)
+    model.tie_weights()
+    return model
+
+
+def apply_precision(model, precision, device):
+    """서빙 정밀도 적용 (fp32 / bf16 / int8)"""
+    if precision == "fp32":
+        return model.float()
+    if precision == "bf16":
+        # no-op (and still shared) when the mmap'd weights were exported in bf16
+        return model.to(torch.bfloat16)
+    if precision == "int8":
+        if device.type != "cpu":
+            raise ValueError("int8 dynamic quantization is only supported on CPU")
+        # int8 Linear weights, activations are quantized on the fly per batch
+        return torch.ao.quantization.quantize_dynamic(model.float(), {torch.nn.Linear}, dtype=torch.qint8)
+    raise ValueError(f"Unknown precision: {precision} (expected one of {PRECISIONS})")
+
+
+def load_model(device, precision=None):
+    """설정에 따라 VOICE_model 을 불러와 정밀도를 적용하고 device 에 올림"""
+    precision = precision or config.PRECISION
+    if config.SHARED_WEIGHTS_PATH and os.path.exists(config.SHARED_WEIGHTS_PATH):
+        model = load_shared_model(config.MODEL_PATH, config.SHARED_WEIGHTS_PATH)
+    else:
+        model = T5ForConditionalGeneration.from_pretrained(config.MODEL_PATH)
+
+    model = apply_precision(model, precision, device)
+    model.to(device)
+    model.eval()
+    print(f"Loaded {config.MODEL_PATH} ({precision}) on {device}")
+    return model
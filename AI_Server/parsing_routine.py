@@ -1,27 +1,50 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_anthropic import ChatAnthropic
-from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import BaseOutputParser
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from pydantic import BaseModel, ValidationError, model_validator
 from dotenv import load_dotenv
-import json
+from typing import List, Optional
+import asyncio
+import config
+import device_parser
 
 load_dotenv()
 
-class LowercaseBooleanJsonParser(JsonOutputParser):
-    def parse(self, text):
-        parsed = super().parse(text)
-        result = json.loads(
-            json.dumps(parsed, default=str).replace('True', 'true').replace('False', 'false')
-        )
-        
-        for update in result["updates"]:
-            if update["onoff"].upper() == "OFF":
-                update["state"] = "대기"
-                update["is_active"] = False
-                update["onoff"] = "off"
-            else:
-                update["onoff"] = "on"
-                
-        return result
+class DeviceUpdate(BaseModel):
+    appliance_id: int
+    user_id: int = 6
+    name: str
+    onoff: str
+    state: str
+    is_active: bool
+
+    @model_validator(mode="after")
+    def apply_onoff_rules(self):
+        # off -> state "대기", is_active false, lowercase onoff
+        if self.onoff.upper() == "OFF":
+            self.state = "대기"
+            self.is_active = False
+            self.onoff = "off"
+        else:
+            self.onoff = "on"
+        return self
+
+class DeviceControl(BaseModel):
+    updates: List[DeviceUpdate]
+
+class DeviceControlOutputParser(BaseOutputParser[DeviceControl]):
+    """LLM 응답의 JSON 객체를 바로 DeviceControl 로 검증 (앞뒤 설명 문장이나 ``` 블록은 무시)"""
+
+    def parse(self, text: str) -> DeviceControl:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end < start:
+            raise OutputParserException(f"No JSON object in LLM output: {text}")
+        try:
+            return DeviceControl.model_validate_json(text[start:end + 1])
+        except ValidationError as e:
+            raise OutputParserException(f"Invalid device control JSON: {e}")
 
 def create_device_state_prompt() -> ChatPromptTemplate:
     chat_template = ChatPromptTemplate.from_template(
@@ -83,22 +106,108 @@ def create_device_state_prompt() -> ChatPromptTemplate:
 
 def create_parser_chain(llm: ChatAnthropic):
     prompt = create_device_state_prompt()
-    parser = LowercaseBooleanJsonParser()
+    parser = DeviceControlOutputParser()
     chain = prompt | llm | parser
     return chain
 
+def parse_locally(control_text: str) -> Optional[DeviceControl]:
+    """로컬 파서 결과가 충분히 확실하면 DeviceControl, 아니면 None"""
+    result, confidence = device_parser.parse_locally(control_text)
+    if result is not None and confidence >= config.LOCAL_PARSER_MIN_CONFIDENCE:
+        return DeviceControl.model_validate(result)
+    print(f"Local parser confidence {confidence:.2f}, falling back to LLM")
+    return None
+
+class RoutineParserService:
+    """프로세스 동안 하나만 만들어 쓰는 비동기 기기 제어 파서
+
+    - ChatAnthropic 클라이언트(와 HTTP connection pool) 하나를 재사용
+    - 여러 루틴은 abatch 로 한 번에 보내고 max_concurrency 로 동시 요청 수 제한
+    - token bucket(InMemoryRateLimiter) 으로 초당 요청 수 제한, 요청별/배치별 timeout
+    - 응답은 DeviceControl 로 바로 검증
+    """
+
+    def __init__(self, model=config.PARSER_MODEL, base_url=config.PARSER_BASE_URL, api_key=None,
+                 requests_per_second=config.PARSER_REQUESTS_PER_SECOND, max_burst=config.PARSER_MAX_BURST,
+                 max_concurrency=config.PARSER_MAX_CONCURRENCY, timeout=config.PARSER_TIMEOUT_SECONDS,
+                 batch_timeout=config.PARSER_BATCH_TIMEOUT_SECONDS, use_local=config.LOCAL_PARSER_ENABLED):
+        self.rate_limiter = InMemoryRateLimiter(
+            requests_per_second=requests_per_second, check_every_n_seconds=0.01, max_bucket_size=max_burst
+        )
+        client_options = {}
+        if base_url:
+            client_options["base_url"] = base_url
+        if api_key:
+            client_options["api_key"] = api_key
+        self.llm = ChatAnthropic(
+            model=model,
+            temperature=0.3,
+            timeout=timeout,
+            max_retries=1,
+            rate_limiter=self.rate_limiter,
+            **client_options,
+        )
+        self.chain = create_parser_chain(self.llm)
+        self.max_concurrency = max_concurrency
+        self.batch_timeout = batch_timeout
+        self.use_local = use_local
+
+    async def aparse_many(self, control_texts: List[str]) -> List[Optional[DeviceControl]]:
+        """여러 기기 제어 문장을 파싱 (로컬 파서로 안 되는 것만 LLM 에 한 번에 보냄), 실패한 항목은 None"""
+        results = [parse_locally(text) if self.use_local else None for text in control_texts]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        try:
+            outputs = await asyncio.wait_for(
+                self.chain.abatch(
+                    [{"text": control_texts[i]} for i in pending],
+                    config={"max_concurrency": self.max_concurrency},
+                    return_exceptions=True,
+                ),
+                timeout=self.batch_timeout,
+            )
+        except asyncio.TimeoutError:
+            print(f"Error parsing device control: batch of {len(pending)} timed out after {self.batch_timeout}s")
+            return results
+
+        for i, output in zip(pending, outputs):
+            if isinstance(output, Exception):
+                print(f"Error parsing device control: {str(output)}")
+            else:
+                results[i] = output
+        return results
+
+    async def aparse(self, control_text: str) -> Optional[DeviceControl]:
+        return (await self.aparse_many([control_text]))[0]
+
+    def parse_llm(self, control_text: str) -> Optional[DeviceControl]:
+        """동기 코드(벤치마크, 스크립트)용 LLM 파싱"""
+        try:
+            return self.chain.invoke({"text": control_text})
+        except Exception as e:
+            print(f"Error parsing device control: {str(e)}")
+            return None
+
+_service = None
+
+def get_parser_service() -> RoutineParserService:
+    global _service
+    if _service is None:
+        _service = RoutineParserService()
+    return _service
+
 def parse_device_control(control_text: str):
-    """기기 제어 문장을 파싱하여 JSON 형태로 변환합니다."""
-    llm = ChatAnthropic(
-        model="claude-3-opus-20240229",
-        temperature=0.3
-    )
-    
-    try:
-        parser_chain = create_parser_chain(llm)
-        result = parser_chain.invoke({"text": control_text})
-        return result
-    
-    except Exception as e:
-        print(f"Error parsing device control: {str(e)}")
-        return None
\ No newline at end of file
+    """기기 제어 문장을 파싱하여 JSON 형태로 변환합니다. (로컬 파서 우선, 신뢰도가 낮을 때만 LLM)"""
+    if config.LOCAL_PARSER_ENABLED:
+        result = parse_locally(control_text)
+        if result is not None:
+            return result.model_dump()
+
+    return parse_device_control_llm(control_text)
+
+def parse_device_control_llm(control_text: str):
+    """LLM(Claude) 으로 기기 제어 문장을 파싱합니다."""
+    result = get_parser_service().parse_llm(control_text)
+    return result.model_dump() if result is not None else None
@@ -0,0 +1,110 @@
+input_template = '''
+당신은 모든 종류의 상황에서 적절한 가전기기 제어 루틴을 추천하는 AI입니다.
+일상적인 상황부터 매우 독특하고 예상치 못한 상황까지, 모든 순간에 맞는 스마트홈 루틴을 제안해주세요.
+사용자는 자신의 상황을 반말로 표현하며, 당신은 공감하며 친절하게 "~할게요" 형식으로 루틴을 제안합니다.
+
+사용 가능한 가전기기 목록 (이 기기들만 사용할 수 있음):
+- 에어컨: 온도, 세기, 모드 설정값 명시
+- 공기청정기
+- 로봇청소기: 모드(청소 시작/청소 중지 중 선택)만 명시
+- 세탁기
+- 건조기
+- 스타일러
+- TV
+- 정수기: 온수/냉수/정수 중 선택
+- 식기세척기
+- 월패드: 조명 조절(밝게/어둡게)만 가능
+
+응답 시 지켜야 할 사항:
+1. 가전기기가 직접 실행할 수 있는 동작만 포함할 것
+2. 사람이 직접 해야 하는 행동은 제외할 것 (예: 빨래 널기, 식기 정리하기 등)
+3. 각 기기의 설정값을 구체적으로 명시할 것
+4. 목적이나 의도는 자유롭게 포함 가능
+5. 위에 명시된 가전기기만 사용할 것 (창문, 커튼 등 다른 요소 언급 금지)
+
+좋은 예시:
+- "편안한 취침을 위해 에어컨을 26도로 설정하고 월패드로 조명을 어둡게 하고 TV를 끌게요."
+- "상쾌한 아침을 위해 로봇청소기 청소를 시작하고 공기청정기를 강하게 켤게요."
+- "영화 감상을 위해 에어컨을 24도로 맞추고 TV를 켜고 월패드로 조명을 어둡게 설정할게요."
+
+나쁜 예시:
+- "정수기에서 온수를 받아서 라면을 끓일게요." (사람이 직접 하는 행동 포함)
+- "세탁기를 돌리고 빨래를 널어둘게요." (빨래 널기는 기기가 할 수 없는 동작)
+- "식기세척기를 비우고 설거지를 시작할게요." (식기 정리는 사람의 행동)
+
+현재 상황 정보 : {}
+'''
+
+input_template = input_template.replace("\n", " ").strip()
+
+# situations used to check that splicing reproduces the full-prompt tokenization
+PROBE_SITUATIONS = [
+    "퇴근하고 집에 왔는데 너무 더워.",
+    "새벽에 갑자기 영화 보고 싶네. (흥분)",
+    "TV 보면서 쉬고 싶어!",
+]
+
+
+class PromptCompiler:
+    """고정된 instruction prefix 는 한 번만 토크나이즈해 캐시하고, 요청마다 상황 문장만 토크나이즈해 이어 붙임
+
+    prefix 는 슬롯 앞의 공백에서 끊고 그 공백은 상황 쪽에 붙여 토크나이즈하므로
+    (SentencePiece/BPE 모두 공백 경계를 넘어 병합하지 않음) 전체 프롬프트를 토크나이즈한 결과와 같음.
+    생성 시 PROBE_SITUATIONS 로 이를 확인하고, 다르면 전체 토크나이즈로 대신함
+    """
+
+    def __init__(self, tokenizer, template=input_template):
+        self.tokenizer = tokenizer
+        self.template = template
+
+        slot = template.index("{}")
+        self.prefix_text = template[:slot].rstrip()
+        self.joiner = template[len(self.prefix_text):slot]
+        self.suffix_text = template[slot + 2:]
+
+        self.prefix_ids = tokenizer(self.prefix_text, add_special_tokens=False).input_ids
+        self.suffix_ids = tokenizer(self.suffix_text, add_special_tokens=False).input_ids if self.suffix_text else []
+        self.special_ids = tokenizer.build_inputs_with_special_tokens([])
+
+        truncated = len(self.prefix_ids) + 4
+        self.exact = all(
+            self.encode(situation) == self._encode_full(situation)
+            and self.encode(situation, truncated) == self._encode_full(situation, truncated)
+            for situation in PROBE_SITUATIONS
+        )
+        if not self.exact:
+            print("Warning: prompt splicing differs from full tokenization, falling back to full prompts")
+
+    def render(self, situation):
+        """상황 문장을 템플릿에 넣은 전체 프롬프트 문자열"""
+        return self.template.format(situation)
+
+    def split(self, prompt):
+        """전체 프롬프트 문자열에서 상황 문장만 꺼냄 (템플릿 형식이 아니면 None)"""
+        head = self.prefix_text + self.joiner
+        if prompt.startswith(head) and prompt.endswith(self.suffix_text):
+            return prompt[len(head):len(prompt) - len(self.suffix_text)]
+        return None
+
+    def encode(self, situation, max_length=None, padding=False):
+        """tokenizer(render(situation), max_length=..., truncation=True) 와 같은 input_ids 리스트 반환"""
+        if getattr(self, "exact", True):
+            situation_ids = self.tokenizer(self.joiner + situation, add_special_tokens=False).input_ids
+            content = self.prefix_ids + situation_ids + self.suffix_ids
+            if max_length is not None:
+                # same as HF truncation: cut the end of the content, keep the special tokens
+                content = content[:max(0, max_length - len(self.special_ids))]
+            input_ids = self.tokenizer.build_inputs_with_special_tokens(content)
+        else:
+            input_ids = self._encode_full(situation, max_length)
+
+        if padding and max_length is not None:
+            input_ids = input_ids + [self.tokenizer.pad_token_id] * (max_length - len(input_ids))
+        return input_ids
+
+    def _encode_full(self, situation, max_length=None):
+        return self.tokenizer(
+            self.render(situation),
+            max_length=max_length,
+            truncation=max_length is not None,
+        ).input_ids
@@ -0,0 +1,188 @@
+import json
+import os
+
+import numpy as np
+
+import config
+import emotion_mapping
+from src.google_stt.config import SAMPLE_RATE
+from src.google_stt.preprocess import decode_wav, resample
+
+# prosody backends selectable by PROSODY_BACKEND or per request
+BACKENDS = ("hume", "local")
+# same label set (and order) as Hume prosody, so get_top_emotion / map_emotion work unchanged
+LABELS = list(emotion_mapping.emotion_mapping_table)
+FEATURES = [
+    "energy_mean_db", "energy_std_db", "energy_range_db",
+    "pitch_mean_hz", "pitch_std_st", "pitch_range_st", "voiced_ratio", "speaking_rate",
+    "zcr_mean", "centroid_mean_hz", "centroid_std_hz", "rolloff_mean_hz", "flatness_mean",
+]
+
+FRAME = 400  # 25ms at 16kHz
+HOP = 160  # 10ms
+PITCH_MIN_HZ, PITCH_MAX_HZ = 75, 400
+
+# (arousal, valence) of each label on the circumplex, used by the default (untrained) classifier
+PROTOTYPES = {
+    "Admiration": (0.3, 0.6), "Adoration": (0.2, 0.8), "Aesthetic Appreciation": (-0.1, 0.6),
+    "Amusement": (0.5, 0.7), "Anger": (0.8, -0.7), "Annoyance": (0.4, -0.5), "Anxiety": (0.6, -0.5),
+    "Awe": (0.4, 0.4), "Awkwardness": (0.1, -0.3), "Boredom": (-0.7, -0.3), "Calmness": (-0.7, 0.4),
+    "Concentration": (0.0, 0.1), "Confusion": (0.2, -0.2), "Contemplation": (-0.4, 0.1), "Contempt": (0.2, -0.6),
+    "Contentment": (-0.4, 0.7), "Craving": (0.3, 0.2), "Desire": (0.4, 0.5), "Determination": (0.5, 0.3),
+    "Disappointment": (-0.3, -0.6), "Disapproval": (0.1, -0.5), "Disgust": (0.4, -0.7), "Distress": (0.7, -0.7),
+    "Doubt": (-0.1, -0.3), "Ecstasy": (0.9, 0.9), "Embarrassment": (0.3, -0.4), "Empathic Pain": (0.1, -0.5),
+    "Enthusiasm": (0.8, 0.7), "Entrancement": (-0.2, 0.5), "Envy": (0.3, -0.4), "Excitement": (0.9, 0.6),
+    "Fear": (0.8, -0.6), "Gratitude": (0.1, 0.7), "Guilt": (-0.2, -0.5), "Horror": (0.9, -0.8),
+    "Interest": (0.4, 0.4), "Joy": (0.7, 0.9), "Love": (0.3, 0.9), "Nostalgia": (-0.3, 0.3), "Pain": (0.5, -0.8),
+    "Pride": (0.5, 0.6), "Realization": (0.3, 0.2), "Relief": (-0.3, 0.5), "Romance": (0.1, 0.7),
+    "Sadness": (-0.5, -0.7), "Sarcasm": (0.3, -0.2), "Satisfaction": (-0.1, 0.7), "Shame": (-0.2, -0.6),
+    "Surprise (negative)": (0.8, -0.4), "Surprise (positive)": (0.8, 0.5), "Sympathy": (-0.1, 0.3),
+    "Tiredness": (-0.9, -0.2), "Triumph": (0.8, 0.8),
+}
+# typical conversational speech (16kHz, 16-bit), used to standardize features before any training
+DEFAULT_MEAN = [-25, 6, 25, 180, 2.5, 10, 0.6, 4, 0.1, 1500, 600, 3000, 0.2]
+DEFAULT_SCALE = [6, 3, 8, 50, 1.2, 4, 0.2, 1.5, 0.05, 500, 250, 1000, 0.1]
+# how each standardized feature moves the arousal / valence estimate
+AROUSAL = [0.6, 0.3, 0.2, 0.3, 0.5, 0.3, 0.1, 0.5, 0.1, 0.3, 0.1, 0.2, 0.0]
+VALENCE = [0.1, 0.1, 0.0, 0.3, 0.2, 0.1, 0.0, 0.1, 0.0, -0.1, 0.0, 0.0, -0.3]
+
+
+def frames(samples):
+    """HOP 간격 FRAME 길이 프레임들 [n, FRAME] (복사 없는 view)"""
+    if len(samples) < FRAME:
+        samples = np.pad(samples, (0, FRAME - len(samples)))
+    return np.lib.stride_tricks.sliding_window_view(samples, FRAME)[::HOP]
+
+
+def extract_features(samples, sample_rate=SAMPLE_RATE):
+    """모노 float 음성에서 FEATURES 순서의 운율 특징 벡터 (에너지, 피치, 말 속도, 스펙트럼)"""
+    x = frames(samples.astype(np.float32))
+    rms = np.sqrt(np.mean(x ** 2, axis=1))
+    level = 20 * np.log10(np.maximum(rms, 1e-10))
+    voiced = level > max(level.max() - 30, -50)
+    if not voiced.any():
+        voiced[:] = True
+
+    # pitch: autocorrelation (via FFT) peak between PITCH_MAX_HZ and PITCH_MIN_HZ lags, on voiced frames only
+    centered = x[voiced] - x[voiced].mean(axis=1, keepdims=True)
+    autocorr = np.fft.irfft(np.abs(np.fft.rfft(centered, n=2 * FRAME, axis=1)) ** 2, axis=1)[:, :FRAME]
+    low, high = sample_rate // PITCH_MAX_HZ, min(FRAME - 1, sample_rate // PITCH_MIN_HZ)
+    lags = low + np.argmax(autocorr[:, low:high], axis=1)
+    strength = autocorr[np.arange(len(lags)), lags] / np.maximum(autocorr[:, 0], 1e-10)
+    pitch = sample_rate / lags[strength > 0.3]
+    semitones = 12 * np.log2(pitch) if len(pitch) else np.zeros(1)
+
+    # speaking rate: syllable nuclei ~ peaks of the smoothed energy envelope, per voiced second
+    envelope = np.convolve(np.pad(level, 2, mode="edge"), np.ones(5) / 5, mode="valid")
+    inner = envelope[1:-1]
+    peaks = (inner > envelope[:-2]) & (inner >= envelope[2:]) & voiced[1:-1] & (inner > np.median(level[voiced]))
+    voiced_seconds = max(voiced.sum() * HOP / sample_rate, 1e-3)
+
+    spectrum = np.abs(np.fft.rfft(x[voiced] * np.hanning(FRAME), axis=1)) + 1e-10
+    freqs = np.fft.rfftfreq(FRAME, 1 / sample_rate)
+    centroid = spectrum @ freqs / spectrum.sum(axis=1)
+    cumulative = np.cumsum(spectrum, axis=1)
+    rolloff = freqs[np.argmax(cumulative >= 0.85 * cumulative[:, -1:], axis=1)]
+    flatness = np.exp(np.mean(np.log(spectrum), axis=1)) / np.mean(spectrum, axis=1)
+    zcr = np.mean(np.abs(np.diff(np.sign(x[voiced]), axis=1)) / 2, axis=1)
+
+    voiced_level = level[voiced]
+    return np.array([
+        voiced_level.mean(), voiced_level.std(), np.percentile(voiced_level, 95) - np.percentile(voiced_level, 5),
+        pitch.mean() if len(pitch) else 0.0, semitones.std(), np.ptp(semitones),
+        voiced.mean(), peaks.sum() / voiced_seconds,
+        zcr.mean(), centroid.mean(), centroid.std(), rolloff.mean(), flatness.mean(),
+    ], dtype=np.float32)
+
+
+def softmax(logits):
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class ProsodyClassifier:
+    """표준화한 운율 특징 -> LABELS 점수 (softmax 선형 분류기, CPU 에서 수 μs)
+
+    - 학습된 파라미터 (PROSODY_MODEL_PATH) 가 없으면 arousal / valence 프로토타입까지의 거리로 만든 기본 파라미터 사용
+    - fit() 으로 기록해 둔 Hume 결과 (soft label) 에 맞춰 학습 가능
+    """
+
+    def __init__(self, mean, scale, weights, bias):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.weights = np.asarray(weights, dtype=np.float32)  # [labels, features]
+        self.bias = np.asarray(bias, dtype=np.float32)
+
+    @classmethod
+    def default(cls, temperature=0.25):
+        # logit = -|(arousal, valence) - prototype|^2 / T, which is linear in the features
+        prototypes = np.array([PROTOTYPES[label] for label in LABELS], dtype=np.float32)
+        directions = np.array([AROUSAL, VALENCE], dtype=np.float32)
+        weights = 2 * prototypes @ directions / temperature
+        bias = -(prototypes ** 2).sum(axis=1) / temperature
+        return cls(DEFAULT_MEAN, DEFAULT_SCALE, weights, bias)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            params = json.load(f)
+        if params["labels"] != LABELS or params["features"] != FEATURES:
+            raise ValueError(f"{path} was trained for a different label / feature set")
+        return cls(params["mean"], params["scale"], params["weights"], params["bias"])
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "labels": LABELS, "features": FEATURES,
+                "mean": self.mean.tolist(), "scale": self.scale.tolist(),
+                "weights": self.weights.tolist(), "bias": self.bias.tolist(),
+            }, f)
+
+    @classmethod
+    def fit(cls, features, targets, epochs=2000, lr=0.5, l2=1e-3):
+        """특징 [n, features] 과 Hume 점수 [n, labels] (행마다 합이 1 이 되게 정규화) 로 softmax 회귀 학습"""
+        features = np.asarray(features, dtype=np.float32)
+        targets = np.asarray(targets, dtype=np.float32)
+        targets = targets / np.maximum(targets.sum(axis=1, keepdims=True), 1e-10)
+        mean, scale = features.mean(axis=0), features.std(axis=0) + 1e-6
+        x = (features - mean) / scale
+        weights = np.zeros((targets.shape[1], x.shape[1]), dtype=np.float32)
+        bias = np.log(targets.mean(axis=0) + 1e-6)
+        for _ in range(epochs):
+            error = softmax(x @ weights.T + bias) - targets
+            weights -= lr * (error.T @ x / len(x) + l2 * weights)
+            bias -= lr * error.mean(axis=0)
+        return cls(mean, scale, weights, bias)
+
+    def scores(self, features):
+        x = (np.asarray(features, dtype=np.float32) - self.mean) / self.scale
+        return softmax(x @ self.weights.T + self.bias)
+
+
+_classifier = None
+
+
+def get_classifier():
+    global _classifier
+    if _classifier is None:
+        if os.path.exists(config.PROSODY_MODEL_PATH):
+            _classifier = ProsodyClassifier.load(config.PROSODY_MODEL_PATH)
+        else:
+            print(f"{config.PROSODY_MODEL_PATH} not found, using the untrained prosody classifier")
+            _classifier = ProsodyClassifier.default()
+    return _classifier
+
+
+def analyze(audio, classifier=None):
+    """wav (경로 또는 메모리의 bytes) 의 로컬 운율 감정 분석 (Hume predictions 와 같은 모양이라 get_top_emotion 에 그대로 사용)"""
+    samples, sample_rate = decode_wav(audio)
+    mono = resample(samples.mean(axis=1), sample_rate, SAMPLE_RATE)
+    features = extract_features(mono, SAMPLE_RATE)
+    scores = (classifier or get_classifier()).scores(features)
+    emotions = [{"name": label, "score": float(score)} for label, score in zip(LABELS, scores)]
+    return [{"source": {"type": "local"}, "results": {"predictions": [{
+        "file": "audio",
+        "models": {"prosody": {"grouped_predictions": [{"id": "unknown", "predictions": [
+            {"text": "", "confidence": float(features[FEATURES.index("voiced_ratio")]), "emotions": emotions}
+        ]}]}},
+    }], "errors": []}}]
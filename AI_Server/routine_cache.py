@@ -0,0 +1,190 @@
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+# "퇴근하고 집에 왔는데 너무 더워 (짜증)" -> situation + emotion tag from /voice_analysis/
+_EMOTION_TAG = re.compile(r"\s*\(([^()]*)\)\s*$")
+_PUNCTUATION = re.compile(r"[.,!?~…·\"'`]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_situation(text):
+    """상황 문장을 캐시 키용으로 정규화하여 (situation, emotion) 반환
+
+    유니코드 NFC, 소문자, 문장부호 제거, 공백 정리 후 끝의 감정 태그를 분리함
+    """
+    text = unicodedata.normalize("NFC", text).strip()
+    emotion = ""
+    match = _EMOTION_TAG.search(text)
+    if match:
+        emotion = match.group(1).strip()
+        text = text[:match.start()]
+    text = _PUNCTUATION.sub(" ", text.lower())
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text, emotion
+
+
+def make_key(text):
+    situation, emotion = normalize_situation(text)
+    return f"{situation}|{emotion}"
+
+
+class RoutineCache:
+    """정규화된 상황 + 감정 태그를 키로 하는 2단 루틴 응답 캐시
+
+    - 1단: TTL 이 있는 in-memory LRU (max_entries)
+    - 2단: 선택적 sqlite 파일 (db_path), 메모리에서 밀려난 항목도 TTL 동안 유지
+      (쓰기는 전용 스레드 하나가 모아서 한 트랜잭션으로 처리, 요청을 처리하는 이벤트 루프는 commit 을 기다리지 않음)
+    - variants > 1 이면 키마다 응답을 K 개까지 모으고, K 개가 찬 뒤에만 그중 하나를 무작위로 돌려줌
+      (그 전까지는 miss 로 처리해 샘플링 다양성을 유지)
+    """
+
+    def __init__(self, max_entries=config.CACHE_MAX_ENTRIES, ttl=config.CACHE_TTL_SECONDS,
+                 db_path=config.CACHE_DB_PATH, variants=config.CACHE_VARIANTS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.variants = max(1, variants)
+
+        self._memory = OrderedDict()  # key -> (expires_at, [response, ...])
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+        self._db = None
+        self._db_lock = threading.Lock()  # the connection is shared by the request thread (reads) and the writer
+        self._dirty = {}  # key -> entry (None = delete) waiting for the writer, newer than the sqlite rows
+        self._flush_queued = False
+        self._writer = None
+        if db_path:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="routine-cache-db")
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS routines ("
+                "key TEXT, variant INTEGER, response TEXT, expires_at REAL, PRIMARY KEY (key, variant))"
+            )
+            self._db.commit()
+
+    def get(self, key):
+        """캐시된 응답 반환 (없거나 만료, 또는 variants 가 덜 모였으면 None)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._memory[key]
+                self.stats["expirations"] += 1
+                entry = None
+
+            source = "memory_hits"
+            if entry is None and self._db is not None:
+                entry = self._load(key, now)
+                if entry is not None:
+                    source = "disk_hits"
+                    self._store(key, entry)
+
+            if entry is None or len(entry[1]) < self.variants:
+                self.stats["misses"] += 1
+                return None
+
+            self._memory.move_to_end(key)
+            self.stats["hits"] += 1
+            self.stats[source] += 1
+            return dict(random.choice(entry[1]))
+
+    def put(self, key, response):
+        """응답 저장 (variants 모드에서는 K 개가 찰 때까지 변형을 추가)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._db is not None:
+                # evicted from memory but still on disk: keep its variants, the write below replaces all rows
+                entry = self._load(key, now)
+            if entry is None or entry[0] <= now:
+                entry = (now + self.ttl, [])
+            responses = entry[1]
+            if response in responses:
+                return
+            responses.append(dict(response))
+            if len(responses) > self.variants:
+                responses.pop(0)
+            self._store(key, entry)
+
+            if self._db is not None:
+                self._schedule_write(key, (entry[0], list(responses)))
+
+    def close(self):
+        """남은 디스크 쓰기를 마치고 writer 스레드 종료"""
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+
+    def snapshot(self):
+        """현재 카운터와 크기"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _store(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _load(self, key, now):
+        if key in self._dirty:
+            # not written yet, the pending entry is newer than the rows
+            pending = self._dirty[key]
+            if pending is None or pending[0] <= now:
+                return None
+            return pending[0], list(pending[1])
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT response, expires_at FROM routines WHERE key = ? ORDER BY variant", (key,)
+            ).fetchall()
+        if not rows:
+            return None
+        if rows[0][1] <= now:
+            self._schedule_write(key, None)
+            self.stats["expirations"] += 1
+            return None
+        return rows[0][1], [json.loads(row[0]) for row in rows]
+
+    def _schedule_write(self, key, entry):
+        # called under self._lock; one flush is queued at a time and takes every key dirtied until it runs
+        self._dirty[key] = entry
+        if not self._flush_queued:
+            self._flush_queued = True
+            self._writer.submit(self._flush)
+
+    def _flush(self):
+        with self._lock:
+            dirty = dict(self._dirty)
+            self._flush_queued = False
+        rows = [
+            (key, i, json.dumps(r, ensure_ascii=False), entry[0])
+            for key, entry in dirty.items() if entry is not None
+            for i, r in enumerate(entry[1])
+        ]
+        try:
+            with self._db_lock:
+                self._db.executemany("DELETE FROM routines WHERE key = ?", [(key,) for key in dirty])
+                self._db.executemany(
+                    "INSERT INTO routines (key, variant, response, expires_at) VALUES (?, ?, ?, ?)", rows
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Error writing routine cache: {str(e)}")
+        with self._lock:
+            # entries dirtied again while writing stay for the next flush
+            for key, entry in dirty.items():
+                if self._dirty.get(key) is entry:
+                    del self._dirty[key]
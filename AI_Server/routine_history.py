@@ -0,0 +1,50 @@
+import threading
+from collections import OrderedDict, deque
+
+import config
+
+
+class RoutineHistory:
+    """사용자별 최근 추천 루틴 기록 (같은 루틴을 연달아 추천하지 않기 위해 사용)
+
+    - 사용자마다 최근 per_user 개 루틴만 유지
+    - 사용자 수가 max_users 를 넘으면 가장 오래 요청이 없던 사용자부터 제거 (LRU)
+    """
+
+    def __init__(self, max_users=config.HISTORY_MAX_USERS, per_user=config.HISTORY_PER_USER):
+        self.max_users = max_users
+        self.per_user = per_user
+        self._users = OrderedDict()  # user_id -> deque of routines, oldest first
+        self._lock = threading.Lock()
+
+    def seen(self, user_id, routine):
+        with self._lock:
+            return routine in self._users.get(user_id, ())
+
+    def add(self, user_id, routine):
+        with self._lock:
+            history = self._users.get(user_id)
+            if history is None:
+                history = self._users[user_id] = deque(maxlen=self.per_user)
+            self._users.move_to_end(user_id)
+            if routine in history:
+                history.remove(routine)
+            history.append(routine)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def pick(self, user_id, routines):
+        """후보 중 최근에 추천하지 않은 첫 루틴을 골라 기록 (모두 최근에 추천했으면 가장 오래전 것)"""
+        with self._lock:
+            history = list(self._users.get(user_id, ()))
+        fresh = [routine for routine in routines if routine not in history]
+        if fresh:
+            routine = fresh[0]
+        else:
+            routine = min(routines, key=history.index)
+        self.add(user_id, routine)
+        return routine
+
+    def snapshot(self):
+        with self._lock:
+            return {"users": len(self._users), "routines": sum(len(h) for h in self._users.values())}
@@ -0,0 +1,106 @@
+"""
+여러 uvicorn 워커 프로세스가 하나의 mmap 가중치 사본을 공유하는 서빙 런처
+
+AI_Server 디렉토리에서 실행:
+    python serve.py --workers 4 --port 8000 --pin-cores
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import time
+
+import psutil
+import torch
+
+import config
+import model_loader
+
+
+def split_cores(num_workers):
+    """사용 가능한 CPU 코어를 워커 수만큼 연속된 묶음으로 나눔"""
+    cores = sorted(os.sched_getaffinity(0))
+    per_worker = max(1, len(cores) // num_workers)
+    return [cores[i * per_worker:(i + 1) * per_worker] or cores for i in range(num_workers)]
+
+
+def run_worker(index, sock, cores, weights_path, precision):
+    """워커 프로세스: 코어 고정 후 공유 가중치로 main:app 실행"""
+    # config was already imported by this module, so override it before main is imported
+    if cores:
+        os.sched_setaffinity(0, cores)
+        config.TORCH_THREADS = len(cores)
+    config.SHARED_WEIGHTS_PATH = weights_path
+    config.PRECISION = precision
+
+    import uvicorn
+
+    print(f"[worker {index}] pid={os.getpid()} cores={cores}")
+    server = uvicorn.Server(uvicorn.Config("main:app", log_level="info"))
+    server.run(sockets=[sock])
+
+
+def report_memory(workers):
+    """워커별 메모리 사용량 출력 (PSS 는 공유 페이지를 워커 수로 나눈 값)"""
+    total_pss = 0
+    for index, process in enumerate(workers):
+        try:
+            memory = psutil.Process(process.pid).memory_full_info()
+        except psutil.NoSuchProcess:
+            continue
+        pss = getattr(memory, "pss", 0)
+        total_pss += pss
+        print(f"[worker {index}] pid={process.pid} "
+              f"rss={memory.rss / 2**20:.0f}MB uss={memory.uss / 2**20:.0f}MB pss={pss / 2**20:.0f}MB")
+    print(f"[total] pss={total_pss / 2**20:.0f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VOICE multi-process server")
+    parser.add_argument("--host", type=str, default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--weights", type=str, default=config.SHARED_WEIGHTS_PATH or "VOICE_model.shared.pt")
+    parser.add_argument("--precision", type=str, default=config.PRECISION, choices=model_loader.PRECISIONS)
+    parser.add_argument("--pin-cores", action="store_true", help="pin each worker to its own set of CPU cores")
+    parser.add_argument("--stats-interval", type=float, default=60.0)
+    args = parser.parse_args()
+
+    # load the weights once; workers only mmap the exported file.
+    # bf16 weights are exported as bf16 so they stay shared, int8 is quantized per worker
+    if args.precision == "bf16":
+        root, ext = os.path.splitext(args.weights)
+        args.weights = f"{root}.bf16{ext}"
+    if not os.path.exists(args.weights):
+        dtype = torch.bfloat16 if args.precision == "bf16" else torch.float32
+        model_loader.export_shared_weights(config.MODEL_PATH, args.weights, dtype)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.set_inheritable(True)
+
+    core_sets = split_cores(args.workers) if args.pin_cores else [None] * args.workers
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    for index, cores in enumerate(core_sets):
+        process = context.Process(target=run_worker, args=(index, sock, cores, args.weights, args.precision), name=f"voice-worker-{index}")
+        process.start()
+        workers.append(process)
+
+    try:
+        while all(process.is_alive() for process in workers):
+            time.sleep(args.stats_interval)
+            report_memory(workers)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in workers:
+            process.terminate()
+        for process in workers:
+            process.join()
+        sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import asyncio
+import contextlib
+import io
+import os
+import queue
+import threading
+import wave
+
+from google.cloud import speech
+
+from src.google_stt.config import SAMPLE_RATE, CHANNELS
+
+END_OF_SINGLE_UTTERANCE = speech.StreamingRecognizeResponse.SpeechEventType.END_OF_SINGLE_UTTERANCE
+# Google rejects streaming requests carrying more than 25KB of audio, larger frames are split (even = whole samples)
+MAX_REQUEST_BYTES = 25_000
+
+
+def strip_wav_header(chunk):
+    """첫 청크가 wav 파일 앞부분이면 헤더를 떼고 PCM 만 남김"""
+    if chunk[:4] == b"RIFF" and b"data" in chunk[:512]:
+        return chunk[chunk.index(b"data") + 8:]
+    return chunk
+
+
+def to_wav(pcm, sample_rate=SAMPLE_RATE):
+    """16-bit PCM 을 wav bytes 로 (Hume 업로드용)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(CHANNELS)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(bytes(pcm))
+    return buffer.getvalue()
+
+
+class StreamingTranscriber:
+    """Google streaming_recognize 로 업로드 중인 음성을 바로 인식
+
+    - 청크가 들어오는 대로 gRPC 스트림에 넘기고, 중간 결과 ("interim") 와 말이 끝나자마자 최종 결과 ("final") 를 냄
+    - speech_client 로 streaming_recognize(config, requests) 를 가진 다른 구현 (벤치마크의 fake) 을 넣을 수 있음
+    """
+
+    def __init__(self, speech_client=None, sample_rate=SAMPLE_RATE, language_code="ko-KR"):
+        self._speech_client = speech_client
+        self.streaming_config = speech.StreamingRecognitionConfig(
+            config=speech.RecognitionConfig(
+                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+                sample_rate_hertz=sample_rate,
+                language_code=language_code,
+                enable_automatic_punctuation=True,
+            ),
+            interim_results=True,
+            # Google ends the stream as soon as it detects the end of speech
+            single_utterance=True,
+        )
+
+    @property
+    def speech_client(self):
+        # created on first use, so importing the server does not need Google credentials
+        if self._speech_client is None:
+            os.environ.setdefault("GOOGLE_APPLICATION_CREDENTIALS", "credentials/service_account.json")
+            self._speech_client = speech.SpeechClient()
+        return self._speech_client
+
+    def _recognize(self, audio, emit, speech_ended):
+        """(작업 스레드) audio 큐의 청크를 gRPC 스트림으로 보내고 응답을 이벤트로 넘김"""
+
+        def requests():
+            while not speech_ended.is_set():
+                chunk = audio.get()
+                if chunk is None:
+                    return
+                for start in range(0, len(chunk), MAX_REQUEST_BYTES):
+                    yield speech.StreamingRecognizeRequest(audio_content=chunk[start:start + MAX_REQUEST_BYTES])
+
+        try:
+            for response in self.speech_client.streaming_recognize(self.streaming_config, requests()):
+                if response.speech_event_type == END_OF_SINGLE_UTTERANCE:
+                    # stop sending audio, the final result follows
+                    speech_ended.set()
+                for result in response.results:
+                    if result.alternatives:
+                        emit(("final" if result.is_final else "interim", result.alternatives[0].transcript))
+        except Exception as e:
+            emit(("error", str(e)))
+        finally:
+            emit(None)
+
+    async def transcribe(self, chunks):
+        """PCM 청크의 async iterator 를 받아 ("interim" | "final" | "error", 텍스트) 이벤트를 생성되는 대로 냄"""
+        loop = asyncio.get_running_loop()
+        audio = queue.Queue()
+        events = asyncio.Queue()
+        speech_ended = threading.Event()
+
+        async def feed():
+            try:
+                async for chunk in chunks:
+                    if speech_ended.is_set():
+                        break
+                    audio.put(chunk)
+            finally:
+                audio.put(None)
+
+        feeder = asyncio.create_task(feed())
+        worker = threading.Thread(
+            target=self._recognize,
+            args=(audio, lambda event: loop.call_soon_threadsafe(events.put_nowait, event), speech_ended),
+            daemon=True,
+        )
+        worker.start()
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+        finally:
+            speech_ended.set()
+            audio.put(None)
+            feeder.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await feeder
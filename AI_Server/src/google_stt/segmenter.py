@@ -0,0 +1,46 @@
+import numpy as np
+
+FRAME_MS = 30
+
+
+def frame_energy(pcm: bytes, sample_rate: int) -> np.ndarray:
+    """16-bit PCM 을 FRAME_MS 프레임으로 나눠 프레임별 RMS 계산"""
+    samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+    frame = int(sample_rate * FRAME_MS / 1000)
+    frames = len(samples) // frame
+    if frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.sqrt(np.mean(samples[:frames * frame].reshape(frames, frame) ** 2, axis=1))
+
+
+def downmix(pcm: bytes, channels: int) -> bytes:
+    """인터리브된 다채널 16-bit PCM 을 채널 평균으로 모노 변환"""
+    if channels == 1:
+        return pcm
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    samples = samples[:len(samples) // channels * channels].reshape(-1, channels)
+    return samples.mean(axis=1).round().astype(np.int16).tobytes()
+
+
+def split_at_silence(pcm: bytes, sample_rate: int, max_seconds: float, min_silence_ms: int = 300) -> list:
+    """긴 16-bit 모노 PCM 을 max_seconds 이하 조각으로 나눔 (각 조각의 뒤쪽 절반에서 가장 늦게 나오는 조용한 구간에서 자름)"""
+    bytes_per_frame = int(sample_rate * FRAME_MS / 1000) * 2
+    max_frames = int(max_seconds * 1000 / FRAME_MS)
+    if len(pcm) <= max_frames * bytes_per_frame:
+        return [pcm]
+
+    # energy averaged over min_silence_ms, so a cut lands in a pause rather than between two syllables
+    window = max(1, min_silence_ms // FRAME_MS)
+    energy = np.convolve(frame_energy(pcm, sample_rate), np.ones(window) / window, mode="same")
+
+    chunks, start = [], 0
+    total = len(energy)
+    while total - start > max_frames:
+        search = energy[start + max_frames // 2:start + max_frames]
+        # the latest pause about as quiet as the quietest one, so chunks stay close to max_seconds
+        quiet = np.flatnonzero(search <= search.min() + 0.05 * (search.max() - search.min()))
+        cut = start + max_frames // 2 + int(quiet[-1])
+        chunks.append(pcm[start * bytes_per_frame:cut * bytes_per_frame])
+        start = cut
+    chunks.append(pcm[start * bytes_per_frame:])
+    return chunks
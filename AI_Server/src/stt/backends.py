@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ..google_stt.config import SAMPLE_RATE, MIN_SILENCE_MS
+from ..google_stt.preprocess import AudioSource, decode_wav, resample
+from ..google_stt.segmenter import split_at_silence
+
+# Whisper encodes fixed 30s windows, longer recordings are split at silence first
+WINDOW_SECONDS = 30
+
+
+class STTBackend:
+    """음성 인식 백엔드 인터페이스: 음성 (파일 경로 또는 메모리의 wav bytes) -> (텍스트, 신뢰도 0~1), 실패하면 None"""
+
+    name = None
+
+    def load(self):
+        """모델 / 클라이언트를 미리 준비 (서버 시작 시 첫 요청이 기다리지 않도록)"""
+
+    def transcribe(self, audio: AudioSource) -> Optional[Tuple[str, float]]:
+        raise NotImplementedError
+
+
+class GoogleSTTBackend(STTBackend):
+    """Google Speech-to-Text (GoogleVoiceSentimentAnalyzer 의 recognize, 긴 음성은 무음 구간 분할 후 병렬 변환)"""
+
+    name = "google"
+
+    def __init__(self, analyzer=None):
+        self._analyzer = analyzer
+
+    @property
+    def analyzer(self):
+        # imported and created on first use, so the local / fake backends need no Google packages or credentials
+        if self._analyzer is None:
+            from ..google_stt.analyzer import GoogleVoiceSentimentAnalyzer
+            self._analyzer = GoogleVoiceSentimentAnalyzer()
+        return self._analyzer
+
+    def load(self):
+        self.analyzer
+
+    def transcribe(self, audio: AudioSource) -> Optional[Tuple[str, float]]:
+        return self.analyzer.transcribe(audio)
+
+
+class LocalASRBackend(STTBackend):
+    """미리 내려받은 Whisper 모델 디렉토리 (예: 한국어로 파인튜닝한 whisper-small) 로 CPU 에서 인식 (네트워크 없음)
+
+    - 신뢰도는 생성한 토큰 확률의 기하 평균
+    - CPU 코어를 나눠 쓰는 동시 generate 는 서로 느려지기만 하므로 한 번에 한 요청씩 처리
+    """
+
+    name = "local"
+
+    def __init__(self, model_dir=None, language="korean", num_beams=1):
+        self.model_dir = model_dir or os.getenv("STT_LOCAL_MODEL_DIR", "models/whisper-small-ko")
+        self.language = language
+        self.num_beams = num_beams
+        self.processor = None
+        self.model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self.model is None:
+                from transformers import WhisperForConditionalGeneration, WhisperProcessor
+
+                if not os.path.isdir(self.model_dir):
+                    raise FileNotFoundError(f"Local ASR model directory not found: {self.model_dir}")
+                self.processor = WhisperProcessor.from_pretrained(self.model_dir, local_files_only=True)
+                self.model = WhisperForConditionalGeneration.from_pretrained(
+                    self.model_dir, local_files_only=True
+                ).eval()
+                print(f"Local ASR model loaded from {self.model_dir}")
+
+    def transcribe(self, audio: AudioSource) -> Optional[Tuple[str, float]]:
+        try:
+            import torch
+
+            self.load()
+            samples, sample_rate = decode_wav(audio)
+            mono = resample(samples.mean(axis=1), sample_rate, SAMPLE_RATE)
+            pcm = (np.clip(mono, -1, 1) * 32767).astype("<i2").tobytes()
+            # all windows of one recording go through generate as a single batch
+            windows = [
+                np.frombuffer(chunk, dtype="<i2").astype(np.float32) / 32768
+                for chunk in split_at_silence(pcm, SAMPLE_RATE, WINDOW_SECONDS, MIN_SILENCE_MS)
+            ]
+            inputs = self.processor(windows, sampling_rate=SAMPLE_RATE, return_tensors="pt")
+
+            with self._lock, torch.inference_mode():
+                output = self.model.generate(
+                    inputs.input_features, language=self.language, task="transcribe", num_beams=self.num_beams,
+                    return_dict_in_generate=True, output_scores=True,
+                )
+                log_probs = self.model.compute_transition_scores(
+                    output.sequences, output.scores, getattr(output, "beam_indices", None), normalize_logits=True
+                )
+
+            # only real tokens count, not the padding after each window's end of text
+            generated = output.sequences[:, -log_probs.shape[1]:]
+            mask = generated != self.processor.tokenizer.pad_token_id
+            confidence = float(torch.exp(log_probs[mask].mean())) if mask.any() else 0.0
+            texts = self.processor.batch_decode(output.sequences, skip_special_tokens=True)
+            return " ".join(text.strip() for text in texts if text.strip()), confidence
+
+        except Exception as e:
+            print(f"음성 변환 중 에러 발생: {str(e)}")
+            return None
+
+
+class FakeSTTBackend(STTBackend):
+    """테스트 / 벤치마크용: latency 초 뒤에 정해진 문장을 돌려줌 (모델, 자격 증명, 네트워크 불필요)"""
+
+    name = "fake"
+
+    def __init__(self, text="오늘 하루 너무 피곤했어", confidence=0.95, latency=0.0):
+        self.text = text
+        self.confidence = confidence
+        self.latency = latency
+        self.calls = 0
+
+    def transcribe(self, audio: AudioSource) -> Optional[Tuple[str, float]]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self.text, self.confidence
+
+
+REGISTRY = {backend.name: backend for backend in (GoogleSTTBackend, LocalASRBackend, FakeSTTBackend)}
+
+
+def register(backend_class):
+    """새 STTBackend 구현을 backend_class.name 으로 등록 (클래스 데코레이터로도 사용 가능)"""
+    REGISTRY[backend_class.name] = backend_class
+    return backend_class
+
+
+def create_backend(name, **options) -> STTBackend:
+    """이름 (STT_BACKEND) 으로 백엔드 생성, options 는 해당 클래스의 생성자 인자"""
+    if name not in REGISTRY:
+        raise ValueError(f"Unknown STT backend: {name} (expected one of {', '.join(REGISTRY)})")
+    return REGISTRY[name](**options)
@@ -0,0 +1,185 @@
+import re
+
+import torch
+from transformers import LogitsProcessor
+
+from device_parser import AIRCON_TEMPERATURES, APPLIANCES, STATE_VALUES
+
+# structured target: "<routine> ### 1:on:24°C 냉방 모드 / 6:on:냉수 준비 / 4:off:대기"
+SEPARATOR = "###"
+DELIMITER = "/"
+_UPDATE = re.compile(r"^\s*(\d+):(on|off):(.+?)\s*$")
+_NAMES = {appliance_id: name for appliance_id, name, _ in APPLIANCES}
+
+
+def update_values():
+    """디코딩을 허용하는 모든 "id:onoff:state" 문자열"""
+    values = []
+    for appliance_id, states in STATE_VALUES.items():
+        if appliance_id == 1:
+            temperatures = [f"{t}°C" for t in AIRCON_TEMPERATURES]
+            states = temperatures + [f"{t} {mode}" for t in temperatures for mode in states] + states
+        values += [f"{appliance_id}:on:{state}" for state in states]
+        values.append(f"{appliance_id}:off:대기")
+    return values
+
+
+UPDATE_VALUES = set(update_values())
+
+
+def encode_updates(result):
+    """파서 결과({"updates": [...]})를 compact suffix 문자열로 변환 (허용되지 않은 상태는 제외)"""
+    parts = []
+    for update in result["updates"] if result else []:
+        onoff = update["onoff"].lower()
+        value = f"{update['appliance_id']}:{onoff}:{'대기' if onoff == 'off' else update['state']}"
+        if value in UPDATE_VALUES:
+            parts.append(value)
+    return f" {DELIMITER} ".join(parts)
+
+
+def format_target(routine, updates):
+    """학습 target: 루틴 문장 + 구분자 + compact suffix"""
+    return f"{routine} {SEPARATOR} {updates}".rstrip()
+
+
+def visible_text(text):
+    """스트리밍 중 사용자에게 보여줄 루틴 부분 (구분자와 그 일부가 될 수 있는 끝의 '#' 제외)"""
+    return text.split(SEPARATOR, 1)[0].rstrip("#").rstrip()
+
+
+def split_output(text):
+    """생성 결과를 (루틴 문장, {"updates": [...]} 또는 None) 으로 분리"""
+    if SEPARATOR not in text:
+        return text.strip(), None
+    routine, suffix = text.split(SEPARATOR, 1)
+
+    updates, seen = [], set()
+    for part in suffix.split(DELIMITER):
+        match = _UPDATE.match(part)
+        if match is None or match.group(0).strip() not in UPDATE_VALUES:
+            continue
+        appliance_id, onoff, state = int(match.group(1)), match.group(2), match.group(3)
+        if appliance_id in seen:
+            continue
+        seen.add(appliance_id)
+        updates.append({
+            "appliance_id": appliance_id,
+            "user_id": 6,
+            "name": _NAMES[appliance_id],
+            "onoff": onoff,
+            "state": state,
+            "is_active": onoff == "on",
+        })
+    return routine.strip(), {"updates": updates}
+
+
+class _Node:
+    __slots__ = ("children", "reachable", "appliance_id")
+
+    def __init__(self):
+        self.children = {}
+        self.reachable = set()  # appliance ids of the updates below this node
+        self.appliance_id = None  # set when a complete update ends here
+
+
+class StructuredConstraint:
+    """구분자 이후의 토큰을 허용된 update 문자열의 토큰 trie 로 제한하는 조건
+
+    루틴 문장 부분은 제한하지 않고, 구분자가 나오면 "update ( / update )* EOS" 만 생성되도록 하며
+    같은 기기를 두 번 생성하지 않도록 이미 나온 기기의 가지는 막음.
+    update 들은 공백으로 구분되므로 따로 토크나이즈한 결과를 이어 붙이면 전체 target 토크나이즈와 같아야 하고,
+    PromptCompiler 처럼 생성 시 이를 확인해 다르면 제한 없이(사후 검증만) 동작함
+    """
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.eos_token_id = tokenizer.eos_token_id
+        self.separator_ids = self._ids(SEPARATOR)
+        self.delimiter_ids = self._ids(DELIMITER)
+
+        self.root = _Node()
+        for value in update_values():
+            appliance_id = int(value.split(":", 1)[0])
+            node = self.root
+            node.reachable.add(appliance_id)
+            for token in self._ids(value):
+                node = node.children.setdefault(token, _Node())
+                node.reachable.add(appliance_id)
+            node.appliance_id = appliance_id
+
+        routine, first, second = "에어컨을 24도로 맞추고 정수기에서 냉수를 준비할게요.", "1:on:24°C 냉방 모드", "6:on:냉수 준비"
+        expected = (self._ids(routine) + self.separator_ids
+                    + self._ids(first) + self.delimiter_ids + self._ids(second))
+        self.exact = self._ids(format_target(routine, f"{first} {DELIMITER} {second}")) == expected
+        if not self.exact:
+            print("Structured suffix tokenization is not compositional, decoding without the trie constraint")
+
+    def _ids(self, text):
+        return self.tokenizer(text, add_special_tokens=False).input_ids
+
+    def _suffix_start(self, decoder_ids):
+        n = len(self.separator_ids)
+        for start in range(len(decoder_ids) - n + 1):
+            if decoder_ids[start:start + n] == self.separator_ids:
+                return start + n
+        return None
+
+    def __call__(self, decoder_ids):
+        """다음에 허용되는 토큰 ID 리스트 (제한이 없으면 None)"""
+        if not self.exact:
+            return None
+        start = self._suffix_start(decoder_ids)
+        if start is None:
+            return None
+
+        node, delimiter, used = self.root, None, set()
+        for token in decoder_ids[start:]:
+            if delimiter is not None:
+                delimiter += 1
+                if delimiter == len(self.delimiter_ids):
+                    node, delimiter = self.root, None
+            elif token in node.children:
+                node = node.children[token]
+            elif node.appliance_id is not None and token == self.delimiter_ids[0]:
+                used.add(node.appliance_id)
+                node, delimiter = None, 1
+                if delimiter == len(self.delimiter_ids):
+                    node, delimiter = self.root, None
+            else:
+                return None  # left the grammar (e.g. an unconstrained fallback), stop constraining
+
+        if delimiter is not None:
+            return [self.delimiter_ids[delimiter]]
+        allowed = [token for token, child in node.children.items() if child.reachable - used]
+        if node.appliance_id is not None:
+            used = used | {node.appliance_id}
+            if len(used) < len(STATE_VALUES):
+                allowed.append(self.delimiter_ids[0])
+        # an empty suffix is allowed, a dangling delimiter is not
+        if (node is self.root and not used) or node.appliance_id is not None:
+            allowed.append(self.eos_token_id)
+        return allowed
+
+
+class StructuredLogitsProcessor(LogitsProcessor):
+    """StructuredConstraint 를 transformers generate(logits_processor=...) 에서 쓰기 위한 래퍼"""
+
+    def __init__(self, constraint):
+        self.constraint = constraint
+
+    def __call__(self, input_ids, scores):
+        for row, ids in enumerate(input_ids.tolist()):
+            allowed = self.constraint(ids)
+            if allowed is not None:
+                scores[row] = mask_logits(scores[row], allowed)
+        return scores
+
+
+def mask_logits(logits, allowed):
+    """allowed 토큰 외의 logits 를 -inf 로 (allowed 가 모두 -inf 면 allowed 끼리 균등)"""
+    masked = torch.full_like(logits, float("-inf"))
+    masked[allowed] = logits[allowed]
+    if torch.isinf(masked[allowed]).all():
+        masked[allowed] = 0.0
+    return masked
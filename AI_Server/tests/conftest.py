@@ -0,0 +1,72 @@
+import os
+import socket
+import tempfile
+
+import pytest
+
+# the app under test reads these at import: a tiny random T5 instead of VOICE_model, no batching / cache
+TEST_MODEL_DIR = tempfile.mkdtemp(prefix="voice_ai_tests_")
+os.environ.update(
+    MODEL_PATH=os.path.join(TEST_MODEL_DIR, "model"),
+    TOKENIZER_PATH=os.path.join(TEST_MODEL_DIR, "tokenizer"),
+    MAX_LENGTH="8",
+    BATCHING_ENABLED="false",
+    CACHE_ENABLED="false",
+    PROSODY_BACKEND="local",
+)
+
+from benchmarks import fake_hume_server  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def save_tiny_model():
+    """main 을 import 할 수 있을 만큼만의 T5 모델 / 토크나이저 (가중치는 무작위, 생성 품질은 테스트하지 않음)"""
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import T5Config, T5ForConditionalGeneration, T5TokenizerFast
+
+    words = ["<pad>", "</s>", "<unk>", "에어컨을", "켤게요."]
+    tokenizer = Tokenizer(models.WordLevel({word: i for i, word in enumerate(words)}, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    T5TokenizerFast(
+        tokenizer_object=tokenizer, eos_token="</s>", pad_token="<pad>", unk_token="<unk>", extra_ids=0
+    ).save_pretrained(os.environ["TOKENIZER_PATH"])
+    T5ForConditionalGeneration(T5Config(
+        vocab_size=len(words), d_model=8, d_ff=16, d_kv=4, num_layers=1, num_heads=2,
+        decoder_start_token_id=0, pad_token_id=0, eos_token_id=1,
+    )).save_pretrained(os.environ["MODEL_PATH"])
+
+
+@pytest.fixture(scope="session")
+def main_module():
+    save_tiny_model()
+    import main
+    return main
+
+
+@pytest.fixture(scope="session")
+def app_client(main_module):
+    """앱 lifespan 은 세션에 한 번만 (종료 시 모듈 전역 executor / decode_pool 을 shutdown 하므로)"""
+    from fastapi.testclient import TestClient
+
+    with TestClient(main_module.app) as client:
+        yield client
+
+
+@pytest.fixture
+def hume_server():
+    """start(processing_seconds) -> (fake Hume app, jobs base_url), 테스트가 끝나면 서버 종료"""
+    servers = []
+
+    def start(processing=0.2):
+        server, app, url = fake_hume_server.start_in_thread(free_port(), processing)
+        servers.append(server)
+        return app, url
+
+    yield start
+    for server in servers:
+        server.should_exit = True
@@ -0,0 +1,59 @@
+import asyncio
+import io
+import os
+import wave
+
+import numpy as np
+
+import audio_ingest
+from audio_buffer import AudioBuffer
+from src.google_stt.preprocess import preprocess_audio, preprocess_file
+
+
+def tone_wav(rate=44100, channels=2, seconds=4.0):
+    """1초 무음 + 220Hz 음 + 1초 무음"""
+    t = np.arange(int(rate * (seconds - 2))) / rate
+    voice = 0.3 * np.sin(2 * np.pi * 220 * t)
+    signal = np.concatenate([np.zeros(rate), voice, np.zeros(rate)])
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((np.repeat(signal[:, None], channels, axis=1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+class Upload:
+    """UploadFile.read(size) 만 흉내"""
+
+    def __init__(self, data):
+        self._file = io.BytesIO(data)
+
+    async def read(self, size):
+        return self._file.read(size)
+
+
+def test_file_preprocessing_matches_in_memory(tmp_path):
+    path, output_path = tmp_path / "in.wav", tmp_path / "out.wav"
+    path.write_bytes(tone_wav())
+    expected, expected_report = preprocess_audio(str(path))
+    report = preprocess_file(str(path), str(output_path), block_seconds=0.3)
+    assert output_path.read_bytes() == expected
+    assert report == expected_report
+
+
+def test_spilled_upload_is_preprocessed_into_a_temp_file_removed_with_the_buffer():
+    async def ingest():
+        buffer = await AudioBuffer.read(Upload(tone_wav()), chunk_size=4096, spill_bytes=10_000)
+        spilled = buffer.path
+        source, report, _ = await audio_ingest.prepare_audio(buffer.source(), "wav")
+        buffer.adopt(source)
+        return buffer, spilled, source, report
+
+    buffer, spilled, source, report = asyncio.run(ingest())
+    assert isinstance(source, str) and source != spilled
+    assert not os.path.exists(spilled)
+    assert report["output_seconds"] < report["input_seconds"]
+    buffer.close()
+    assert not os.path.exists(source)
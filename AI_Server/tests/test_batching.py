@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+import torch
+from transformers import T5Config, T5ForConditionalGeneration
+
+from batching import ContinuousBatchingEngine
+from inference_backend import TorchBackend
+
+# different lengths, so rows join with different encoder / decoder padding and finish at different steps
+REQUESTS = [([5, 9, 12, 7, 1], 24), ([8, 1], 6), ([20, 3, 3, 14, 9, 30, 2, 1], 18), ([11, 4, 1], 10),
+            ([6, 6, 1], 30), ([17, 25, 1], 4), ([2, 40, 33, 1], 14), ([9, 1], 20)]
+
+
+@pytest.fixture(scope="module")
+def backend():
+    torch.manual_seed(0)
+    model = T5ForConditionalGeneration(T5Config(
+        vocab_size=48, d_model=16, d_ff=32, d_kv=8, num_layers=2, num_heads=2,
+        decoder_start_token_id=0, pad_token_id=0, eos_token_id=1,
+    )).eval()
+    return TorchBackend(model, torch.device("cpu"))
+
+
+def make_engine(backend, **options):
+    engine = ContinuousBatchingEngine(backend, torch.device("cpu"), **{"max_batch_size": 4, "max_wait_ms": 1,
+                                                                       "do_sample": False, **options})
+    # record the batch size each prefill joined, and the padding left after each eviction
+    engine.joined_busy, engine.after_evict = [], []
+    prefill, evict = engine._prefill, engine._evict
+
+    def traced_prefill(joining):
+        engine.joined_busy.append(len(engine._active))
+        prefill(joining)
+
+    def traced_evict(finished):
+        evict(finished)
+        if engine._active:
+            engine.after_evict.append((
+                engine._encoder_mask.shape[1], max(len(seq.input_ids) for seq in engine._active),
+                engine._decoder_mask.shape[1], max(len(seq.decoder_ids) for seq in engine._active),
+            ))
+
+    engine._prefill, engine._evict = traced_prefill, traced_evict
+    engine.start()
+    return engine
+
+
+def test_staggered_requests_match_one_by_one_greedy(backend):
+    with torch.inference_mode():
+        expected = [backend.generate(ids, max_length, do_sample=False) for ids, max_length in REQUESTS]
+
+    engine = make_engine(backend)
+
+    async def run():
+        async def one(index, ids, max_length):
+            await asyncio.sleep(0.004 * index)
+            return await engine.generate(ids, max_length)
+
+        return await asyncio.gather(*(one(i, ids, max_length) for i, (ids, max_length) in enumerate(REQUESTS)))
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        engine.stop()
+
+    assert results == expected
+    # some requests joined a batch that was already decoding
+    assert any(busy for busy in engine.joined_busy)
+
+
+def test_eviction_trims_padding_to_the_remaining_rows(backend):
+    engine = make_engine(backend)
+
+    async def run():
+        # the long input finishes first, the short one keeps decoding
+        return await asyncio.gather(engine.generate([5, 9, 12, 7, 20, 3, 1], 3), engine.generate([8, 1], 20))
+
+    try:
+        asyncio.run(run())
+    finally:
+        engine.stop()
+
+    assert engine.after_evict
+    for encoder_len, longest_input, decoder_len, longest_decoder in engine.after_evict:
+        assert encoder_len == longest_input
+        # the decoder mask covers the ids fed so far, i.e. all but the newest token
+        assert decoder_len == longest_decoder - 1
+
+
+def test_closing_a_stream_drops_its_row(backend):
+    engine = make_engine(backend, max_batch_size=2)
+
+    async def run():
+        tokens = []
+        stream = engine.stream([5, 9, 1], 1000)
+        async for token in stream:
+            tokens.append(token)
+            if len(tokens) == 2:
+                break
+        await stream.aclose()
+        deadline = time.perf_counter() + 5
+        while engine._active and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        return tokens, list(engine._active), await engine.generate([8, 1], 5)
+
+    try:
+        tokens, active, result = asyncio.run(run())
+    finally:
+        engine.stop()
+
+    assert len(tokens) == 2
+    assert active == []
+    assert result
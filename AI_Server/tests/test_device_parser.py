@@ -0,0 +1,69 @@
+import pytest
+
+import config
+import device_parser
+import parsing_routine
+
+
+def states(text):
+    """{기기 이름: (onoff, state)} 와 신뢰도"""
+    result, confidence = device_parser.parse_locally(text)
+    return {update["name"]: (update["onoff"], update["state"]) for update in result["updates"]}, confidence
+
+
+def test_clauses_split_into_one_update_per_device():
+    found, confidence = states("에어컨을 24도로 냉방 모드로 켜고 정수기에서 냉수 준비할게요.")
+    assert found == {"에어컨": ("ON", "24°C 냉방 모드"), "정수기": ("ON", "냉수 준비")}
+    assert confidence == 1.0
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("세탁기 돌리고, 건조기도 켜둘게요.", {"세탁기": ("ON", "표준 세탁"), "건조기": ("ON", "표준 건조")}),
+    ("TV 끄고 조명은 어둡게 해드릴게요.", {"TV": ("OFF", "영화 모드"), "조명": ("ON", "어둡게")}),
+    ("로봇 청소기로 빠르게 청소할게요.", {"로봇청소기": ("ON", "빠른 청소")}),
+])
+def test_clause_splitting(text, expected):
+    assert states(text)[0] == expected
+
+
+def test_clause_without_a_device_belongs_to_the_previous_one():
+    found, _ = states("에어컨을 켜고 24도로 맞출게요.")
+    assert found == {"에어컨": ("ON", "24°C")}
+
+
+def test_purpose_phrase_sets_the_state_of_later_devices():
+    found, confidence = states("영화 감상을 위해 TV 켜고 조명 어둡게 할게요.")
+    assert found == {"TV": ("ON", "영화 모드"), "조명": ("ON", "어둡게")}
+    assert confidence == 1.0
+
+
+@pytest.mark.parametrize("text, onoff", [
+    ("공기청정기는 끄지 않고 약풍으로 둘게요.", "ON"),
+    ("에어컨은 켜지 말고 창문을 열어 두세요.", "OFF"),
+    ("TV는 안 켤게요.", "OFF"),
+])
+def test_negation_is_read_with_low_confidence(text, onoff):
+    found, confidence = states(text)
+    assert [value[0] for value in found.values()] == [onoff]
+    assert confidence < config.LOCAL_PARSER_MIN_CONFIDENCE
+
+
+def test_off_becomes_standby_after_validation():
+    control = parsing_routine.parse_locally("TV 끄고 조명은 어둡게 해드릴게요.")
+    tv, light = control.updates
+    assert (tv.onoff, tv.state, tv.is_active) == ("off", "대기", False)
+    assert (light.onoff, light.state, light.is_active) == ("on", "어둡게", True)
+
+
+def test_no_device_means_no_result():
+    assert device_parser.parse_locally("오늘은 푹 쉬세요.") == (None, 0.0)
+
+
+def test_low_confidence_falls_back_to_the_llm(monkeypatch):
+    monkeypatch.setattr(config, "LOCAL_PARSER_MIN_CONFIDENCE", 0.8)
+    # only switched on: the default TV state is a guess (0.5)
+    assert device_parser.parse_locally("TV 켜드릴게요.")[1] == 0.5
+    assert parsing_routine.parse_locally("TV 켜드릴게요.") is None
+    assert parsing_routine.parse_locally("로봇청소기로 청소 시작할게요.") is not None
+    monkeypatch.setattr(config, "LOCAL_PARSER_MIN_CONFIDENCE", 0.5)
+    assert parsing_routine.parse_locally("TV 켜드릴게요.") is not None
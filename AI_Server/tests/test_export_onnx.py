@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+
+def test_onnx_export_matches_torch(main_module, tmp_path):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    import torch
+    from transformers import T5ForConditionalGeneration, T5TokenizerFast
+
+    import export_onnx
+    from inference_backend import OnnxBackend, TorchBackend
+
+    model = T5ForConditionalGeneration.from_pretrained(os.environ["MODEL_PATH"]).eval()
+    export_onnx.export(model, str(tmp_path))
+    tokenizer = T5TokenizerFast.from_pretrained(os.environ["TOKENIZER_PATH"])
+    device = torch.device("cpu")
+    assert export_onnx.verify(TorchBackend(model, device), OnnxBackend(str(tmp_path)), tokenizer, atol=1e-4)
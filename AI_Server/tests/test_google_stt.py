@@ -0,0 +1,58 @@
+import io
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.google_stt.analyzer import GoogleVoiceSentimentAnalyzer
+from src.google_stt.config import MAX_SYNC_SECONDS
+from src.google_stt.segmenter import downmix
+
+RATE = 8000
+
+
+def speech_wav(seconds=130, channels=2):
+    """10초 음 + 1초 무음 반복, 채널마다 다른 음량"""
+    t = np.arange(RATE * seconds) / RATE
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * (t % 11 < 10)
+    samples = np.stack([signal * (channel + 1) / channels for channel in range(channels)], axis=1)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buffer.getvalue(), RATE * seconds
+
+
+class SpeechClient:
+    """recognize 로 받은 조각을 기록하는 가짜 Google STT 클라이언트"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def recognize(self, config, audio):
+        self.chunks.append(audio.content)
+        alternative = SimpleNamespace(transcript="말", confidence=0.9)
+        return SimpleNamespace(results=[SimpleNamespace(alternatives=[alternative])])
+
+
+def test_downmix_averages_interleaved_channels():
+    pcm = np.array([100, 300, -200, 0], dtype=np.int16).tobytes()
+    assert np.frombuffer(downmix(pcm, 2), dtype=np.int16).tolist() == [200, -100]
+    assert downmix(pcm, 1) == pcm
+
+
+def test_stereo_long_audio_is_segmented_as_mono():
+    content, frames = speech_wav()
+    client = SpeechClient()
+    analyzer = GoogleVoiceSentimentAnalyzer(speech_client=client, language_client=object())
+
+    text, confidence = analyzer.transcribe(content)
+
+    assert len(client.chunks) > 2
+    assert text == " ".join(["말"] * len(client.chunks))
+    assert confidence == 0.9
+    # each chunk is mono 16-bit PCM within the sync limit, together covering the whole recording once
+    assert sum(len(chunk) for chunk in client.chunks) == frames * 2
+    assert all(len(chunk) <= MAX_SYNC_SECONDS * RATE * 2 for chunk in client.chunks)
@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+
+from src.hume.client import AsyncHumeBatchAPI
+
+
+def full_page_client(limit):
+    """list-jobs 가 항상 limit 개로 꽉 찬 페이지를 돌려주는 클라이언트 (요청 수를 셈)"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        start = int(request.url.params.get("timestamp_ms", 0))
+        return httpx.Response(200, json=[
+            {"job_id": f"job-{start + i}", "state": {"status": "IN_PROGRESS", "created_timestamp_ms": start + i + 1}}
+            for i in range(limit)
+        ])
+
+    api = AsyncHumeBatchAPI(base_url="http://hume.test/jobs", max_retries=0)
+    api.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return api, requests
+
+
+def test_full_page_without_job_ids_lists_one_page():
+    async def run():
+        api, requests = full_page_client(limit=3)
+        async with api:
+            return await api.list_jobs(0, limit=3), requests
+
+    statuses, requests = asyncio.run(run())
+    assert len(statuses) == 3
+    assert len(requests) == 1
+
+
+def test_full_pages_are_followed_until_the_job_ids_are_seen():
+    async def run():
+        api, requests = full_page_client(limit=3)
+        async with api:
+            return await api.list_jobs(0, limit=3, job_ids={"job-5"}), requests
+
+    statuses, requests = asyncio.run(run())
+    assert "job-5" in statuses
+    assert len(requests) == 3
+
+
+def test_memory_and_file_sources_are_uploaded_as_is(tmp_path):
+    audio = bytearray(b"RIFF" + bytes(range(256)) * 300)
+    path = tmp_path / "spilled.wav"
+    path.write_bytes(b"RIFF spilled")
+    bodies = []
+
+    def handler(request):
+        bodies.append(request.read())
+        return httpx.Response(200, json={"job_id": "job-1"})
+
+    async def run():
+        api = AsyncHumeBatchAPI(base_url="http://hume.test/jobs", max_retries=0)
+        api.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with api:
+            return await api.analyze_audio_files([memoryview(audio), str(path)])
+
+    assert asyncio.run(run()) == "job-1"
+    assert bytes(audio) in bodies[0] and b"RIFF spilled" in bodies[0]
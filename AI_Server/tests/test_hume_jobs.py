@@ -0,0 +1,146 @@
+import asyncio
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+import audio_analysis
+from hume_jobs import HumeJobWaiter
+from src.hume.client import AsyncHumeBatchAPI
+from tests.conftest import free_port
+
+AUDIO = b"RIFF fake wav"
+
+
+def make_waiter(url, **options):
+    options = {"callback_url": "", "poll_interval": 0.05, "timeout": 5, "batch_window_ms": 1, **options}
+    return HumeJobWaiter(client=AsyncHumeBatchAPI(base_url=url, max_retries=0), **options)
+
+
+async def start_callback_receiver(waiter):
+    """Hume 이 완료를 POST 하는 /hume_callback/ 을 같은 이벤트 루프에서 띄움"""
+    app = FastAPI()
+
+    @app.post("/hume_callback/")
+    async def hume_callback(request: Request):
+        payload = await request.json()
+        waiter.notify(payload["job_id"], payload["status"], payload.get("predictions"))
+        return {"status": "ok"}
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.ensure_future(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task, f"http://127.0.0.1:{port}/hume_callback/"
+
+
+def test_webhook_completes_without_polling(hume_server):
+    hume_app, url = hume_server(processing=0.2)
+
+    async def run():
+        # the poller would only look after 30s, so completion has to come from the callback
+        waiter = make_waiter(url, poll_interval=30)
+        server, task, waiter.callback_url = await start_callback_receiver(waiter)
+        try:
+            start = time.perf_counter()
+            predictions = await waiter.analyze(AUDIO)
+            return predictions, time.perf_counter() - start
+        finally:
+            server.should_exit = True
+            await task
+            await waiter.client.aclose()
+
+    predictions, elapsed = asyncio.run(run())
+    assert audio_analysis.get_top_emotion(predictions) is not None
+    assert elapsed < 2
+    assert hume_app.state.stats["callbacks"] == 1
+    assert hume_app.state.stats["list_requests"] == 0
+
+
+def test_polling_fallback_without_webhook(hume_server):
+    hume_app, url = hume_server(processing=0.2)
+
+    async def run():
+        waiter = make_waiter(url)
+        try:
+            return await asyncio.gather(*(waiter.analyze(AUDIO) for _ in range(8)))
+        finally:
+            await waiter.client.aclose()
+
+    results = asyncio.run(run())
+    assert all(audio_analysis.get_top_emotion(predictions) is not None for predictions in results)
+    # one shared list-jobs query per interval, no per-job status requests
+    assert hume_app.state.stats["list_requests"] > 0
+    assert hume_app.state.stats["status_requests"] == 0
+
+
+def test_timeout(hume_server):
+    _, url = hume_server(processing=10)
+
+    async def run():
+        waiter = make_waiter(url, timeout=0.3)
+        try:
+            return await waiter.analyze(AUDIO)
+        finally:
+            await waiter.client.aclose()
+
+    assert asyncio.run(run()) == {"error": "Hume analysis timeout"}
+
+
+def test_more_jobs_than_list_limit(hume_server):
+    hume_app, url = hume_server(processing=0.2)
+    # other workers on the same API key created 150 jobs just before ours
+    now = int(time.time() * 1000)
+    for i in range(150):
+        hume_app.state.jobs[str(uuid.uuid4())] = {"status": "IN_PROGRESS", "files": [], "created": now - 1000 + i}
+
+    async def run():
+        waiter = make_waiter(url, list_limit=100, timeout=3)
+        try:
+            return await waiter.analyze(AUDIO)
+        finally:
+            await waiter.client.aclose()
+
+    assert audio_analysis.get_top_emotion(asyncio.run(run())) is not None
+
+
+def test_poller_survives_a_bad_response(hume_server):
+    _, url = hume_server(processing=0.2)
+
+    class FlakyClient(AsyncHumeBatchAPI):
+        failures = 1
+
+        async def list_jobs(self, *args, **kwargs):
+            if self.failures:
+                self.failures -= 1
+                raise KeyError("state")
+            return await super().list_jobs(*args, **kwargs)
+
+    async def run():
+        waiter = HumeJobWaiter(client=FlakyClient(base_url=url, max_retries=0), callback_url="",
+                               poll_interval=0.05, timeout=3, batch_window_ms=1)
+        try:
+            return await waiter.analyze(AUDIO)
+        finally:
+            await waiter.client.aclose()
+
+    assert audio_analysis.get_top_emotion(asyncio.run(run())) is not None
+
+
+def test_bad_source_fails_only_its_own_request(hume_server):
+    _, url = hume_server(processing=0.2)
+    released = memoryview(bytearray(AUDIO))
+    released.release()
+
+    async def run():
+        waiter = make_waiter(url, batch_window_ms=50, max_files=2)
+        try:
+            return await asyncio.gather(waiter.analyze(released), waiter.analyze(AUDIO))
+        finally:
+            await waiter.client.aclose()
+
+    bad, good = asyncio.run(run())
+    assert "error" in bad
+    assert audio_analysis.get_top_emotion(good) is not None
@@ -0,0 +1,73 @@
+import parsing_routine
+
+
+def test_validator_applies_onoff_rules():
+    control = parsing_routine.DeviceControl.model_validate({"updates": [
+        {"appliance_id": 1, "name": "에어컨", "onoff": "OFF", "state": "24도", "is_active": True},
+        {"appliance_id": 4, "name": "TV", "onoff": "On", "state": "켜짐", "is_active": True},
+    ]})
+    off, on = control.updates
+    assert (off.onoff, off.state, off.is_active) == ("off", "대기", False)
+    assert (on.onoff, on.state, on.is_active) == ("on", "켜짐", True)
+
+
+def test_unparsable_routine_is_a_502(app_client, main_module, monkeypatch):
+    async def generate_candidates(input_ids, num_candidates):
+        return [[3, 4, 1]] * num_candidates
+
+    async def parse_routine(text):
+        return text, None
+
+    monkeypatch.setattr(main_module, "generate_candidates", generate_candidates)
+    monkeypatch.setattr(main_module, "parse_routine", parse_routine)
+    response = app_client.post("/recommend_routine/", json={"situation": "너무 더워", "user_id": "u1"})
+    assert response.status_code == 502
+    assert response.json()["detail"] == "Failed to parse routine"
+
+
+def test_anonymous_requests_skip_history_and_generate_one_candidate(app_client, main_module, monkeypatch):
+    requested = []
+
+    async def generate_candidates(input_ids, num_candidates):
+        requested.append(num_candidates)
+        return [[3, 4, 1]] * num_candidates
+
+    async def parse_routine(text):
+        return text, {"updates": []}
+
+    monkeypatch.setattr(main_module, "generate_candidates", generate_candidates)
+    monkeypatch.setattr(main_module, "parse_routine", parse_routine)
+    monkeypatch.setattr(main_module.config, "NUM_CANDIDATES", 3)
+    monkeypatch.setattr(main_module, "history", main_module.RoutineHistory())
+
+    assert app_client.post("/recommend_routine/", json={"situation": "너무 더워"}).status_code == 200
+    assert app_client.post("/recommend_routine/", json={"situation": "너무 더워", "user_id": "u1"}).status_code == 200
+    assert requested == [1, 3]
+    assert main_module.history.snapshot() == {"users": 1, "routines": 1}
+
+
+def stream_events(app_client):
+    response = app_client.post("/recommend_routine/stream", json={"situation": "너무 더워"})
+    assert response.status_code == 200
+    return [block.split("\n")[0].removeprefix("event: ") for block in response.text.strip().split("\n\n")]
+
+
+def test_stream_ends_with_an_error_event_when_generation_fails(app_client, main_module, monkeypatch):
+    async def stream_tokens(input_ids):
+        yield 3
+        raise RuntimeError("generate crashed")
+
+    monkeypatch.setattr(main_module, "stream_tokens", stream_tokens)
+    assert stream_events(app_client)[-1] == "error"
+
+
+def test_stream_ends_with_an_error_event_when_parsing_fails(app_client, main_module, monkeypatch):
+    async def stream_tokens(input_ids):
+        yield 3
+
+    async def parse_routine(text):
+        raise ValueError("bad routine")
+
+    monkeypatch.setattr(main_module, "stream_tokens", stream_tokens)
+    monkeypatch.setattr(main_module, "parse_routine", parse_routine)
+    assert stream_events(app_client)[-1] == "error"
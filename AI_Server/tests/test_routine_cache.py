@@ -0,0 +1,35 @@
+import threading
+
+from routine_cache import RoutineCache
+
+ROUTINES = [{"routine": f"루틴 {i}"} for i in range(3)]
+
+
+def test_variants_of_an_evicted_key_are_kept_on_disk(tmp_path):
+    db_path = str(tmp_path / "routines.db")
+    cache = RoutineCache(max_entries=1, ttl=60, db_path=db_path, variants=3)
+    cache.put("a|", ROUTINES[0])
+    cache.put("b|", {"routine": "다른 루틴"})  # evicts "a|" from memory
+    cache.put("a|", ROUTINES[1])
+    cache.put("a|", ROUTINES[2])
+    cache.close()
+
+    reopened = RoutineCache(max_entries=1, ttl=60, db_path=db_path, variants=3)
+    rows = reopened._db.execute("SELECT response FROM routines WHERE key = ?", ("a|",)).fetchall()
+    assert len(rows) == 3
+    assert reopened.get("a|") in ROUTINES
+    assert reopened.snapshot()["disk_hits"] == 1
+    reopened.close()
+
+
+def test_pending_writes_are_visible_before_the_flush(tmp_path):
+    cache = RoutineCache(max_entries=1, ttl=60, db_path=str(tmp_path / "routines.db"))
+    # hold the writer thread so nothing reaches sqlite yet
+    release = threading.Event()
+    cache._writer.submit(release.wait)
+    cache.put("a|", ROUTINES[0])
+    cache.put("b|", ROUTINES[1])  # evicts "a|" from memory
+    assert cache.get("a|") == ROUTINES[0]
+    release.set()
+    cache.close()
+    assert cache._dirty == {}
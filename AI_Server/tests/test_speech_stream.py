@@ -0,0 +1,51 @@
+import asyncio
+
+import numpy as np
+
+from benchmarks.fake_speech_client import FakeSpeechClient
+from speech_stream import MAX_REQUEST_BYTES, StreamingTranscriber
+
+TRANSCRIPT = "에어컨 좀 켜줘"
+SPEECH = np.full(1600, 3000, dtype="<i2").tobytes()  # 100ms at 16kHz
+SILENCE = bytes(len(SPEECH))
+
+
+def transcribe(client, frames, frame_delay=0.0):
+    """frames 를 (frame_delay 간격으로) 흘려 보내 (이벤트 리스트, 실제로 읽힌 frame 수) 반환"""
+    consumed = 0
+
+    async def chunks():
+        nonlocal consumed
+        for frame in frames:
+            consumed += 1
+            yield frame
+            await asyncio.sleep(frame_delay)
+
+    async def collect():
+        return [event async for event in StreamingTranscriber(speech_client=client).transcribe(chunks())]
+
+    return asyncio.run(collect()), consumed
+
+
+def test_interim_results_then_final():
+    events, _ = transcribe(FakeSpeechClient(TRANSCRIPT, latency=0.01), [SPEECH] * 10 + [SILENCE] * 5)
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == "final" and events[-1][1] == TRANSCRIPT
+    assert kinds[:-1] and set(kinds[:-1]) == {"interim"}
+    # interim transcripts grow word by word
+    assert [text for _, text in events[:-1]] == sorted((text for _, text in events[:-1]), key=len)
+
+
+def test_stops_reading_audio_at_end_of_utterance():
+    frames = [SPEECH] * 5 + [SILENCE] * 5 + [SPEECH] * 50
+    events, consumed = transcribe(FakeSpeechClient(TRANSCRIPT, latency=0.05), frames, frame_delay=0.01)
+    assert events[-1] == ("final", TRANSCRIPT)
+    # the speech after the pause is never uploaded
+    assert consumed < len(frames)
+
+
+def test_large_frames_are_split_into_allowed_requests():
+    frame = np.full(MAX_REQUEST_BYTES, 3000, dtype="<i2").tobytes()  # 2 x MAX_REQUEST_BYTES
+    events, _ = transcribe(FakeSpeechClient(TRANSCRIPT, latency=0.01), [frame, bytes(len(frame))])
+    assert "error" not in [kind for kind, _ in events]
+    assert events[-1] == ("final", TRANSCRIPT)
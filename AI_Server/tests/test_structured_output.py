@@ -0,0 +1,87 @@
+import random
+
+import pytest
+import torch
+
+from structured_output import (DELIMITER, SEPARATOR, UPDATE_VALUES, StructuredConstraint, encode_updates,
+                               format_target, mask_logits, split_output, visible_text)
+
+ROUTINE = "에어컨을 24도로 맞추고 정수기에서 냉수를 준비할게요."
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    """공백 단위 토크나이저 (update 를 따로 토크나이즈해 이어 붙여도 같아서 trie 제한이 켜짐)"""
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import T5TokenizerFast
+
+    words = ["<pad>", "</s>", "<unk>", SEPARATOR, DELIMITER] + ROUTINE.split()
+    for value in sorted(UPDATE_VALUES):
+        words += [word for word in value.split() if word not in words]
+    backend = Tokenizer(models.WordLevel({word: i for i, word in enumerate(words)}, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    return T5TokenizerFast(tokenizer_object=backend, eos_token="</s>", pad_token="<pad>", unk_token="<unk>",
+                           extra_ids=0)
+
+
+def test_masked_decoding_only_produces_valid_suffixes(tokenizer):
+    constraint = StructuredConstraint(tokenizer)
+    assert constraint.exact
+    prefix = tokenizer(f"{ROUTINE} {SEPARATOR}", add_special_tokens=False).input_ids
+    rng = random.Random(0)
+    counts = []
+    for seed in range(200):
+        torch.manual_seed(seed)
+        ids = list(prefix)
+        while True:
+            allowed = constraint(ids)
+            assert allowed, tokenizer.decode(ids)
+            # random model scores, only the allowed tokens survive the mask
+            token = int(mask_logits(torch.randn(len(tokenizer)) * rng.uniform(0.1, 5), allowed).argmax())
+            assert token in allowed
+            if token == tokenizer.eos_token_id:
+                break
+            ids.append(token)
+
+        routine, result = split_output(tokenizer.decode(ids, skip_special_tokens=True))
+        assert routine == ROUTINE
+        suffix = tokenizer.decode(ids[len(prefix):], skip_special_tokens=True)
+        parts = [part.strip() for part in suffix.split(DELIMITER) if part.strip()]
+        assert all(part in UPDATE_VALUES for part in parts)
+        # every generated update survives parsing, each device at most once
+        assert len(result["updates"]) == len(parts)
+        assert len({update["appliance_id"] for update in result["updates"]}) == len(parts)
+        counts.append(len(parts))
+    assert max(counts) >= 2
+
+
+def test_routine_part_is_not_constrained(tokenizer):
+    constraint = StructuredConstraint(tokenizer)
+    assert constraint(tokenizer(ROUTINE, add_special_tokens=False).input_ids) is None
+
+
+def test_split_output_inverts_encode_updates():
+    result = {"updates": [
+        {"appliance_id": 1, "user_id": 6, "name": "에어컨", "onoff": "on", "state": "24°C 냉방 모드", "is_active": True},
+        {"appliance_id": 6, "user_id": 6, "name": "정수기", "onoff": "on", "state": "냉수 준비", "is_active": True},
+        {"appliance_id": 4, "user_id": 6, "name": "TV", "onoff": "off", "state": "대기", "is_active": False},
+    ]}
+    text = format_target(ROUTINE, encode_updates(result))
+    assert split_output(text) == (ROUTINE, result)
+    assert visible_text(text) == ROUTINE
+
+
+def test_encode_updates_normalizes_and_drops_unknown_states():
+    result = {"updates": [
+        {"appliance_id": 5, "user_id": 6, "name": "조명", "onoff": "OFF", "state": "밝게", "is_active": False},
+        {"appliance_id": 2, "user_id": 6, "name": "공기청정기", "onoff": "ON", "state": "터보", "is_active": True},
+    ]}
+    assert encode_updates(result) == "5:off:대기"
+    assert split_output(format_target(ROUTINE, encode_updates(result)))[1]["updates"][0]["state"] == "대기"
+
+
+def test_visible_text_hides_a_partial_separator():
+    assert visible_text(f"{ROUTINE} #") == ROUTINE
+    assert visible_text(f"{ROUTINE} ##") == ROUTINE
+    assert visible_text(ROUTINE) == ROUTINE
+    assert split_output(ROUTINE) == (ROUTINE, None)
@@ -0,0 +1,91 @@
+import numpy as np
+
+import config
+from benchmarks.fake_speech_client import FakeSpeechClient
+
+SPEECH = np.full(8000, 3000, dtype="<i2").tobytes()  # 0.5s at 16kHz
+
+
+def test_voice_stream_closes_when_audio_exceeds_the_limit(app_client, main_module, monkeypatch):
+    monkeypatch.setattr(config, "AUDIO_MAX_BYTES", 3 * len(SPEECH))
+    monkeypatch.setattr(main_module.transcriber, "_speech_client", FakeSpeechClient("에어컨 켜줘", latency=0.01))
+    with app_client.websocket_connect("/voice_stream/?prosody_backend=local") as websocket:
+        for _ in range(5):
+            websocket.send_bytes(SPEECH)
+        while (message := websocket.receive())["type"] != "websocket.close":
+            pass
+    assert message["code"] == 1009
+
+
+def speech_wav(seconds=1.0, sample_rate=16000):
+    """0.2초 무음 + 말소리 비슷한 배음 + 0.2초 무음 wav bytes"""
+    from src.google_stt.preprocess import encode_wav
+
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    voice = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6)) * 0.2
+    silence = np.zeros(sample_rate // 5)
+    return encode_wav(np.concatenate([silence, voice, silence]).astype(np.float32), sample_rate)
+
+
+def test_voice_analysis_with_the_configured_fake_stt(app_client, main_module, monkeypatch):
+    async def recommend(input_text, user_id=""):
+        return {"routine": input_text, "updates": []}
+
+    monkeypatch.setattr(config, "STT_BACKEND", "fake")
+    monkeypatch.setattr(main_module, "recommend", recommend)
+    response = app_client.post(
+        "/voice_analysis/?prosody_backend=local", files={"audio": ("audio.wav", speech_wav(), "audio/wav")}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    # fake transcript + "(emotion)" tag from the local prosody estimator
+    assert body["routine"].startswith("오늘 하루 너무 피곤했어 (")
+    assert "stt_ms" in body["timings"]
+
+
+def test_corrupt_wav_with_local_prosody_is_not_a_500(app_client, main_module, monkeypatch):
+    async def recommend(input_text, user_id=""):
+        return {"routine": input_text, "updates": []}
+
+    monkeypatch.setattr(config, "STT_BACKEND", "fake")
+    monkeypatch.setattr(main_module, "recommend", recommend)
+    corrupt = b"RIFF\x24\x00\x00\x00WAVEfmt garbage"
+    response = app_client.post(
+        "/voice_analysis/?prosody_backend=local", files={"audio": ("audio.wav", corrupt, "audio/wav")}
+    )
+    assert response.status_code == 200
+    assert response.json()["routine"].startswith("오늘 하루 너무 피곤했어")
+
+
+def test_fake_stt_cannot_be_picked_per_request(app_client):
+    response = app_client.post(
+        "/voice_analysis/?stt_backend=fake", files={"audio": ("audio.wav", speech_wav(), "audio/wav")}
+    )
+    assert response.status_code == 400
+
+
+def test_stt_backend_is_created_once_under_concurrent_first_requests(monkeypatch):
+    import threading
+    import time
+
+    import audio_analysis
+    from src.stt.backends import FakeSTTBackend
+
+    created = []
+
+    def create_backend(name, **options):
+        time.sleep(0.05)  # a slow constructor widens the race
+        created.append(name)
+        return FakeSTTBackend()
+
+    monkeypatch.setattr(audio_analysis, "_stt_backends", {})
+    monkeypatch.setattr(audio_analysis, "create_backend", create_backend)
+    backends = []
+    threads = [threading.Thread(target=lambda: backends.append(audio_analysis.get_stt_backend("local")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert created == ["local"]
+    assert len({id(backend) for backend in backends}) == 1
@@ -1,47 +1,51 @@
-from src.google_stt.analyzer import GoogleVoiceSentimentAnalyzer
+from src.stt.backends import REGISTRY, create_backend
 from src.hume.client import HumeBatchAPI
+import os
 import time
 import argparse
 from pathlib import Path
 from operator import itemgetter
 
-def analyze_with_google(file_path: str) -> dict:
-    """Google STT와 감정 분석 실행"""
-    analyzer = GoogleVoiceSentimentAnalyzer()
-    return analyzer.analyze_audio(file_path)
+def transcribe(file_path: str, backend: str, model_dir: str = None) -> dict:
+    """STT 백엔드 (google | local | fake) 로 음성을 텍스트로 변환"""
+    options = {"model_dir": model_dir} if backend == "local" else {}
+    result = create_backend(backend, **options).transcribe(file_path)
+    if not result or not result[0]:
+        return {'error': '음성 변환 실패'}
+    text, confidence = result
+    return {'text': text, 'confidence': confidence, 'backend': backend}
 
-def print_google_results(results: dict):
-    """Google 분석 결과 출력"""
+def print_stt_results(results: dict):
+    """STT 결과 출력"""
     if 'error' in results:
         print(f"Error: {results['error']}")
         return
 
-    print("\nRunning Google Analysis...")
-    print("\n=== Google STT & Sentiment Analysis ===")
+    print(f"\n=== Speech-to-Text ({results['backend']}, 신뢰도 {results['confidence']:.2%}) ===")
     print("-" * 40)
     print(f"{results['text']}\n")
 
 def analyze_with_hume(file_path: str) -> dict:
     """Hume AI 분석 실행"""
-    client = HumeBatchAPI()
-    job_id = client.analyze_audio(file_path)
-    
-    if not job_id:
-        return {"error": "Failed to start Hume analysis"}
-    
-    print("Running Hume Analysis...")
-    print(f"Hume analysis started - Job ID: {job_id}")
-    
-    while True:
-        status = client.get_job_status(job_id)
-        print(f"Status: {status}")
+    with HumeBatchAPI() as client:
+        job_id = client.analyze_audio(file_path)
+        
+        if not job_id:
+            return {"error": "Failed to start Hume analysis"}
+        
+        print("Running Hume Analysis...")
+        print(f"Hume analysis started - Job ID: {job_id}")
         
-        if status == "COMPLETED":
-            return client.get_predictions(job_id)
-        elif status == "FAILED":
-            return {"error": "Hume analysis failed"}
+        while True:
+            status = client.get_job_status(job_id)
+            print(f"Status: {status}")
             
-        time.sleep(5)
+            if status == "COMPLETED":
+                return client.get_predictions(job_id)
+            elif status == "FAILED":
+                return {"error": "Hume analysis failed"}
+                
+            time.sleep(5)
 
 def print_hume_results(predictions: dict):
     """Hume 분석 결과 출력"""
@@ -85,29 +89,33 @@ def main():
     parser = argparse.ArgumentParser(description='Voice Analysis Tool')
     parser.add_argument('file_path', type=str, help='Path to the audio file')
     parser.add_argument('--service', type=str, 
-                       choices=['google', 'hume', 'both'],
-                       default='both', help='Which service to use')
+                       choices=['stt', 'google', 'hume', 'both'],
+                       default='both', help='Which service to use (google is the old name of stt)')
+    parser.add_argument('--stt', type=str, choices=list(REGISTRY),
+                       default=os.getenv('STT_BACKEND', 'google'), help='Speech-to-text backend')
+    parser.add_argument('--stt-model-dir', type=str, default=None,
+                       help='Pre-downloaded Whisper model directory for --stt local (default: $STT_LOCAL_MODEL_DIR)')
     args = parser.parse_args()
     
     if not Path(args.file_path).exists():
         print(f"Error: File {args.file_path} does not exist")
         return
     
-    google_results = None
+    stt_results = None
     hume_results = None
     
-    if args.service in ['google', 'both']:
-        google_results = analyze_with_google(args.file_path)
-        print_google_results(google_results)
+    if args.service in ['stt', 'google', 'both']:
+        stt_results = transcribe(args.file_path, args.stt, args.stt_model_dir)
+        print_stt_results(stt_results)
     
     if args.service in ['hume', 'both']:
         hume_results = analyze_with_hume(args.file_path)
         print_hume_results(hume_results)
 
-    if google_results and hume_results and 'error' not in google_results:
+    if stt_results and hume_results and 'error' not in stt_results:
         print("\n=== 최종 분석 결과 ===")
         print("-" * 40)
-        text = google_results['text']
+        text = stt_results['text']
         top_emotion = get_top_emotion(hume_results)
         print(f"{text} ({top_emotion})")
 
@@ -1,42 +1,88 @@
 from google.cloud import speech
 from google.cloud.language_v1 import LanguageServiceClient, Document
 import os
+import wave
 import ffmpeg
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Tuple
+from .config import MAX_SYNC_SECONDS, MIN_SILENCE_MS, MAX_PARALLEL_CHUNKS
+from .segmenter import downmix, split_at_silence
+from .preprocess import AudioSource, open_audio
 
 class GoogleVoiceSentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, speech_client=None, language_client=None):
         os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "credentials/service_account.json"
 
-        self.speech_client = speech.SpeechClient()
-        self.language_client = LanguageServiceClient()
+        self.speech_client = speech_client or speech.SpeechClient()
+        self.language_client = language_client or LanguageServiceClient()
 
-    def transcribe_audio(self, audio_file_path: str) -> Optional[str]:
-        """음성 파일을 텍스트로 변환"""
-        try:
-            with open(audio_file_path, 'rb') as audio_file:
-                content = audio_file.read()
-
-            audio = speech.RecognitionAudio(content=content)
+    def _recognize(self, content: bytes, sample_rate: int = 16000) -> Tuple[str, float]:
+        """음성 (wav, PCM 또는 FLAC) 한 조각을 동기 recognize 로 변환 (텍스트, 글자 수로 가중 평균한 신뢰도)"""
+        audio = speech.RecognitionAudio(content=content)
+        if content[:4] == b"fLaC":
+            # Google decodes FLAC itself and reads the sample rate from its header
+            config = speech.RecognitionConfig(
+                encoding=speech.RecognitionConfig.AudioEncoding.FLAC,
+                language_code="ko-KR",
+                enable_automatic_punctuation=True
+            )
+        else:
             config = speech.RecognitionConfig(
                 encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=16000,
+                sample_rate_hertz=sample_rate,
                 language_code="ko-KR",
                 enable_automatic_punctuation=True
             )
 
-            response = self.speech_client.recognize(config=config, audio=audio)
-
-            transcribed_text = ""
-            for result in response.results:
-                transcribed_text += result.alternatives[0].transcript
+        response = self.speech_client.recognize(config=config, audio=audio)
+
+        transcribed_text = ""
+        weighted_confidence = 0.0
+        for result in response.results:
+            alternative = result.alternatives[0]
+            transcribed_text += alternative.transcript
+            weighted_confidence += alternative.confidence * len(alternative.transcript)
+
+        return transcribed_text, weighted_confidence / len(transcribed_text) if transcribed_text else 0.0
+
+    def transcribe_long_audio(self, pcm: bytes, sample_rate: int, channels: int = 1,
+                              max_workers: int = MAX_PARALLEL_CHUNKS) -> Tuple[str, float]:
+        """긴 음성을 무음 구간에서 나눠 동시에 (최대 max_workers 개) 변환하고 순서대로 이어 붙임"""
+        # the segmenter and the LINEAR16 chunks are mono: interleaved stereo would be cut mid-frame
+        chunks = split_at_silence(downmix(pcm, channels), sample_rate, MAX_SYNC_SECONDS, MIN_SILENCE_MS)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pieces = [(text.strip(), confidence) for text, confidence in
+                      pool.map(lambda chunk: self._recognize(chunk, sample_rate), chunks)]
+        pieces = [(text, confidence) for text, confidence in pieces if text]
+        length = sum(len(text) for text, _ in pieces)
+        return (" ".join(text for text, _ in pieces),
+                sum(confidence * len(text) for text, confidence in pieces) / length if length else 0.0)
+
+    def transcribe(self, audio_file_path: AudioSource) -> Optional[Tuple[str, float]]:
+        """음성 파일 (경로 또는 메모리의 wav bytes) 을 (텍스트, 신뢰도) 로 변환 (단일 요청 한도보다 길면 조각내서 변환)"""
+        try:
+            try:
+                with open_audio(audio_file_path) as audio_file, wave.open(audio_file, 'rb') as f:
+                    if f.getnframes() / f.getframerate() > MAX_SYNC_SECONDS and f.getsampwidth() == 2:
+                        return self.transcribe_long_audio(f.readframes(f.getnframes()), f.getframerate(),
+                                                         f.getnchannels())
+            except (wave.Error, EOFError):
+                pass
+
+            with open_audio(audio_file_path) as audio_file:
+                content = audio_file.read()
 
-            return transcribed_text
+            return self._recognize(content)
 
         except Exception as e:
             print(f"음성 변환 중 에러 발생: {str(e)}")
             return None
 
+    def transcribe_audio(self, audio_file_path: AudioSource) -> Optional[str]:
+        """음성 파일 (경로 또는 메모리의 wav bytes) 을 텍스트로 변환"""
+        result = self.transcribe(audio_file_path)
+        return result[0] if result else None
+
     def analyze_sentiment(self, text: str) -> Optional[Dict[str, Any]]:
         """텍스트의 감정 분석"""
         try:
@@ -65,7 +111,7 @@ class GoogleVoiceSentimentAnalyzer:
             print(f"감정 분석 중 에러 발생: {str(e)}")
             return None
 
-    def analyze_audio(self, audio_file_path: str) -> Dict[str, Any]:
+    def analyze_audio(self, audio_file_path: AudioSource) -> Dict[str, Any]:
         """음성 파일 분석 (변환 + STT + 감정 분석)"""
 
         # 1. 음성을 텍스트로 변환
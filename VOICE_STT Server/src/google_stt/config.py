@@ -1,3 +1,12 @@
 SAMPLE_RATE = 16000
 CHANNELS = 1
-FORMAT = "wav"
\ No newline at end of file
+FORMAT = "wav"
+# long audio: synchronous recognize accepts up to 60s, longer recordings are split at silence
+MAX_SYNC_SECONDS = 55
+MIN_SILENCE_MS = 300
+MAX_PARALLEL_CHUNKS = 4
+
+# preprocessing: energy-based VAD trims leading / trailing silence
+VAD_FLOOR_DBFS = -50
+VAD_DYNAMIC_RANGE_DB = 40
+TRIM_PADDING_MS = 150
@@ -0,0 +1,252 @@
+import io
+import itertools
+import os
+import wave
+from typing import Union
+
+import ffmpeg
+import numpy as np
+
+from .config import SAMPLE_RATE, CHANNELS, VAD_FLOOR_DBFS, VAD_DYNAMIC_RANGE_DB, TRIM_PADDING_MS
+from .segmenter import FRAME_MS
+
+# a file path, or wav bytes already in memory (bytes / bytearray / memoryview)
+AudioSource = Union[str, bytes, bytearray, memoryview]
+
+
+def open_audio(audio: AudioSource):
+    """경로면 파일을, 메모리의 bytes 면 BytesIO 를 열어 반환"""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return io.BytesIO(audio)
+    return open(audio, 'rb')
+
+
+def to_float(frames: bytes, sample_width: int) -> np.ndarray:
+    """wav PCM (8/16/24/32-bit) 을 -1~1 float32 로"""
+    if sample_width == 1:
+        return (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    if sample_width == 2:
+        return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    if sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        return values.astype(np.float32) / 8388608
+    if sample_width == 4:
+        return np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648
+    raise wave.Error(f"unsupported sample width: {sample_width}")
+
+
+def decode_wav(audio: AudioSource):
+    """wav 를 (samples [frames, channels] float32, sample_rate) 로 디코딩"""
+    with open_audio(audio) as f, wave.open(f, 'rb') as w:
+        channels, sample_rate = w.getnchannels(), w.getframerate()
+        samples = to_float(w.readframes(w.getnframes()), w.getsampwidth())
+    return samples.reshape(-1, channels), sample_rate
+
+
+def decode_audio(audio: AudioSource, audio_format: str) -> bytes:
+    """압축 음성 (flac, ogg/opus 등 ffmpeg 가 읽는 포맷) 을 SAMPLE_RATE / CHANNELS 16-bit wav bytes 로 디코딩"""
+    if isinstance(audio, str):
+        stream, data = ffmpeg.input(audio, format=audio_format), None
+    else:
+        stream, data = ffmpeg.input('pipe:', format=audio_format), bytes(audio)
+    try:
+        # raw PCM out: a wav written to a pipe has no valid length in its header
+        pcm, _ = (
+            stream.output('pipe:', format='s16le', acodec='pcm_s16le', ac=CHANNELS, ar=SAMPLE_RATE)
+            .run(input=data, capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        raise ValueError(f"Failed to decode {audio_format} audio: {e.stderr.decode(errors='ignore')[-200:]}")
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as w:
+        w.setnchannels(CHANNELS)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def lowpass(samples: np.ndarray, cutoff: float, taps: int = 63) -> np.ndarray:
+    """Hamming 창 sinc FIR 저역 통과 (cutoff: 샘플링 주파수 대비 비율)"""
+    if len(samples) < taps:
+        return samples
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return np.convolve(samples, kernel / kernel.sum(), mode="same").astype(np.float32)
+
+
+def resample(samples: np.ndarray, sample_rate: int, target_rate: int) -> np.ndarray:
+    """선형 보간 리샘플링 (내릴 때는 먼저 저역 통과로 aliasing 제거)"""
+    if sample_rate == target_rate or len(samples) == 0:
+        return samples
+    if target_rate < sample_rate:
+        samples = lowpass(samples, 0.45 * target_rate / sample_rate)
+    length = int(round(len(samples) * target_rate / sample_rate))
+    positions = np.arange(length) * (sample_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def frame_levels(samples: np.ndarray, frame: int) -> np.ndarray:
+    """FRAME_MS 프레임별 에너지 (dBFS), 마지막의 모자란 프레임은 제외"""
+    frames = len(samples) // frame
+    rms = np.sqrt(np.mean(samples[:frames * frame].reshape(frames, frame) ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def voiced_range(level: np.ndarray, frame: int, length: int):
+    """프레임 에너지로 남길 구간 (start, end) 샘플 위치 (말소리가 안 보이면 전체)"""
+    frames = len(level)
+    if frames == 0:
+        return 0, length
+    voiced = np.flatnonzero(level > max(level.max() - VAD_DYNAMIC_RANGE_DB, VAD_FLOOR_DBFS))
+    if len(voiced) == 0:
+        return 0, length
+    pad = TRIM_PADDING_MS // FRAME_MS
+    start = max(0, voiced[0] - pad) * frame
+    end = (voiced[-1] + 1 + pad) * frame
+    return start, end if end < frames * frame else length
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """프레임 에너지 (dBFS) 기반 VAD 로 앞뒤 무음을 잘라냄 (말소리가 안 보이면 그대로 둠)"""
+    frame = int(sample_rate * FRAME_MS / 1000)
+    start, end = voiced_range(frame_levels(samples, frame), frame, len(samples))
+    return samples[start:end]
+
+
+def resample_blocks(blocks, sample_rate: int, target_rate: int, length: int, taps: int = 63):
+    """모노 float32 블록들을 이어서 resample 한 것과 같은 결과를 블록 단위로 생성 (length: 전체 입력 샘플 수)
+
+    - 저역 통과는 앞 블록 끝 taps - 1 개를 이어 붙여 계산 (np.convolve mode="same" 의 0 패딩과 같음)
+    - 보간은 출력 위치에 필요한 두 입력 샘플이 모두 들어온 출력만 내보냄
+    """
+    if sample_rate == target_rate:
+        yield from blocks
+        return
+    half = taps // 2
+    filtering = target_rate < sample_rate and length >= taps
+    if filtering:
+        cutoff = 0.45 * target_rate / sample_rate
+        n = np.arange(taps) - (taps - 1) / 2
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+        kernel /= kernel.sum()
+
+    ratio = sample_rate / target_rate
+    output_length = int(round(length * target_rate / sample_rate))
+    raw = np.zeros(half, dtype=np.float32)  # unfiltered samples still needed as filter context
+    filtered = np.zeros(0, dtype=np.float32)  # filtered samples from index `offset` on
+    offset, next_output = 0, 0
+
+    def interpolate(last):
+        nonlocal filtered, offset, next_output
+        end = output_length if last else min(output_length, int((offset + len(filtered) - 1) / ratio) + 1)
+        if end <= next_output or len(filtered) == 0:
+            return np.zeros(0, dtype=np.float32)
+        positions = np.arange(next_output, end) * ratio - offset
+        out = np.interp(positions, np.arange(len(filtered)), filtered).astype(np.float32)
+        next_output = end
+        drop = min(int(end * ratio) - offset, len(filtered) - 1)
+        if drop > 0:
+            filtered, offset = filtered[drop:], offset + drop
+        return out
+
+    for block in itertools.chain(blocks, [None]):
+        if filtering:
+            if block is None:
+                raw = np.concatenate([raw, np.zeros(half, dtype=np.float32)])
+            else:
+                raw = np.concatenate([raw, block])
+            if len(raw) >= taps:
+                new = np.convolve(raw, kernel, mode="valid").astype(np.float32)
+                raw = raw[-(taps - 1):]
+            else:
+                new = np.zeros(0, dtype=np.float32)
+        else:
+            new = block if block is not None else np.zeros(0, dtype=np.float32)
+        filtered = np.concatenate([filtered, new])
+        yield interpolate(block is None)
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as w:
+        w.setnchannels(CHANNELS)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def preprocess_audio(audio: AudioSource):
+    """디코딩 -> 모노 다운믹스 -> SAMPLE_RATE 리샘플링 -> 앞뒤 무음 제거 후 16-bit wav bytes 와 절감량 리포트 반환"""
+    input_bytes = os.path.getsize(audio) if isinstance(audio, str) else memoryview(audio).nbytes
+    samples, sample_rate = decode_wav(audio)
+    input_seconds = len(samples) / sample_rate
+
+    mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    trimmed = trim_silence(resample(mono, sample_rate, SAMPLE_RATE), SAMPLE_RATE)
+    output = encode_wav(trimmed, SAMPLE_RATE)
+
+    output_seconds = len(trimmed) / SAMPLE_RATE
+    return output, {
+        "input_bytes": input_bytes,
+        "output_bytes": len(output),
+        "bytes_saved": input_bytes - len(output),
+        "input_seconds": round(input_seconds, 3),
+        "output_seconds": round(output_seconds, 3),
+        "seconds_saved": round(input_seconds - output_seconds, 3),
+    }
+
+
+def preprocess_file(path: str, output_path: str, block_seconds: float = 10.0):
+    """preprocess_audio 와 같은 처리를 파일에서 파일로 block_seconds 씩 (임시 파일로 넘어간 큰 업로드용, 메모리는 블록 크기만큼)
+
+    앞뒤 무음 구간을 알기 위해 두 번 읽음: 1) 리샘플링한 프레임 에너지만 모음 2) 남길 구간만 output_path 에 씀
+    """
+    def resampled(w):
+        w.rewind()
+        channels, width, sample_rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        block_frames = max(1, int(sample_rate * block_seconds))
+
+        def mono_blocks():
+            while frames := w.readframes(block_frames):
+                samples = to_float(frames, width).reshape(-1, channels)
+                yield samples.mean(axis=1) if channels > 1 else samples[:, 0]
+
+        yield from resample_blocks(mono_blocks(), sample_rate, SAMPLE_RATE, w.getnframes())
+
+    frame = int(SAMPLE_RATE * FRAME_MS / 1000)
+    with wave.open(path, 'rb') as w:
+        input_seconds = w.getnframes() / w.getframerate()
+        levels, rest, length = [], np.zeros(0, dtype=np.float32), 0
+        for block in resampled(w):
+            length += len(block)
+            rest = np.concatenate([rest, block])
+            usable = len(rest) // frame * frame
+            levels.append(frame_levels(rest[:usable], frame))
+            rest = rest[usable:]
+        start, end = voiced_range(np.concatenate(levels), frame, length)
+
+        with wave.open(output_path, 'wb') as out:
+            out.setnchannels(CHANNELS)
+            out.setsampwidth(2)
+            out.setframerate(SAMPLE_RATE)
+            position = 0
+            for block in resampled(w):
+                kept = block[max(0, start - position):max(0, end - position)]
+                out.writeframes((np.clip(kept, -1, 1) * 32767).astype("<i2").tobytes())
+                position += len(block)
+
+    input_bytes, output_bytes = os.path.getsize(path), os.path.getsize(output_path)
+    output_seconds = (end - start) / SAMPLE_RATE
+    return {
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "bytes_saved": input_bytes - output_bytes,
+        "input_seconds": round(input_seconds, 3),
+        "output_seconds": round(output_seconds, 3),
+        "seconds_saved": round(input_seconds - output_seconds, 3),
+    }
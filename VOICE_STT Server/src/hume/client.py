@@ -1,22 +1,74 @@
+import io
 import os
 import json
-import requests
+import asyncio
+import threading
+from contextlib import ExitStack
+
+import httpx
 from dotenv import load_dotenv
 
-class HumeBatchAPI:
-    def __init__(self):
+# upload name of the index-th file in a multi-file job; predictions come back keyed by it ("file")
+UPLOAD_NAME = "audio_{}.wav"
+# responses worth retrying: rate limited or a transient server error
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+class AsyncHumeBatchAPI:
+    """Hume batch API 비동기 클라이언트 (연결 풀 재사용, 타임아웃 / 재시도 설정 가능)"""
+
+    def __init__(self, base_url=None, timeout=None, connect_timeout=None, max_retries=None, max_connections=None):
         # .env 파일에서 API 키 로드
         load_dotenv()
         self.api_key = os.getenv("HUME_API_KEY")
-        
-        self.base_url = "https://api.hume.ai/v0/batch/jobs"
-        
-    def analyze_audio(self, file_path, granularity="utterance"):
-        """로컬 음성 파일 분석"""
-        headers = {
-            "X-Hume-Api-Key": self.api_key
-        }
-        
+
+        self.base_url = base_url or os.getenv("HUME_BASE_URL", "https://api.hume.ai/v0/batch/jobs")
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("HUME_MAX_RETRIES", "3"))
+        timeout = timeout if timeout is not None else float(os.getenv("HUME_TIMEOUT_SECONDS", "30"))
+        connect_timeout = connect_timeout if connect_timeout is not None else float(
+            os.getenv("HUME_CONNECT_TIMEOUT_SECONDS", "5")
+        )
+        max_connections = max_connections if max_connections is not None else int(
+            os.getenv("HUME_MAX_CONNECTIONS", "20")
+        )
+        self.client = httpx.AsyncClient(
+            headers={"X-Hume-Api-Key": self.api_key or ""},
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _request(self, method, url, retry_sent=True, **kwargs):
+        """일시적인 오류는 짧은 지수 backoff 로 재시도 (retry_sent=False 면 서버에 도달했을 수 있는 요청은 재시도 안 함)"""
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                if last:
+                    raise
+            except httpx.TransportError:
+                if last or not retry_sent:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS or last or (not retry_sent and response.status_code != 429):
+                    response.raise_for_status()
+                    return response
+            await asyncio.sleep(0.25 * 2 ** attempt)
+
+    async def analyze_audio(self, file_path, granularity="utterance", callback_url=None):
+        """로컬 음성 파일 분석 (callback_url 이 있으면 작업 완료 시 Hume 이 그 주소로 POST)"""
+        return await self.analyze_audio_files([file_path], granularity, callback_url)
+
+    async def analyze_audio_files(self, sources, granularity="utterance", callback_url=None):
+        """여러 음성 (파일 경로 또는 메모리의 bytes) 을 하나의 작업으로 분석 (i 번째는 UPLOAD_NAME.format(i) 로 업로드)"""
         # 모델 설정
         json_data = {
             "models": {
@@ -26,49 +78,151 @@ class HumeBatchAPI:
             },
             "notify": True
         }
+        if callback_url:
+            json_data["callback_url"] = callback_url
 
-        # 파일 준비
-        files = {
-            'file': ('audio.wav', open(file_path, 'rb'), 'audio/wav'),
-            'json': ('json', json.dumps(json_data), 'application/json')
-        }
-        
         try:
-            response = requests.post(self.base_url, headers=headers, files=files)
-            response.raise_for_status()
+            # 파일 준비: memory buffers are streamed without a copy, spilled files as open handles closed after the POST
+            with ExitStack() as stack:
+                files = [
+                    ('file', (UPLOAD_NAME.format(i), _open(source, stack), 'audio/wav'))
+                    for i, source in enumerate(sources)
+                ] + [('json', ('json', json.dumps(json_data), 'application/json'))]
+
+                response = await self._request("POST", self.base_url, retry_sent=False, files=files)
             return response.json()["job_id"]
-            
-        except requests.exceptions.RequestException as e:
+
+        except (OSError, ValueError, TypeError, httpx.HTTPError) as e:
+            # OSError / ValueError / TypeError: a source could not be read (missing file, released memoryview)
             print(f"Error starting job: {str(e)}")
-            print(f"Response content: {response.text}")
+            if isinstance(e, httpx.HTTPStatusError):
+                print(f"Response content: {e.response.text}")
             return None
-    
-    def get_job_status(self, job_id):
+
+    async def get_job_status(self, job_id):
         """작업 상태 확인"""
-        headers = {
-            "X-Hume-Api-Key": self.api_key
-        }
-        
         try:
-            response = requests.get(f"{self.base_url}/{job_id}", headers=headers)
-            response.raise_for_status()
+            response = await self._request("GET", f"{self.base_url}/{job_id}")
             return response.json()["state"]["status"]
-            
-        except requests.exceptions.RequestException as e:
+
+        except httpx.HTTPError as e:
             print(f"Error checking job status: {str(e)}")
             return None
-    
-    def get_predictions(self, job_id):
+
+    async def list_jobs(self, timestamp_ms=None, limit=100, job_ids=None, max_pages=10):
+        """timestamp_ms 이후에 만든 작업들의 상태를 오래된 순으로 조회 (job_id -> 상태)
+
+        job_ids 가 있으면 그 작업들이 모두 보이거나 마지막 페이지에 닿을 때까지 (최대 max_pages 번) 다음 페이지를 이어서 조회
+        """
+        statuses = {}
+        try:
+            for _ in range(max_pages if job_ids else 1):
+                params = {"limit": limit, "sort_by": "created", "direction": "asc"}
+                if timestamp_ms is not None:
+                    params.update({"when": "after", "timestamp_ms": timestamp_ms})
+                response = await self._request("GET", self.base_url, params=params)
+                jobs = response.json()
+                statuses.update((job["job_id"], job["state"]["status"]) for job in jobs)
+                if len(jobs) < limit or not job_ids or all(job_id in statuses for job_id in job_ids):
+                    break
+                # next page starts just before the last job, so jobs created in the same ms are not skipped;
+                # a full page created within one ms has to move past it
+                last_ms = jobs[-1]["state"]["created_timestamp_ms"]
+                timestamp_ms = last_ms - 1 if timestamp_ms is None or last_ms - 1 > timestamp_ms else last_ms
+            return statuses
+
+        except httpx.HTTPError as e:
+            print(f"Error listing jobs: {str(e)}")
+            return None
+
+    async def get_predictions(self, job_id):
         """분석 결과 가져오기"""
-        headers = {
-            "X-Hume-Api-Key": self.api_key
-        }
-        
         try:
-            response = requests.get(f"{self.base_url}/{job_id}/predictions", headers=headers)
-            response.raise_for_status()
+            response = await self._request("GET", f"{self.base_url}/{job_id}/predictions")
             return response.json()
-            
-        except requests.exceptions.RequestException as e:
+
+        except httpx.HTTPError as e:
             print(f"Error getting predictions: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+
+class HumeBatchAPI:
+    """AsyncHumeBatchAPI 의 동기 래퍼 (CLI 등 동기 코드용, 전용 이벤트 루프 스레드에서 실행해 연결 풀을 유지)"""
+
+    def __init__(self, base_url=None, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        self.client = self._run(_create(base_url, kwargs))
+        self.base_url = self.client.base_url
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self):
+        self._run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def analyze_audio(self, file_path, granularity="utterance", callback_url=None):
+        """로컬 음성 파일 분석 (callback_url 이 있으면 작업 완료 시 Hume 이 그 주소로 POST)"""
+        return self._run(self.client.analyze_audio(file_path, granularity, callback_url))
+
+    def analyze_audio_files(self, sources, granularity="utterance", callback_url=None):
+        """여러 음성을 하나의 작업으로 분석"""
+        return self._run(self.client.analyze_audio_files(sources, granularity, callback_url))
+
+    def get_job_status(self, job_id):
+        """작업 상태 확인"""
+        return self._run(self.client.get_job_status(job_id))
+
+    def list_jobs(self, timestamp_ms=None, limit=100, job_ids=None, max_pages=10):
+        """timestamp_ms 이후에 만든 작업들의 상태 조회 (job_id -> 상태, job_ids 가 있으면 모두 보일 때까지 페이지를 넘김)"""
+        return self._run(self.client.list_jobs(timestamp_ms, limit, job_ids, max_pages))
+
+    def get_predictions(self, job_id):
+        """분석 결과 가져오기"""
+        return self._run(self.client.get_predictions(job_id))
+
+
+async def _create(base_url, kwargs):
+    # built on the wrapper's own loop, so the connection pool belongs to it
+    return AsyncHumeBatchAPI(base_url, **kwargs)
+
+
+class MemoryReader(io.RawIOBase):
+    """bytes / memoryview 를 복사 없이 읽는 file 객체 (httpx multipart 는 file 객체를 64KB 씩 읽고, 재시도 시 seek(0))"""
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast("B")
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self._view[self._position:self._position + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+
+def _open(source, stack):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return MemoryReader(source)
+    return stack.enter_context(open(source, 'rb'))
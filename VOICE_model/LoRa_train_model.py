@@ -6,6 +6,14 @@ from transformers import T5TokenizerFast, T5ForConditionalGeneration
 from torch.optim import AdamW
 from sklearn.model_selection import train_test_split
 import os
+import sys
+from pathlib import Path
+
+# prompt template & compiler are shared with the AI server
+AI_SERVER_DIR = Path(__file__).resolve().parent.parent / "AI_Server"
+sys.path.append(str(AI_SERVER_DIR))
+from prompt_compiler import PromptCompiler
+from structured_output import format_target
 from peft import get_peft_model, LoraConfig, TaskType
 
 # Cuda GPU 
@@ -40,10 +48,13 @@ def print_trainable_parameters(model, unit=1e9):
 
 # Dataset class
 class CustomDataset(Dataset):
-    def __init__(self, data, tokenizer, max_length=512):
+    def __init__(self, data, tokenizer, max_length=512, structured=False):
         self.data = data
         self.tokenizer = tokenizer
         self.max_length = max_length
+        self.compiler = PromptCompiler(tokenizer)
+        # target = routine + " ### " + updates suffix (data_preprocessing.py with STRUCTURED = True)
+        self.structured = structured
 
     def __len__(self):
         return len(self.data)
@@ -51,16 +62,26 @@ class CustomDataset(Dataset):
     def __getitem__(self, index):
         situation = self.data.iloc[index]['situation']
         routine = self.data.iloc[index]['routine']
-
-        inputs = self.tokenizer(situation, max_length=self.max_length, truncation=True, padding='max_length', return_tensors='pt')
+        if self.structured:
+            updates = self.data.iloc[index]['updates']
+            routine = format_target(routine, updates if isinstance(updates, str) else "")
+
+        # situation column holds the full prompt, only its situation part needs tokenizing
+        raw_situation = self.compiler.split(situation)
+        if raw_situation is not None:
+            input_ids = torch.tensor(self.compiler.encode(raw_situation, max_length=self.max_length, padding=True))
+        else:
+            input_ids = self.tokenizer(situation, max_length=self.max_length, truncation=True, padding='max_length', return_tensors='pt').input_ids[0]
         labels = self.tokenizer(routine, max_length=self.max_length, truncation=True, padding='max_length', return_tensors='pt')
 
         return {
-            'input_ids': inputs.input_ids[0],
+            'input_ids': input_ids,
             'labels': labels.input_ids[0]
         }
 
 DATASET_PATH = "../preprocessed_dataset.csv"
+# True: train on "routine ### updates" targets (needs the updates column from data_preprocessing.py)
+STRUCTURED = False
 
 # Load dataset
 df = load_data(DATASET_PATH)
@@ -95,8 +116,8 @@ batch_size = 4
 train_data, val_data = train_test_split(df, test_size=0.05, random_state=42)
 
 # Load data using DataLoader
-train_dataset = CustomDataset(train_data, tokenizer)
-val_dataset = CustomDataset(val_data, tokenizer)
+train_dataset = CustomDataset(train_data, tokenizer, structured=STRUCTURED)
+val_dataset = CustomDataset(val_data, tokenizer, structured=STRUCTURED)
 
 train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
 val_loader = DataLoader(val_dataset, batch_size=batch_size)